@@ -0,0 +1,86 @@
+"""
+Action extraction cost: legacy str() scraping vs structural RobotAction read.
+
+Both decoders run on the same extracted ActionResult terms, so the numbers
+isolate decoding from e-graph extraction.
+
+Usage: python benchmark/bench_action_extraction.py [--repeat N]
+"""
+
+import argparse
+import os
+import re
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src", "python"))
+
+from egglog import f64  # noqa: E402
+
+from cfg_engine import ActionResult, _to_action  # noqa: E402
+
+SAMPLES = [
+    ActionResult.update_y(f64(0.83625)),
+    ActionResult.update_x(f64(-0.7)),
+    ActionResult.update_y(f64(-7e-05)),
+    ActionResult.pick(),
+    ActionResult.place(),
+    ActionResult.lock("storage_L_1"),
+]
+
+
+def legacy_decode(best) -> dict:
+    """The string scraping used before typed extraction."""
+    s = str(best)
+    if "update_y(" in s or "update_x(" in s:
+        kind = "update_y" if "update_y(" in s else "update_x"
+        try:
+            val = float(
+                [
+                    x
+                    for x in s.replace("(", " ").replace(")", " ").split()
+                    if x.replace(".", "").replace("-", "").isdigit()
+                ][0]
+            )
+        except IndexError:
+            return {"type": "wait"}
+        return {"type": kind, "val": val}
+    elif "pick(" in s:
+        return {"type": "pick"}
+    elif "place(" in s:
+        return {"type": "place"}
+    elif "lock(" in s:
+        m = re.search(r'"([^"]*)"', s)
+        return {"type": "lock", "slot_id": m.group(1) if m else ""}
+    return {"type": "wait"}
+
+
+def time_decoder(decode, repeat: int) -> float:
+    """Return mean microseconds per decoded action."""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for best in SAMPLES:
+            decode(best)
+    return (time.perf_counter() - start) / (repeat * len(SAMPLES)) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    print("decoded values:")
+    for best in SAMPLES:
+        print(
+            f"  {str(best):<40} legacy={legacy_decode(best)}  typed={_to_action(best)}"
+        )
+
+    legacy = time_decoder(legacy_decode, args.repeat)
+    typed = time_decoder(_to_action, args.repeat)
+    print(f"legacy  us/action : {legacy:.2f}")
+    print(f"typed   us/action : {typed:.2f}")
+    print(f"speedup           : {legacy / typed:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Batched planner queries: one e-graph for N queries vs one call per query.
+
+Draws N random (robot state, command) queries against the default
+warehouse and answers them one at a time (stateless and with a
+PlannerSession) and as one batch through get_next_actions_from_egglog.
+"fetch" only asks for FETCH moves (e.g. precomputing per-tray plans) and
+fits one e-graph scope. "mixed" adds deliveries to a few locked slots and
+nearest-candidate commands from random positions, which split the batch
+into more scopes (groups). Every batched answer is checked against the
+one-by-one answer.
+
+Usage: python benchmark/bench_batch_queries.py [--queries N [N ...]]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src", "python"))
+
+from cfg_engine import (  # noqa: E402
+    QUERY_DEFAULTS,
+    PlannerSession,
+    _batch_groups,
+    get_next_action_from_egglog,
+    get_next_actions_from_egglog,
+)
+from warehouse import Warehouse  # noqa: E402
+
+WORKLOADS = {"fetch": (1, 0, 0, 0), "mixed": (4, 1, 4, 1)}
+
+
+def random_queries(wh: Warehouse, n: int, weights, seed: int = 0) -> list[dict]:
+    """Queries from random slot positions, commands drawn with weights."""
+    rng = random.Random(seed)
+    slots = wh._get_all_slots()
+    trays = [int(s.tray.tray_id) for s in slots if s.tray]
+    queries = []
+    for _ in range(n):
+        slot = rng.choice(slots)
+        cy, cx = slot.y, rng.choice((0.0, slot.x))
+        kind = rng.choices(("fetch", "any", "deliver", "search"), weights)[0]
+        if kind == "fetch":
+            q = dict(holding=False, phase="fetch", cmd_type="FETCH")
+            q["target_id"] = rng.choice(trays)
+        elif kind == "any":
+            q = dict(holding=False, phase="fetch", cmd_type="FETCH_ANY_EMPTY")
+        elif kind == "deliver":
+            q = dict(holding=True, phase="deliver", cmd_type="DELIVER")
+            free = [s for s in slots if s.tray is None]
+            q["locked_id"] = rng.choice(free[:3]).slot_id
+        else:
+            q = dict(holding=True, phase="deliver", cmd_type="SEARCH_TARGET")
+            q["target_type"] = "storage"
+        queries.append(dict(cy=cy, cx=cx, **q))
+    return queries
+
+
+def timed(fn) -> tuple[float, list]:
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--queries", type=int, nargs="+", default=[10, 100, 400])
+    args = parser.parse_args()
+
+    wh = Warehouse()
+    print(
+        f"{'workload':<8} {'queries':>8} {'groups':>7} {'stateless ms':>13}"
+        f" {'session ms':>11} {'batch ms':>9} {'speedup':>8}"
+    )
+    for (name, weights), n in ((w, n) for w in WORKLOADS.items() for n in args.queries):
+        queries = random_queries(wh, n, weights)
+        groups = len(_batch_groups([{**QUERY_DEFAULTS, **q} for q in queries]))
+        single, expected = timed(
+            lambda: [get_next_action_from_egglog(wh, **q) for q in queries]
+        )
+        session = PlannerSession()
+        per_session, _ = timed(lambda: [session.next_action(wh, **q) for q in queries])
+        batch, actions = timed(lambda: get_next_actions_from_egglog(wh, queries))
+        assert actions == expected, "batched answers differ"
+        print(
+            f"{name:<8} {n:>8} {groups:>7} {single * 1e3:>13.1f}"
+            f" {per_session * 1e3:>11.1f} {batch * 1e3:>9.1f} {single / batch:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Controller steps for a mission cycle: 50 ms ticks vs analytic moves.
+
+Runs ExtractTray, SendBack, FetchAnyEmpty, SendBack and Enqueue once with
+tick() and once with advance(), counting controller steps and planner
+decisions along with the simulated (logical) time.
+
+Usage: python benchmark/bench_event_motion.py [--backend python|egglog]
+"""
+
+import argparse
+import os
+import sys
+import time
+from unittest.mock import patch
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src", "python"))
+
+from warehouse import Warehouse  # noqa: E402
+from warehouse_controller import WarehouseController  # noqa: E402
+
+
+def missions(ctrl):
+    return (
+        lambda: ctrl.extract(2),
+        ctrl.sendback,
+        ctrl.fetch_any_empty,
+        ctrl.sendback,
+        lambda: ctrl.enqueue(3),
+    )
+
+
+def run(options: dict, event_driven: bool) -> tuple[int, int, float, float]:
+    """Return (steps, planner decisions, logical seconds, wall seconds)."""
+    ctrl = WarehouseController(Warehouse(), **options)
+    steps, now = 0, 0.0
+    with patch.object(
+        ctrl, "_get_next_action", wraps=ctrl._get_next_action
+    ) as decisions:
+        start = time.perf_counter()
+        for mission in missions(ctrl):
+            mission()
+            while ctrl.is_busy:
+                steps += 1
+                if not event_driven:
+                    ctrl.tick()
+                    now += 0.05
+                    continue
+                arrival = ctrl.advance(now)
+                if arrival is None:
+                    break
+                now = arrival
+        wall = time.perf_counter() - start
+    return steps, decisions.call_count, now, wall
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--backend", choices=("python", "egglog"), default="egglog")
+    args = parser.parse_args()
+    options = dict(planner_backend=args.backend, plan_missions=True)
+
+    print(f"{'mode':<7} {'steps':>6} {'decisions':>10} {'logical s':>10} {'wall s':>7}")
+    for name, event_driven in (("tick", False), ("event", True)):
+        steps, decisions, logical, wall = run(options, event_driven)
+        print(f"{name:<7} {steps:>6} {decisions:>10} {logical:>10.2f} {wall:>7.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Per-decision latency: egglog PlannerSession vs the table-driven FastPlanner.
+
+Replays the planner queries of one ExtractTray + SendBack cycle through both
+backends and checks every python decision against the egglog rules.
+
+Usage: python benchmark/bench_fast_planner.py [--ticks N] [--repeat N]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src", "python"))
+
+from bench_planner_session import record_queries  # noqa: E402
+from cfg_engine import PlannerSession  # noqa: E402
+from fast_planner import FastPlanner  # noqa: E402
+from warehouse import Warehouse  # noqa: E402
+
+
+def time_decisions(planner, wh, queries: list[dict], repeat: int) -> float:
+    """Return mean latency in microseconds per decision."""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for q in queries:
+            planner.next_action(wh, **q)
+    return (time.perf_counter() - start) / (len(queries) * repeat) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--ticks", type=int, default=1000, help="max ticks to record")
+    parser.add_argument("--repeat", type=int, default=100, help="python replays")
+    args = parser.parse_args()
+
+    queries = record_queries(args.ticks)
+    wh = Warehouse()
+    session = PlannerSession()
+    egglog_us = time_decisions(session, wh, queries, 1)
+    python_us = time_decisions(FastPlanner(), wh, queries, args.repeat)
+
+    fast = FastPlanner()
+    agree = sum(session.verify(wh, fast.next_action(wh, **q), **q) for q in queries)
+
+    print(f"decisions replayed  : {len(queries)}")
+    print(f"egglog   us/decision: {egglog_us:.1f}")
+    print(f"python   us/decision: {python_us:.2f}")
+    print(f"speedup             : {egglog_us / python_us:.0f}x")
+    print(f"verified by egglog  : {agree}/{len(queries)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Build time and mission cost for data-driven towers of increasing height.
+
+Builds a two-column tower (three queues, one bay) from a layout dict for each
+row count, then extracts the topmost tray with the python planner and with
+egglog plan-once mode.
+
+Usage: python benchmark/bench_layout_scaling.py [--rows 20 200 2000]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src", "python"))
+
+from warehouse import Warehouse  # noqa: E402
+from warehouse_controller import WarehouseController  # noqa: E402
+
+
+def tower(rows: int) -> dict:
+    """Default-style tower with one tray per ten rows on the left column."""
+    return {
+        "rows": rows,
+        "columns": [
+            {"name": "L", "x": -0.7},
+            {
+                "name": "R",
+                "x": 0.7,
+                "slots": {
+                    "0-2": {"type": "queue"},
+                    3: {"id": "in_view", "type": "bay"},
+                },
+            },
+        ],
+        "trays": [
+            {"slot": f"storage_L_{r}", "weight": 3.5} for r in range(0, rows, 10)
+        ],
+    }
+
+
+def extract_top(spec: dict, **options) -> tuple[int, float]:
+    """Return (ticks, seconds) to bring the highest tray to the bay."""
+    wh = Warehouse(spec)
+    ctrl = WarehouseController(wh, **options)
+    ctrl.extract(len(spec["trays"]))
+    ticks, start = 0, time.perf_counter()
+    while ctrl.is_busy:
+        ctrl.tick()
+        ticks += 1
+    return ticks, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, nargs="+", default=[20, 200, 2000])
+    args = parser.parse_args()
+
+    print(f"{'rows':>6} {'build ms':>9} {'ticks':>7} {'python s':>9} {'egglog s':>9}")
+    for rows in args.rows:
+        spec = tower(rows)
+        start = time.perf_counter()
+        Warehouse(spec)
+        build_ms = (time.perf_counter() - start) * 1e3
+        ticks, python_s = extract_top(spec, planner_backend="python")
+        _, egglog_s = extract_top(spec, plan_missions=True)
+        print(
+            f"{rows:>6} {build_ms:>9.2f} {ticks:>7} {python_s:>9.3f} {egglog_s:>9.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
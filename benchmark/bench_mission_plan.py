@@ -0,0 +1,54 @@
+"""
+Solver invocations and wall time per mission: per-tick queries vs plan-once.
+
+Runs the same ExtractTray + SendBack cycle with WarehouseController in
+both modes and counts calls into the egglog planner.
+
+Usage: python benchmark/bench_mission_plan.py
+"""
+
+import os
+import sys
+import time
+from unittest.mock import patch
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src", "python"))
+
+import warehouse_controller  # noqa: E402
+from warehouse import Warehouse  # noqa: E402
+from warehouse_controller import WarehouseController  # noqa: E402
+
+
+def run_cycle(plan_missions: bool) -> tuple[int, int, float]:
+    """Return (ticks, solver calls, seconds) for one mission cycle."""
+    wh = Warehouse()
+    ctrl = WarehouseController(wh, plan_missions=plan_missions)
+    ticks = 0
+    with patch.object(
+        warehouse_controller,
+        "get_next_action_from_egglog",
+        wraps=warehouse_controller.get_next_action_from_egglog,
+    ) as per_tick, patch.object(
+        warehouse_controller,
+        "plan_mission",
+        wraps=warehouse_controller.plan_mission,
+    ) as per_mission:
+        start = time.perf_counter()
+        for mission in (lambda: ctrl.extract(2), ctrl.sendback):
+            mission()
+            while ctrl.is_busy:
+                ctrl.tick()
+                ticks += 1
+        elapsed = time.perf_counter() - start
+    return ticks, per_tick.call_count + per_mission.call_count, elapsed
+
+
+def main():
+    print(f"{'mode':<10} {'ticks':>6} {'solver calls':>13} {'seconds':>8}")
+    for name, plan_missions in (("per-tick", False), ("plan-once", True)):
+        ticks, calls, elapsed = run_cycle(plan_missions)
+        print(f"{name:<10} {ticks:>6} {calls:>13} {elapsed:>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
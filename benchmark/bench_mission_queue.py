@@ -0,0 +1,75 @@
+"""
+Mission queue policies: FIFO vs look-ahead reordering and SendBack chaining.
+
+Submits each seeded task stream to the controller queue at once (batch mode
+of the simulator) and compares makespan and platform travel of both queue
+policies, per completed task so rejected/stalled tasks do not skew them.
+
+Usage: python benchmark/bench_mission_queue.py [--scenarios N] [--tasks N]
+"""
+
+import argparse
+import logging
+import os
+import random
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src", "python"))
+
+from layout import read_layout  # noqa: E402
+from scenarios import DEFAULT_LAYOUT, random_inventory, random_tasks  # noqa: E402
+from simulator import Simulator  # noqa: E402
+from warehouse import Warehouse  # noqa: E402
+
+MIXES = {
+    "extract": {"ExtractTray": 1.0},
+    "extract+empty": {"ExtractTray": 0.7, "FetchAnyEmpty": 0.3},
+    "default": None,
+}
+POLICIES = ("fifo", "lookahead")
+
+
+def sweep(mix, scenarios: int, trays: int, tasks: int) -> dict:
+    """Return policy -> [makespan, distance, completed] summed over scenarios."""
+    base = read_layout(DEFAULT_LAYOUT)
+    totals = {policy: [0.0, 0.0, 0] for policy in POLICIES}
+    for seed in range(scenarios):
+        rng = random.Random(seed)
+        layout = random_inventory(base, rng, trays)
+        stream = random_tasks(rng, trays, tasks, mix)
+        for policy in POLICIES:
+            sim = Simulator(lambda: Warehouse(layout), queue_policy=policy)
+            report = sim.run(stream, batch=True)
+            total = totals[policy]
+            total[0] += report.makespan
+            total[1] += report.distance
+            total[2] += report.completed
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scenarios", type=int, default=200)
+    parser.add_argument("--trays", type=int, default=12)
+    parser.add_argument("--tasks", type=int, default=20, help="tasks per scenario")
+    args = parser.parse_args()
+    logging.disable(logging.ERROR)
+
+    print(
+        f"{'mix':<14} {'policy':<10} {'done':>6} {'s/task':>7} {'m/task':>7}"
+        f" {'time saved':>10} {'travel saved':>12}"
+    )
+    for name, mix in MIXES.items():
+        totals = sweep(mix, args.scenarios, args.trays, args.tasks)
+        fifo_time = totals["fifo"][0] / totals["fifo"][2]
+        fifo_dist = totals["fifo"][1] / totals["fifo"][2]
+        for policy, (makespan, distance, done) in totals.items():
+            per_time, per_dist = makespan / done, distance / done
+            print(
+                f"{name:<14} {policy:<10} {done:>6} {per_time:>7.2f} {per_dist:>7.2f}"
+                f" {1 - per_time / fifo_time:>10.1%} {1 - per_dist / fifo_dist:>12.1%}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Bytes per slot and per tray: __slots__ models vs the previous __dict__ ones.
+
+Allocates N slots and N trays with each model under tracemalloc, then builds
+a whole N-slot warehouse (object and, if NumPy is installed, columnar).
+
+Usage: python benchmark/bench_model_memory.py [--slots N]
+"""
+
+import argparse
+import os
+import sys
+import tracemalloc
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src", "python"))
+
+from slot import Slot  # noqa: E402
+from tray import Tray  # noqa: E402
+from warehouse import Warehouse  # noqa: E402
+
+
+class DictSlot:
+    """Slot as it was: per-instance __dict__ with constant dimensions."""
+
+    def __init__(self, slot_id, x, y, slot_type="storage"):
+        self.x = x
+        self.y = y
+        self.slot_id = slot_id
+        self.slot_type = slot_type
+        self.length = 1.62
+        self.height = 0.16725
+        self.width = 0.7
+        self.tray = None
+        self.on_change = None
+
+
+class DictTray:
+    """Tray as it was: per-instance __dict__ with constant dimensions."""
+
+    def __init__(self, tray_id, weight):
+        self.tray_id = tray_id
+        self.length = 1.62
+        self.height = 0.16725
+        self.width = 0.7
+        self.weight = weight
+
+
+def bytes_per(factory, n: int) -> float:
+    """Average traced bytes per object created by factory(i)."""
+    tracemalloc.start()
+    objects = [factory(i) for i in range(n)]
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del objects
+    return size / n
+
+
+def warehouse_bytes_per_slot(n: int, columnar: bool) -> float:
+    """Traced bytes per slot for an n-slot two-column tower, half full."""
+    rows = n // 2
+    layout = {
+        "rows": rows,
+        "columns": [{"name": "L", "x": -0.7}, {"name": "R", "x": 0.7}],
+        "trays": [{"slot": f"storage_L_{r}", "weight": 3.5} for r in range(rows)],
+    }
+    tracemalloc.start()
+    wh = Warehouse(layout, columnar=columnar)
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del wh
+    return size / n
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--slots", type=int, default=10000, help="slots to create")
+    args = parser.parse_args()
+    n = args.slots
+
+    rows = [
+        ("slot (dict)", lambda i: DictSlot(f"s_{i}", 0.7, i * 0.16725)),
+        ("slot (__slots__)", lambda i: Slot(f"s_{i}", 0.7, i * 0.16725)),
+        ("tray (dict)", lambda i: DictTray(i, 3.5)),
+        ("tray (__slots__)", lambda i: Tray(weight=3.5)),
+    ]
+    print(f"{'model':<22} {'bytes/object':>13}")
+    for name, factory in rows:
+        print(f"{name:<22} {bytes_per(factory, n):>13.0f}")
+
+    print(f"{'warehouse (objects)':<22} {warehouse_bytes_per_slot(n, False):>13.0f}")
+    try:
+        columnar = warehouse_bytes_per_slot(n, True)
+    except ImportError:
+        print(f"{'warehouse (columnar)':<22} {'needs numpy':>13}")
+    else:
+        print(f"{'warehouse (columnar)':<22} {columnar:>13.0f}")
+
+
+if __name__ == "__main__":
+    main()
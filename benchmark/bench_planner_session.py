@@ -0,0 +1,84 @@
+"""
+Per-tick planning latency: stateless get_next_action_from_egglog vs PlannerSession
+(with and without an ActionCache in front).
+
+Records the planner queries issued by WarehouseController during one
+ExtractTray + SendBack cycle, then replays the same query stream through
+each backend.
+
+Usage: python benchmark/bench_planner_session.py [--ticks N]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src", "python"))
+
+import warehouse_controller  # noqa: E402
+from cfg_engine import (
+    ActionCache,
+    PlannerSession,
+    get_next_action_from_egglog,
+)  # noqa: E402
+from warehouse import Warehouse  # noqa: E402
+from warehouse_controller import WarehouseController  # noqa: E402
+
+
+def record_queries(max_ticks: int) -> list[dict]:
+    """Run a mission cycle and capture every planner query."""
+    wh = Warehouse()
+    ctrl = WarehouseController(wh)
+    queries = []
+    original = warehouse_controller.get_next_action_from_egglog
+
+    def spy(warehouse, session=None, cache=None, **kwargs):
+        queries.append(kwargs)
+        return original(warehouse, session=session, cache=cache, **kwargs)
+
+    warehouse_controller.get_next_action_from_egglog = spy
+    try:
+        for mission in (lambda: ctrl.extract(2), ctrl.sendback):
+            mission()
+            while ctrl.is_busy and len(queries) < max_ticks:
+                ctrl.tick()
+    finally:
+        warehouse_controller.get_next_action_from_egglog = original
+    return queries
+
+
+def time_backend(
+    queries: list[dict],
+    session: PlannerSession | None,
+    cache: ActionCache | None = None,
+) -> float:
+    """Return mean latency in ms of replaying queries on a fresh warehouse."""
+    wh = Warehouse()
+    start = time.perf_counter()
+    for q in queries:
+        get_next_action_from_egglog(wh, session=session, cache=cache, **q)
+    return (time.perf_counter() - start) / len(queries) * 1e3
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--ticks", type=int, default=1000, help="max ticks to record")
+    args = parser.parse_args()
+
+    queries = record_queries(args.ticks)
+    stateless = time_backend(queries, None)
+    session = time_backend(queries, PlannerSession())
+    cache = ActionCache()
+    cached = time_backend(queries, PlannerSession(), cache)
+
+    print(f"ticks replayed      : {len(queries)}")
+    print(f"stateless  ms/tick  : {stateless:.3f}")
+    print(f"session    ms/tick  : {session:.3f}")
+    print(f"cached     ms/tick  : {cached:.3f}  {cache.stats}")
+    print(f"speedup (session)   : {stateless / session:.1f}x")
+    print(f"speedup (cached)    : {stateless / cached:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""
+Stateless query cost with all rules and slot facts vs per-command rule groups.
+
+For towers of increasing height, answers one query per command kind on a
+fresh e-graph twice: the old way (every rule in WAREHOUSE_RULES and every
+slot fact) and through get_next_actions_from_egglog, which registers only
+the command's rule group and the candidate slots a FactSelector picks.
+Answers are checked to be identical. The last columns time the same query
+on warm PlannerSessions holding all rules or only the command's group: they
+are about equal, because egglog only searches rules whose patterns can
+match the new query. The savings come from building a smaller e-graph.
+
+Usage: python benchmark/bench_rule_groups.py [--rows 250 1000 2500]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src", "python"))
+
+from cfg_engine import (  # noqa: E402
+    COMMAND_RULES,
+    WAREHOUSE_RULES,
+    PlannerSession,
+    SaturationSchedule,
+    _answer_batch,
+    _slot_fact,
+    get_next_actions_from_egglog,
+)
+from egglog import EGraph  # noqa: E402
+from fact_selector import FactSelector  # noqa: E402
+from warehouse import Warehouse  # noqa: E402
+
+
+def tower(rows: int) -> dict:
+    """Two-column tower with a tray in every third left slot, every tenth empty."""
+    return {
+        "rows": rows,
+        "columns": [
+            {"name": "L", "x": -0.7},
+            {
+                "name": "R",
+                "x": 0.7,
+                "slots": {
+                    "0-2": {"type": "queue"},
+                    3: {"id": "in_view", "type": "bay"},
+                },
+            },
+        ],
+        "trays": [
+            {"slot": f"storage_L_{r}", "weight": 0.0 if r % 30 == 0 else 3.5}
+            for r in range(0, rows, 3)
+        ],
+    }
+
+
+def queries_for(wh: Warehouse) -> dict:
+    """One query per command kind, from the bottom of the tower."""
+    slots = wh._get_all_slots()
+    top_tray = max((s for s in slots if s.tray), key=lambda s: s.y).tray
+    top_free = max((s for s in slots if s.tray is None), key=lambda s: s.y)
+    start = dict(cy=0.0, cx=0.0)
+    kinds = {
+        "FETCH": dict(
+            holding=False, phase="fetch", cmd_type="FETCH", target_id=top_tray.tray_id
+        ),
+        "FETCH_ANY_EMPTY": dict(
+            holding=False, phase="fetch", cmd_type="FETCH_ANY_EMPTY"
+        ),
+        "DELIVER": dict(
+            holding=True,
+            phase="deliver",
+            cmd_type="DELIVER",
+            target_type=top_free.slot_type,
+            locked_id=top_free.slot_id,
+        ),
+        "SEARCH_TARGET": dict(
+            holding=True,
+            phase="deliver",
+            cmd_type="SEARCH_TARGET",
+            target_type="storage",
+        ),
+    }
+    return {cmd: {**start, **q} for cmd, q in kinds.items()}
+
+
+def all_rules(wh: Warehouse, query: dict, schedule: SaturationSchedule):
+    """The pre-grouping stateless path: every rule and every slot fact."""
+    egraph = EGraph()
+    egraph.register(*WAREHOUSE_RULES)
+    for s in wh._get_all_slots():
+        egraph.register(_slot_fact(s))
+    return _answer_batch(egraph, [query], schedule)[0]
+
+
+def session_ms(wh: Warehouse, query: dict, rules, repeat: int = 20) -> float:
+    """Best latency of query on a synced session holding rules."""
+    session = PlannerSession(rules)
+    session.sync(wh)
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        session.next_action(wh, **query)
+        best = min(best, time.perf_counter() - start)
+    return best * 1e3
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, nargs="+", default=[250, 1000, 2500])
+    args = parser.parse_args()
+
+    print(
+        f"{'slots':>6} {'command':<16} {'facts':>11} {'all ms':>9} {'grouped ms':>11}"
+        f" {'speedup':>8} {'session all/group ms':>21}"
+    )
+    for rows in args.rows:
+        wh = Warehouse(tower(rows))
+        slots = wh._get_all_slots()
+        for cmd, query in queries_for(wh).items():
+            old_s, expected = timed(lambda: all_rules(wh, query, SaturationSchedule()))
+            new_s, actions = timed(lambda: get_next_actions_from_egglog(wh, [query]))
+            assert actions == [expected], f"{cmd}: {actions} != {expected}"
+            facts = len(FactSelector().select(wh, [query]))
+            group = COMMAND_RULES[cmd]
+            if cmd == "FETCH_ANY_EMPTY":
+                group += COMMAND_RULES["FETCH"]
+            sessions = f"{session_ms(wh, query, WAREHOUSE_RULES):.2f} / "
+            sessions += f"{session_ms(wh, query, group):.2f}"
+            print(
+                f"{len(slots):>6} {cmd:<16} {f'{len(slots)} -> {facts}':>11}"
+                f" {old_s * 1e3:>9.1f} {new_s * 1e3:>11.1f}"
+                f" {old_s / new_s:>7.1f}x {sessions:>21}"
+            )
+
+
+if __name__ == "__main__":
+    main()
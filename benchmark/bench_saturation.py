@@ -0,0 +1,116 @@
+"""
+Per-query latency of fixed run(10) saturation vs the adaptive SaturationSchedule.
+
+Replays the same random next_action queries (fetch, deliver to a locked
+slot, search) on PlannerSessions with each schedule, for towers of
+increasing height, and keeps the best of a few rounds. Answers are
+checked to be identical. Prints the
+iterations per run, why runs stopped and the rules that took the most
+search/apply time.
+
+Usage: python benchmark/bench_saturation.py [--rows 20 200 1000] [--queries N] [--rounds N]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src", "python"))
+
+from cfg_engine import PlannerSession, SaturationSchedule  # noqa: E402
+from warehouse import Warehouse  # noqa: E402
+
+
+def tower(rows: int) -> dict:
+    """Two-column tower with one tray per three rows on the left column."""
+    return {
+        "rows": rows,
+        "columns": [
+            {"name": "L", "x": -0.7},
+            {
+                "name": "R",
+                "x": 0.7,
+                "slots": {
+                    "0-2": {"type": "queue"},
+                    3: {"id": "in_view", "type": "bay"},
+                },
+            },
+        ],
+        "trays": [{"slot": f"storage_L_{r}", "weight": 3.5} for r in range(0, rows, 3)],
+    }
+
+
+def random_queries(wh: Warehouse, n: int, seed: int = 0) -> list[dict]:
+    """Queries from random slot positions, one locked slot per delivery."""
+    rng = random.Random(seed)
+    slots = wh._get_all_slots()
+    trays = [int(s.tray.tray_id) for s in slots if s.tray]
+    free = [s.slot_id for s in slots if s.tray is None and s.slot_type == "storage"]
+    queries = []
+    for _ in range(n):
+        slot = rng.choice(slots)
+        q = dict(cy=slot.y, cx=rng.choice((0.0, slot.x)))
+        kind = rng.choice(("fetch", "deliver", "search"))
+        if kind == "fetch":
+            q.update(holding=False, phase="fetch", cmd_type="FETCH")
+            q["target_id"] = rng.choice(trays)
+        elif kind == "deliver":
+            q.update(holding=True, phase="deliver", cmd_type="DELIVER")
+            q.update(target_type="storage", locked_id=rng.choice(free))
+        else:
+            q.update(holding=True, phase="deliver", cmd_type="SEARCH_TARGET")
+            q["target_type"] = "storage"
+        queries.append(q)
+    return queries
+
+
+def replay(
+    wh: Warehouse, queries: list[dict], schedule: SaturationSchedule, rounds: int
+):
+    """Return (best ms per query over rounds, answers) on a pre-synced session."""
+    session = PlannerSession(schedule=schedule)
+    session.sync(wh)
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        answers = [session.next_action(wh, **q) for q in queries]
+        best = min(best, time.perf_counter() - start)
+    return best / len(queries) * 1e3, answers
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, nargs="+", default=[20, 200, 1000])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    print(
+        f"{'rows':>6} {'fixed ms':>9} {'adaptive ms':>12} {'iters/run':>16}"
+        f" {'speedup':>8}  stops"
+    )
+    for rows in args.rows:
+        wh = Warehouse(tower(rows))
+        queries = random_queries(wh, args.queries)
+        fixed, adaptive = SaturationSchedule(adaptive=False), SaturationSchedule()
+        fixed_ms, expected = replay(wh, queries, fixed, args.rounds)
+        adaptive_ms, answers = replay(wh, queries, adaptive, args.rounds)
+        assert answers == expected, "schedules disagree"
+        iters = f"{fixed.iterations / fixed.runs:.2f} -> "
+        iters += f"{adaptive.iterations / adaptive.runs:.2f}"
+        print(
+            f"{rows:>6} {fixed_ms:>9.3f} {adaptive_ms:>12.3f} {iters:>16}"
+            f" {fixed_ms / adaptive_ms:>7.2f}x  {dict(adaptive.stops)}"
+        )
+
+    slowest = sorted(adaptive.rule_time.items(), key=lambda kv: -kv[1])[:3]
+    print(f"slowest rules ({rows} rows, adaptive):")
+    for name, seconds in slowest:
+        matches = adaptive.rule_matches[name]
+        print(f"  {name:<22} {seconds * 1e3:8.1f} ms  {matches} matches")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Monte-Carlo scenario sweep throughput for 1..N worker processes.
+
+Runs the same seeded scenarios (random inventory + task stream) with an
+increasing process pool and reports scenarios per second and the aggregate
+throughput and latency percentiles (identical for every pool size).
+
+Usage: python benchmark/bench_scenarios.py [--scenarios N] [--tasks N] [--out PATH]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src", "python"))
+
+from scenarios import run_scenarios  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scenarios", type=int, default=2000)
+    parser.add_argument("--tasks", type=int, default=20, help="tasks per scenario")
+    parser.add_argument("--trays", type=int, default=10, help="trays per scenario")
+    parser.add_argument("--out", help="keep the rows of the last sweep (.csv/.parquet)")
+    args = parser.parse_args()
+
+    cores = os.cpu_count() or 1
+    pools = sorted({1, 2, cores} & set(range(1, cores + 1)))
+    out = args.out or os.path.join(tempfile.mkdtemp(), "rows.csv")
+
+    print(
+        f"{'workers':>7} {'wall s':>7} {'scen/s':>8} {'tasks/h':>8} {'p50 s':>6} {'p99 s':>6}"
+    )
+    for workers in pools:
+        summary = run_scenarios(
+            range(args.scenarios),
+            out,
+            trays=args.trays,
+            tasks=args.tasks,
+            workers=workers,
+        )
+        p = summary.percentiles()
+        print(
+            f"{workers:>7} {summary.wall_time:>7.2f} "
+            f"{summary.scenarios / summary.wall_time:>8.0f} "
+            f"{summary.throughput:>8.1f} {p[50]:>6.2f} {p[99]:>6.2f}"
+        )
+    print(f"\nStatuses: {summary.statuses}\nRows: {out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Headless simulation throughput: production plans simulated per minute.
+
+Replays models/production_plan.json (or --plan) with the Simulator for each
+planner backend and reports the makespan, planner calls and plans/minute.
+
+Usage: python benchmark/bench_simulator.py [--plan PATH] [--runs N]
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src", "python"))
+
+from simulator import Simulator, load_plan  # noqa: E402
+
+DEFAULT_PLAN = os.path.join(
+    os.path.dirname(__file__), "..", "models", "production_plan.json"
+)
+BACKENDS = {
+    "python": dict(planner_backend="python"),
+    "egglog (plans)": dict(planner_backend="egglog", plan_missions=True),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--plan", default=DEFAULT_PLAN, help="production plan JSON")
+    parser.add_argument("--runs", type=int, default=1000, help="python backend runs")
+    args = parser.parse_args()
+    tasks = load_plan(args.plan)
+
+    print(
+        f"{'backend':<15} {'makespan s':>10} {'calls':>6} {'ms/plan':>8} {'plans/min':>10}"
+    )
+    for name, options in BACKENDS.items():
+        sim = Simulator(**options)
+        # egglog runs are ~100x slower; keep the total time comparable
+        runs = args.runs if options["planner_backend"] == "python" else 10
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            for _ in range(runs):
+                report = sim.run(tasks)
+            elapsed = (time.perf_counter() - start) / runs
+        print(
+            f"{name:<15} {report.makespan:>10.2f} {report.planner_calls:>6} "
+            f"{elapsed * 1e3:>8.2f} {60 / elapsed:>10.0f}"
+        )
+    print("\nPer task (last run):")
+    for t in report.tasks:
+        print(f"  {t.task_id:<4} {t.name:<14} {t.status:<9} latency {t.latency:6.2f} s")
+
+
+if __name__ == "__main__":
+    main()
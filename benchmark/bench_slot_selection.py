@@ -0,0 +1,75 @@
+"""
+Slot selection: nearest candidate vs first in layout order.
+
+Replays seeded task streams through the simulator twice, with
+FastPlanner.SELECT_NEAREST on and off, and compares the average duration
+of completed missions per task name. FetchAnyEmpty picks the empty tray
+and SendBack/Enqueue the free slot, so those are where selection matters.
+
+Usage: python benchmark/bench_slot_selection.py [--scenarios N] [--tasks N]
+"""
+
+import argparse
+import logging
+import os
+import random
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src", "python"))
+
+from fast_planner import FastPlanner  # noqa: E402
+from layout import read_layout  # noqa: E402
+from scenarios import DEFAULT_LAYOUT, random_inventory, random_tasks  # noqa: E402
+from simulator import Simulator  # noqa: E402
+from warehouse import Warehouse  # noqa: E402
+
+SELECTIONS = {"first": False, "nearest": True}
+
+
+def sweep(nearest: bool, scenarios: int, trays: int, tasks: int) -> dict:
+    """Return task name -> [total duration, completed] over all scenarios."""
+    FastPlanner.SELECT_NEAREST = nearest
+    base = read_layout(DEFAULT_LAYOUT)
+    totals = {}
+    for seed in range(scenarios):
+        rng = random.Random(seed)
+        layout = random_inventory(base, rng, trays)
+        stream = random_tasks(rng, trays, tasks)
+        report = Simulator(lambda: Warehouse(layout)).run(stream)
+        for task in report.tasks:
+            if task.status == "done":
+                total = totals.setdefault(task.name, [0.0, 0])
+                total[0] += task.latency
+                total[1] += 1
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scenarios", type=int, default=200)
+    parser.add_argument("--trays", type=int, default=12)
+    parser.add_argument("--tasks", type=int, default=20, help="tasks per scenario")
+    args = parser.parse_args()
+    logging.disable(logging.ERROR)
+
+    results = {
+        name: sweep(nearest, args.scenarios, args.trays, args.tasks)
+        for name, nearest in SELECTIONS.items()
+    }
+    FastPlanner.SELECT_NEAREST = True
+
+    print(f"{'task':<14} {'done':>6} {'first s':>8} {'nearest s':>10} {'saved':>7}")
+    names = sorted(results["first"]) + ["all"]
+    for name in names:
+        avg = {}
+        for selection, totals in results.items():
+            rows = totals.values() if name == "all" else [totals.get(name, [0, 0])]
+            duration, done = (sum(col) for col in zip(*rows))
+            avg[selection] = duration / done if done else 0.0
+        first, nearest = avg["first"], avg["nearest"]
+        saved = 1 - nearest / first if first else 0.0
+        print(f"{name:<14} {done:>6} {first:>8.2f} {nearest:>10.2f} {saved:>7.1%}")
+
+
+if __name__ == "__main__":
+    main()
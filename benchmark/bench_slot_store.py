@@ -0,0 +1,105 @@
+"""
+Object slots vs the columnar NumPy SlotStore on a large tower.
+
+Compares the "first empty storage slot" and "which slot holds tray N"
+queries, and the egglog fact sync after one tray move (full slot scan vs
+occupancy-array diff). Build memory (tracemalloc) is reported too: both
+backends keep one Python object per slot, so it stays about the same.
+
+Usage: python benchmark/bench_slot_store.py [--rows N]
+"""
+
+import argparse
+import os
+import sys
+import time
+import timeit
+import tracemalloc
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src", "python"))
+
+from cfg_engine import PlannerSession  # noqa: E402
+from warehouse import Warehouse  # noqa: E402
+
+
+def full_tower(rows: int) -> dict:
+    """Two-column tower with a tray in every storage slot but the top one."""
+    return {
+        "rows": rows,
+        "columns": [
+            {"name": "L", "x": -0.7},
+            {
+                "name": "R",
+                "x": 0.7,
+                "slots": {
+                    "0-2": {"type": "queue"},
+                    3: {"id": "in_view", "type": "bay"},
+                },
+            },
+        ],
+        "trays": [{"slot": f"storage_L_{r}", "weight": 3.5} for r in range(rows)]
+        + [{"slot": f"storage_R_{r}", "weight": 3.5} for r in range(4, rows - 1)],
+    }
+
+
+def build(rows: int, columnar: bool) -> tuple[Warehouse, int]:
+    """Return the warehouse and the bytes allocated to build it."""
+    tracemalloc.start()
+    wh = Warehouse(full_tower(rows), columnar=columnar)
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return wh, size
+
+
+def first_empty_scan(wh):
+    return next(
+        (s for s in wh._get_all_slots() if s.slot_type == "storage" and not s.tray),
+        None,
+    )
+
+
+def tray_scan(wh, tid):
+    return next((s for s in wh._get_all_slots() if s.tray and s.tray.tray_id == tid))
+
+
+def sync_after_move(wh) -> float:
+    """Seconds for PlannerSession.sync to apply one tray move."""
+    session = PlannerSession()
+    session.sync(wh)
+    src = wh.get_slot_by_tray(1)
+    first_empty_scan(wh).add_tray(src.remove_tray())
+    start = time.perf_counter()
+    session.sync(wh)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=10000, help="tower rows")
+    args = parser.parse_args()
+
+    print(
+        f"{'backend':<9} {'KiB':>8} {'first empty us':>15} {'tray of N us':>13} "
+        f"{'sync ms':>8}"
+    )
+    for columnar in (False, True):
+        wh, size = build(args.rows, columnar)
+        last = max(wh._slots_by_tray)
+        if columnar:
+            first = lambda: wh.store.first_empty("storage")  # noqa: E731
+            of_tray = lambda: wh.store.slot_of_tray(last)  # noqa: E731
+        else:
+            first = lambda: first_empty_scan(wh)  # noqa: E731
+            of_tray = lambda: tray_scan(wh, last)  # noqa: E731
+        first_us = timeit.timeit(first, number=100) * 1e4
+        tray_us = timeit.timeit(of_tray, number=100) * 1e4
+        sync_ms = sync_after_move(wh) * 1e3
+        name = "numpy" if columnar else "objects"
+        print(
+            f"{name:<9} {size / 1024:>8.0f} {first_us:>15.1f} {tray_us:>13.1f} "
+            f"{sync_ms:>8.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
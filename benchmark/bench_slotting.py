@@ -0,0 +1,99 @@
+"""
+Slotting optimizer: extract latency with and without idle-time relocations.
+
+Each seeded scenario fills a tall tower with trays and sends ExtractTray
+requests with a skewed (Zipf-like) tray popularity, each followed by a
+SendBack. Requests arrive with exponential gaps, so the platform is idle
+between them. Compares the mean and p90 extract latency without and with a
+SlottingOptimizer, and reports how many relocations ran or were preempted.
+
+Usage: python benchmark/bench_slotting.py [--rows N] [--gap S] [--scenarios N]
+"""
+
+import argparse
+import logging
+import os
+import random
+import statistics
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src", "python"))
+
+from layout import read_layout  # noqa: E402
+from scenarios import DEFAULT_LAYOUT, random_inventory  # noqa: E402
+from simulator import Simulator  # noqa: E402
+from slotting import SlottingOptimizer  # noqa: E402
+from warehouse import Warehouse  # noqa: E402
+
+
+def request_stream(
+    rng: random.Random, trays: int, extracts: int, gap: float, skew: float
+) -> list[dict]:
+    """ExtractTray/SendBack pairs; tray popularity falls off as 1/rank**skew."""
+    ranked = list(range(1, trays + 1))
+    rng.shuffle(ranked)
+    weights = [1 / (rank + 1) ** skew for rank in range(trays)]
+    tasks, at = [], 0.0
+    for _ in range(extracts):
+        at += rng.expovariate(1 / gap)
+        tray = rng.choices(ranked, weights)[0]
+        tasks.append({"name": "ExtractTray", "tray": tray, "at": at})
+        tasks.append({"name": "SendBack"})
+    return tasks
+
+
+def sweep(args, slotting) -> list[float]:
+    """Latencies of completed extracts over all scenarios."""
+    base = dict(read_layout(DEFAULT_LAYOUT), rows=args.rows)
+    latencies = []
+    for seed in range(args.scenarios):
+        rng = random.Random(seed)
+        layout = random_inventory(base, rng, args.trays)
+        stream = request_stream(rng, args.trays, args.extracts, args.gap, args.skew)
+        options = {"slotting": slotting} if slotting else {}
+        report = Simulator(lambda: Warehouse(layout), **options).run(stream)
+        latencies.extend(
+            t.latency
+            for t in report.tasks
+            if t.name == "ExtractTray" and t.status == "done"
+        )
+        if slotting:
+            args.relocations += slotting.relocations
+            args.preempted += slotting.preempted
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scenarios", type=int, default=10)
+    parser.add_argument("--rows", type=int, default=100)
+    parser.add_argument("--trays", type=int, default=180)
+    parser.add_argument("--extracts", type=int, default=200, help="per scenario")
+    parser.add_argument("--gap", type=float, default=200.0, help="mean gap (s)")
+    parser.add_argument("--skew", type=float, default=1.2)
+    parser.add_argument(
+        "--max-delay", type=float, default=SlottingOptimizer().max_delay
+    )
+    args = parser.parse_args()
+    logging.disable(logging.ERROR)
+    args.relocations = args.preempted = 0
+
+    print(f"{'slotting':<9} {'extracts':>8} {'mean s':>7} {'p90 s':>7} {'saved':>6}")
+    baseline = None
+    for name, slotting in (
+        ("off", None),
+        ("on", SlottingOptimizer(max_delay=args.max_delay)),
+    ):
+        latencies = sweep(args, slotting)
+        mean = statistics.mean(latencies)
+        p90 = statistics.quantiles(latencies, n=10)[-1]
+        baseline = baseline or mean
+        print(
+            f"{name:<9} {len(latencies):>8} {mean:>7.2f} {p90:>7.2f}"
+            f" {1 - mean / baseline:>6.1%}"
+        )
+    print(f"relocations: {args.relocations}, preempted: {args.preempted}")
+
+
+if __name__ == "__main__":
+    main()
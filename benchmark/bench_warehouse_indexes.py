@@ -0,0 +1,104 @@
+"""
+Warehouse lookup cost vs tower height: linear scans vs the slot/tray indexes.
+
+For each row count, times has_tray, get_slot_by_id, _get_all_slots and
+get_slot_at (grid and bisect spatial indexes) with the indexed Warehouse
+against the previous list-concatenate-and-scan code.
+
+Usage: python benchmark/bench_warehouse_indexes.py [--rows 20 100 1000 10000]
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import timeit
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src", "python"))
+
+from spatial_index import SortedIndex  # noqa: E402
+from warehouse import Warehouse  # noqa: E402
+
+
+def build(rows: int) -> Warehouse:
+    """Build a warehouse with the given number of rows (sample trays included)."""
+    layout = type("BenchWarehouse", (Warehouse,), {"NUM_ROWS": rows})
+    with contextlib.redirect_stdout(io.StringIO()):
+        return layout()
+
+
+def scan_all_slots(wh):
+    all_slots = wh.storage_slots + wh.queued_slots
+    if wh.in_view_slot:
+        all_slots.append(wh.in_view_slot)
+    return all_slots
+
+
+def scan_has_tray(wh, tid):
+    for slot in scan_all_slots(wh):
+        if slot.tray and slot.tray.tray_id == tid:
+            return True
+    return False
+
+
+def scan_slot_by_id(wh, slot_id):
+    for slot in scan_all_slots(wh):
+        if slot.slot_id == slot_id:
+            return slot
+    return None
+
+
+def scan_slot_at(wh, x, y):
+    for slot in scan_all_slots(wh):
+        if abs(slot.x - x) < 0.01 and abs(slot.y - y) < 0.01:
+            return slot
+    return None
+
+
+def per_call_us(fn, number: int) -> float:
+    return timeit.timeit(fn, number=number) / number * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, nargs="+", default=[20, 100, 1000, 10000])
+    args = parser.parse_args()
+
+    print(f"{'rows':>6} {'lookup':<15} {'scan us':>10} {'index us':>10} {'speedup':>8}")
+    for rows in args.rows:
+        wh = build(rows)
+        last = wh.storage_slots[-1]
+        last_id, lx, ly = last.slot_id, last.x, last.y
+        bisect = SortedIndex(wh._get_all_slots())
+        number = max(10, 200000 // rows)
+        cases = (
+            ("has_tray(miss)", lambda: scan_has_tray(wh, -1), lambda: wh.has_tray(-1)),
+            (
+                "get_slot_by_id",
+                lambda: scan_slot_by_id(wh, last_id),
+                lambda: wh.get_slot_by_id(last_id),
+            ),
+            ("_get_all_slots", lambda: scan_all_slots(wh), wh._get_all_slots),
+            (
+                "get_slot_at",
+                lambda: scan_slot_at(wh, lx, ly),
+                lambda: wh.get_slot_at(lx, ly),
+            ),
+            (
+                "  (bisect)",
+                lambda: scan_slot_at(wh, lx, ly),
+                lambda: bisect.lookup(lx, ly),
+            ),
+        )
+        for name, scan, indexed in cases:
+            before = per_call_us(scan, number)
+            after = per_call_us(indexed, 20000)
+            print(
+                f"{rows:>6} {name:<15} {before:>10.2f} {after:>10.3f} "
+                f"{before / after:>7.0f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
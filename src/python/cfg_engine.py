@@ -1,5 +1,15 @@
 from __future__ import annotations
+import logging
+import time
+from collections import Counter, OrderedDict
+from dataclasses import dataclass, field
 from egglog import *
+from fact_selector import FactSelector
+from layout import normalize_slot_type
+from warehouse_platform import Platform
+
+# Extraction cost of an unresolved query; above any travel-time cost (ms)
+UNRESOLVED_COST = 1_000_000_000
 
 
 class Tray(Expr):
@@ -73,6 +83,15 @@ class ActionResult(Expr):
     def wait(cls) -> ActionResult: ...
 
 
+class Selection(Expr):
+    """Candidate resolved for an open-ended command (any tray, any slot)."""
+
+    @classmethod
+    def tray(cls, tray_id: i64Like) -> Selection: ...
+    @classmethod
+    def slot(cls, slot_id: StringLike) -> Selection: ...
+
+
 class Command(Expr):
     """High-level commands given to the robot."""
 
@@ -86,6 +105,14 @@ class Command(Expr):
     def search_target(cls, stype: SlotType) -> Command: ...
     @classmethod
     def idle(cls) -> Command: ...
+    @method(cost=UNRESOLVED_COST)
+    def select(self, curr_y: f64Like, curr_x: f64Like) -> Selection: ...
+
+
+class AfterPick(Expr):
+    """Declares the command the robot follows once the tray is picked."""
+
+    def __init__(self, cmd: Command) -> None: ...
 
 
 class RobotState(Expr):
@@ -99,6 +126,7 @@ class RobotState(Expr):
         phase: MissionPhase,
         cmd: Command,
     ) -> None: ...
+    @method(cost=UNRESOLVED_COST)
     def next_action(self) -> ActionResult: ...
 
 
@@ -111,18 +139,58 @@ holding, is_f = vars_("holding is_f", Bool)
 (result,) = vars_("result", ActionResult)
 (phase,) = vars_("phase", MissionPhase)
 (locked_id,) = vars_("locked_id", String)
+(val,) = vars_("val", f64)
+(next_cmd,) = vars_("next_cmd", Command)
+(sel,) = vars_("sel", Selection)
 
 T, F = Bool(True), Bool(False)
 
-WAREHOUSE_RULES = (
-    # SEARCH TARGET: lock empty slot
+
+def _ms(seconds: f64) -> i64:
+    return (seconds * f64(1000.0)).to_i64()
+
+
+# Travel time (ms) from (cy, cx) to slot (sy, sx), as Platform.approach_time
+# at the platform speeds when the rules are built (no acceleration limit).
+# Used as extraction cost, so the nearest of several valid choices wins.
+def _travel_cost(cy: f64, cx: f64, sy: f64, sx: f64) -> i64:
+    """Slot in another row: retract X, travel Y, extend X."""
+    vx, vy = f64(Platform.extract_speed), f64(Platform.speed_y)
+    return _ms((abs(cx) + abs(sx)) / vx + abs(sy - cy) / vy)
+
+
+def _row_travel_cost(cx: f64, sx: f64) -> i64:
+    """Slot in the platform's row: travel X only."""
+    return _ms(abs(sx - cx) / f64(Platform.extract_speed))
+
+
+# Rules per controller command (cmd_type): a query only fires its own group
+SEARCH_TARGET_RULES = (
+    # SEARCH TARGET: lock the empty slot reached first
     rule(
         eq(result).to(
             RobotState(cy, cx, T, phase, Command.search_target(stype)).next_action()
         ),
         Slot(sid, stype, sx, sy, OptionTray.none()),
-    ).then(union(result).with_(ActionResult.lock(sid))),
-    
+        cy != sy,
+        name="search_target",
+    ).then(
+        union(result).with_(ActionResult.lock(sid)),
+        set_cost(ActionResult.lock(sid), _travel_cost(cy, cx, sy, sx)),
+    ),
+    rule(
+        eq(result).to(
+            RobotState(sy, cx, T, phase, Command.search_target(stype)).next_action()
+        ),
+        Slot(sid, stype, sx, sy, OptionTray.none()),
+        name="search_target_row",
+    ).then(
+        union(result).with_(ActionResult.lock(sid)),
+        set_cost(ActionResult.lock(sid), _row_travel_cost(cx, sx)),
+    ),
+)
+
+FETCH_RULES = (
     # FETCH: retract X
     rule(
         eq(result).to(
@@ -133,6 +201,7 @@ WAREHOUSE_RULES = (
         Slot(sid, stype, sx, sy, OptionTray.some(Tray(tid, is_f))),
         cy != sy,
         cx != f64(0.0),
+        name="fetch_retract_x",
     ).then(union(result).with_(ActionResult.update_x(f64(0.0)))),
 
     # FETCH: move Y
@@ -145,6 +214,7 @@ WAREHOUSE_RULES = (
         Slot(sid, stype, sx, sy, OptionTray.some(Tray(tid, is_f))),
         cy != sy,
         cx == f64(0.0),
+        name="fetch_move_y",
     ).then(union(result).with_(ActionResult.update_y(sy))),
 
     # FETCH: move X
@@ -156,6 +226,7 @@ WAREHOUSE_RULES = (
         ),
         Slot(sid, stype, sx, sy, OptionTray.some(Tray(tid, is_f))),
         cx != sx,
+        name="fetch_move_x",
     ).then(union(result).with_(ActionResult.update_x(sx))),
 
     # FETCH: pick
@@ -166,8 +237,11 @@ WAREHOUSE_RULES = (
             ).next_action()
         ),
         Slot(sid, stype, sx, sy, OptionTray.some(Tray(tid, is_f))),
+        name="fetch_pick",
     ).then(union(result).with_(ActionResult.pick())),
+)
 
+FETCH_ANY_EMPTY_RULES = (
     # FETCH_ANY_EMPTY: retract X
     rule(
         eq(result).to(
@@ -178,6 +252,7 @@ WAREHOUSE_RULES = (
         Slot(sid, stype, sx, sy, OptionTray.some(Tray(tid, F))),
         cy != sy,
         cx != f64(0.0),
+        name="fetch_any_empty_retract_x",
     ).then(union(result).with_(ActionResult.update_x(f64(0.0)))),
 
     # FETCH_ANY_EMPTY: move Y
@@ -190,6 +265,7 @@ WAREHOUSE_RULES = (
         Slot(sid, stype, sx, sy, OptionTray.some(Tray(tid, F))),
         cy != sy,
         cx == f64(0.0),
+        name="fetch_any_empty_move_y",
     ).then(union(result).with_(ActionResult.update_y(sy))),
 
     # FETCH_ANY_EMPTY: move X
@@ -201,6 +277,7 @@ WAREHOUSE_RULES = (
         ),
         Slot(sid, stype, sx, sy, OptionTray.some(Tray(tid, F))),
         cx != sx,
+        name="fetch_any_empty_move_x",
     ).then(union(result).with_(ActionResult.update_x(sx))),
 
     # FETCH_ANY_EMPTY: pick
@@ -211,8 +288,11 @@ WAREHOUSE_RULES = (
             ).next_action()
         ),
         Slot(sid, stype, sx, sy, OptionTray.some(Tray(tid, F))),
+        name="fetch_any_empty_pick",
     ).then(union(result).with_(ActionResult.pick())),
+)
 
+DELIVER_RULES = (
     # DELIVER: retract X
     rule(
         eq(result).to(
@@ -224,6 +304,7 @@ WAREHOUSE_RULES = (
         Slot(locked_id, stype, sx, sy, OptionTray.none()),
         cy != sy,
         cx != f64(0.0),
+        name="deliver_retract_x",
     ).then(union(result).with_(ActionResult.update_x(f64(0.0)))),
 
     # DELIVER: move Y
@@ -237,6 +318,7 @@ WAREHOUSE_RULES = (
         Slot(locked_id, stype, sx, sy, OptionTray.none()),
         cy != sy,
         cx == f64(0.0),
+        name="deliver_move_y",
     ).then(union(result).with_(ActionResult.update_y(sy))),
 
     # DELIVER: move X
@@ -249,6 +331,7 @@ WAREHOUSE_RULES = (
         LockedTarget(locked_id),
         Slot(locked_id, stype, sx, sy, OptionTray.none()),
         cx != sx,
+        name="deliver_move_x",
     ).then(union(result).with_(ActionResult.update_x(sx))),
 
     # DELIVER: place
@@ -260,14 +343,836 @@ WAREHOUSE_RULES = (
         ),
         LockedTarget(locked_id),
         Slot(locked_id, stype, sx, sy, OptionTray.none()),
+        name="deliver_place",
     ).then(union(result).with_(ActionResult.place())),
-    
+)
+
+IDLE_RULES = (
     # IDLE: wait
-    rewrite(RobotState(cy, cx, holding, phase, Command.idle()).next_action()).to(
-        ActionResult.wait()
+    rule(
+        eq(result).to(RobotState(cy, cx, holding, phase, Command.idle()).next_action()),
+        name="idle_wait",
+    ).then(union(result).with_(ActionResult.wait())),
+)
+
+COMMAND_RULES = {
+    "SEARCH_TARGET": SEARCH_TARGET_RULES,
+    "FETCH": FETCH_RULES,
+    "FETCH_ANY_EMPTY": FETCH_ANY_EMPTY_RULES,
+    "DELIVER": DELIVER_RULES,
+    "IDLE": IDLE_RULES,
+}
+WAREHOUSE_RULES = tuple(r for rules in COMMAND_RULES.values() for r in rules)
+
+# Mission-level rules: resolve open-ended commands and chain each action
+# into the robot state it leads to, so one run derives the whole mission.
+PLAN_RULES = ruleset(
+    # SELECT: the empty tray reached first
+    rule(
+        eq(sel).to(Command.fetch_any_empty().select(cy, cx)),
+        Slot(sid, stype, sx, sy, OptionTray.some(Tray(tid, F))),
+        cy != sy,
+    ).then(
+        union(sel).with_(Selection.tray(tid)),
+        set_cost(Selection.tray(tid), _travel_cost(cy, cx, sy, sx)),
+    ),
+    rule(
+        eq(sel).to(Command.fetch_any_empty().select(sy, cx)),
+        Slot(sid, stype, sx, sy, OptionTray.some(Tray(tid, F))),
+    ).then(
+        union(sel).with_(Selection.tray(tid)),
+        set_cost(Selection.tray(tid), _row_travel_cost(cx, sx)),
+    ),
+    # SELECT: the free slot of the requested type reached first
+    rule(
+        eq(sel).to(Command.search_target(stype).select(cy, cx)),
+        Slot(sid, stype, sx, sy, OptionTray.none()),
+        cy != sy,
+    ).then(
+        union(sel).with_(Selection.slot(sid)),
+        set_cost(Selection.slot(sid), _travel_cost(cy, cx, sy, sx)),
+    ),
+    rule(
+        eq(sel).to(Command.search_target(stype).select(sy, cx)),
+        Slot(sid, stype, sx, sy, OptionTray.none()),
+    ).then(
+        union(sel).with_(Selection.slot(sid)),
+        set_cost(Selection.slot(sid), _row_travel_cost(cx, sx)),
     ),
+    # STEP: Y reached
+    rule(
+        eq(ActionResult.update_y(val)).to(
+            RobotState(cy, cx, holding, phase, cmd).next_action()
+        ),
+    ).then(RobotState(val, cx, holding, phase, cmd).next_action()),
+    # STEP: X reached
+    rule(
+        eq(ActionResult.update_x(val)).to(
+            RobotState(cy, cx, holding, phase, cmd).next_action()
+        ),
+    ).then(RobotState(cy, val, holding, phase, cmd).next_action()),
+    # STEP: tray picked, switch to delivery
+    rule(
+        eq(ActionResult.pick()).to(
+            RobotState(cy, cx, F, MissionPhase.fetch(), cmd).next_action()
+        ),
+        AfterPick(next_cmd),
+    ).then(RobotState(cy, cx, T, MissionPhase.deliver(), next_cmd).next_action()),
+    name="plan",
 )
 
+# Upper bound on the length of a replayed mission plan.
+MAX_PLAN_STEPS = 16
+
+
+def _slot_type_expr(slot_type: str) -> SlotType:
+    """Map a slot type name to its egglog constructor (storage by default)."""
+    slot_type = normalize_slot_type(slot_type)
+    if slot_type == "queue":
+        return SlotType.queue()
+    if slot_type == "bay":
+        return SlotType.bay()
+    return SlotType.storage()
+
+
+def _slot_key(s) -> tuple:
+    """Return the fields of a slot that its egglog fact depends on."""
+    if s.tray:
+        return (s.slot_type, s.x, s.y, int(s.tray.tray_id), bool(s.tray.is_full))
+    return (s.slot_type, s.x, s.y, None, None)
+
+
+def _slot_fact(s) -> Slot:
+    """Convert a warehouse slot into its egglog Slot fact."""
+    egg_tray = OptionTray.none()
+    if s.tray:
+        egg_tray = OptionTray.some(Tray(int(s.tray.tray_id), Bool(s.tray.is_full)))
+    return Slot(s.slot_id, _slot_type_expr(s.slot_type), f64(s.x), f64(s.y), egg_tray)
+
+
+def _command_expr(cmd_type: str, target_id: int, target_type: str) -> Command:
+    """Build the egglog Command for a controller command name."""
+    if cmd_type == "FETCH":
+        return Command.fetch_tray(i64(target_id))
+    if cmd_type == "DELIVER":
+        return Command.deliver_to(_slot_type_expr(target_type))
+    if cmd_type == "FETCH_ANY_EMPTY":
+        return Command.fetch_any_empty()
+    if cmd_type == "SEARCH_TARGET":
+        return Command.search_target(_slot_type_expr(target_type))
+    return Command.idle()
+
+
+def _query_expr(
+    cy: float,
+    cx: float,
+    holding: bool,
+    phase: str,
+    cmd_type: str,
+    target_id: int,
+    target_type: str,
+) -> ActionResult:
+    """Build the next_action query term for a robot state and command."""
+    phase_expr = MissionPhase.deliver() if phase == "deliver" else MissionPhase.fetch()
+    cmd_expr = _command_expr(cmd_type, target_id, target_type)
+    return RobotState(
+        f64(cy), f64(cx), Bool(holding), phase_expr, cmd_expr
+    ).next_action()
+
+
+@dataclass(frozen=True)
+class RobotAction:
+    """Typed planner decision: action kind plus its parameter, if any."""
+
+    type: str
+    val: float | None = None
+    slot_id: str | None = None
+
+
+WAIT = RobotAction("wait")
+
+_ACTION_KINDS = {
+    ActionResult.update_y: "update_y",
+    ActionResult.update_x: "update_x",
+    ActionResult.pick: "pick",
+    ActionResult.place: "place",
+    ActionResult.lock: "lock",
+    ActionResult.wait: "wait",
+}
+
+
+def _to_action(best: ActionResult) -> RobotAction:
+    """Read an extracted ActionResult constructor and its arguments."""
+    kind = _ACTION_KINDS.get(get_callable_fn(best))
+    if kind is None:
+        # No rule fired: the query is still the bare next_action() call
+        return WAIT
+    if kind in ("update_y", "update_x"):
+        return RobotAction(kind, val=get_literal_value(get_callable_args(best)[0]))
+    if kind == "lock":
+        return RobotAction(kind, slot_id=get_literal_value(get_callable_args(best)[0]))
+    return RobotAction(kind)
+
+
+def _action_expr(action: RobotAction) -> ActionResult:
+    """Inverse of _to_action: build the ActionResult term for a decision."""
+    if action.type in ("update_y", "update_x"):
+        return getattr(ActionResult, action.type)(f64(action.val))
+    if action.type == "lock":
+        return ActionResult.lock(String(action.slot_id))
+    return getattr(ActionResult, action.type)()
+
+
+def _extract_action(egraph: EGraph, query: ActionResult) -> RobotAction:
+    """Extract the best action for query from a saturated e-graph."""
+    try:
+        return _to_action(egraph.extract(query))
+    except Exception as e:
+        logging.error(f"Egglog extraction failed: {e}")
+        return WAIT
+
+
+def _resolved_action(egraph: EGraph, query: ActionResult) -> RobotAction | None:
+    """Best action derived for query so far, or None if no rule has fired."""
+    try:
+        best = egraph.extract(query)
+    except Exception as e:
+        logging.error(f"Egglog extraction failed: {e}")
+        return WAIT
+    if get_callable_fn(best) not in _ACTION_KINDS:
+        return None
+    return _to_action(best)
+
+
+def _rule_name(rule_decl) -> str:
+    """Stats key of a rule: its name= (rewrites and unnamed rules share one)."""
+    return getattr(rule_decl, "name", None) or "unnamed"
+
+
+class SaturationSchedule:
+    """
+    Bounded, adaptive rule runs for next_action queries.
+
+    Instead of a fixed number of iterations, the rules run one iteration at
+    a time and stop as soon as every query's e-class holds an ActionResult
+    constructor (checked by extraction: an unresolved query only extracts to
+    its costly next_action() call). Every rule matches the query and the
+    slot facts directly, so all candidates are derived in the same
+    iteration and the first action found is final. Runs also stop when the
+    e-graph saturates (a query no rule matches is a wait), after
+    max_iterations, or once time_budget seconds have passed; queries still
+    unresolved then wait. With adaptive=False, the schedule runs
+    max_iterations in one call as before (for comparison).
+
+    stats counts runs, iterations, why each run stopped, the run time and,
+    per rule name, the matches and search/apply time.
+    """
+
+    def __init__(
+        self,
+        max_iterations: int = 10,
+        time_budget: float | None = None,
+        adaptive: bool = True,
+    ):
+        self.max_iterations = max_iterations
+        self.time_budget = time_budget
+        self.adaptive = adaptive
+        self.reset()
+
+    def reset(self):
+        """Zero the counters."""
+        self.runs = 0
+        self.iterations = 0
+        # Why each run stopped: "resolved", "saturated", "max_iterations", "budget"
+        self.stops: Counter = Counter()
+        self.run_time = 0.0
+        self.rule_matches: Counter = Counter()
+        self.rule_time: Counter = Counter()
+
+    def _record(self, report):
+        """Add the iterations and per-rule counters of one egglog run."""
+        self.iterations += len(report.iterations)
+        for rule_decl, matches in report.num_matches_per_rule.items():
+            self.rule_matches[_rule_name(rule_decl)] += matches
+        for rule_decl, spent in report.search_and_apply_time_per_rule.items():
+            self.rule_time[_rule_name(rule_decl)] += spent.total_seconds()
+
+    def run(self, egraph: EGraph, queries: list[ActionResult]) -> list[RobotAction]:
+        """Run the rules on egraph (queries registered) and extract each action."""
+        self.runs += 1
+        start = time.perf_counter()
+        if not self.adaptive:
+            self._record(egraph.run(self.max_iterations))
+            self.run_time += time.perf_counter() - start
+            self.stops["max_iterations"] += 1
+            return [_extract_action(egraph, q) for q in queries]
+
+        actions: list[RobotAction | None] = [None] * len(queries)
+        pending = list(range(len(queries)))
+        stop = "max_iterations"
+        for _ in range(self.max_iterations):
+            report = egraph.run(1)
+            self._record(report)
+            for i in pending:
+                actions[i] = _resolved_action(egraph, queries[i])
+            pending = [i for i in pending if actions[i] is None]
+            if not pending:
+                stop = "resolved"
+                break
+            if not report.updated:
+                stop = "saturated"
+                break
+            elapsed = time.perf_counter() - start
+            if self.time_budget is not None and elapsed >= self.time_budget:
+                stop = "budget"
+                break
+        self.run_time += time.perf_counter() - start
+        self.stops[stop] += 1
+        return [WAIT if a is None else a for a in actions]
+
+    @property
+    def stats(self) -> dict:
+        return {
+            "runs": self.runs,
+            "iterations": self.iterations,
+            "stops": dict(self.stops),
+            "run_time": self.run_time,
+            "rule_matches": dict(self.rule_matches),
+            "rule_time": dict(self.rule_time),
+        }
+
+
+@dataclass
+class PlanStep:
+    """One planned action and the slot it touches (pick, place or lock)."""
+
+    action: RobotAction
+    slot_id: str = ""
+    tray_id: int | None = None
+
+
+@dataclass
+class MissionPlan:
+    """
+    Ordered actions for the rest of a mission, replayed one tick at a time.
+
+    Motion steps are held until the platform reaches their target; pick,
+    place and lock are handed out once. The plan only stays valid while
+    the slots its remaining steps rely on are unchanged.
+    """
+
+    steps: list[PlanStep] = field(default_factory=list)
+    cursor: int = 0
+
+    @property
+    def done(self) -> bool:
+        return self.cursor >= len(self.steps)
+
+    def next_action(self, cy: float, cx: float) -> RobotAction:
+        """Return the action for the current platform position."""
+        while not self.done:
+            action = self.steps[self.cursor].action
+            atype = action.type
+            if (atype == "update_y" and cy == action.val) or (
+                atype == "update_x" and cx == action.val
+            ):
+                self.cursor += 1
+                continue
+            if atype not in ("update_y", "update_x"):
+                self.cursor += 1
+            return action
+        return WAIT
+
+    def is_valid(self, warehouse) -> bool:
+        """Check the slots used by the remaining steps still look as planned."""
+        for step in self.steps[self.cursor :]:
+            if not step.slot_id:
+                continue
+            slot = warehouse.get_slot_by_id(step.slot_id)
+            if slot is None:
+                return False
+            held = int(slot.tray.tray_id) if slot.tray else None
+            if held != step.tray_id:
+                return False
+        return True
+
+
+def _extract_selection(egraph: EGraph, query: Selection) -> int | str | None:
+    """Extract the tray ID or slot ID chosen for a select() query."""
+    best = egraph.extract(query)
+    fn = get_callable_fn(best)
+    if fn == Selection.tray or fn == Selection.slot:
+        return get_literal_value(get_callable_args(best)[0])
+    return None
+
+
+def _select(egraph: EGraph, query: Selection) -> int | str | None:
+    """Resolve a select() query: the candidate reached first, or None."""
+    egraph.register(query)
+    egraph.run(run(PLAN_RULES).saturate())
+    return _extract_selection(egraph, query)
+
+
+# Optional fields of a query dict (the rest: cy, cx, holding, phase, cmd_type)
+QUERY_DEFAULTS = {"target_id": 0, "target_type": "", "locked_id": ""}
+# Commands whose rules rank candidates by the travel time from the query
+# position: two positions in one e-graph would give a term two costs
+NEAREST_COMMANDS = frozenset({"FETCH_ANY_EMPTY", "SEARCH_TARGET"})
+
+
+def _batch_groups(queries: list[dict]) -> list[list[int]]:
+    """
+    Split queries (with QUERY_DEFAULTS applied) into groups that can share
+    one e-graph scope: the same locked_id (LockedTarget facts apply to every
+    query) and at most one position for the nearest-candidate commands.
+    Returns the query indexes of each group.
+    """
+    groups: dict[tuple, list[int]] = {}
+    # locked_id -> key of the group that takes the position-free queries
+    open_group: dict[str, tuple] = {}
+    for i, q in enumerate(queries):
+        if q["cmd_type"] in NEAREST_COMMANDS:
+            key = (q["locked_id"], (q["cy"], q["cx"]))
+            open_group.setdefault(q["locked_id"], key)
+            groups.setdefault(key, []).append(i)
+    for i, q in enumerate(queries):
+        if q["cmd_type"] not in NEAREST_COMMANDS:
+            key = open_group.setdefault(q["locked_id"], (q["locked_id"], None))
+            groups.setdefault(key, []).append(i)
+    return list(groups.values())
+
+
+def _next_actions(
+    egraph: EGraph, queries: list[dict], schedule: SaturationSchedule
+) -> list[RobotAction]:
+    """
+    Answer queries that share one scope (see _batch_groups) on an e-graph
+    that already holds the slots, with one run per stage.
+    """
+    for locked_id in {q["locked_id"] for q in queries if q["locked_id"]}:
+        egraph.register(LockedTarget(String(locked_id)))
+
+    states = [
+        (q["cy"], q["cx"], q["holding"], q["phase"], q["cmd_type"], q["target_id"])
+        for q in queries
+    ]
+    # Head for the nearest empty tray only, not for any of them
+    selects = {
+        i: Command.fetch_any_empty().select(f64(cy), f64(cx))
+        for i, (cy, cx, holding, phase, cmd_type, _) in enumerate(states)
+        if cmd_type == "FETCH_ANY_EMPTY" and phase == "fetch" and not holding
+    }
+    if selects:
+        egraph.register(*selects.values())
+        egraph.run(run(PLAN_RULES).saturate())
+        for i, select in selects.items():
+            tray = _extract_selection(egraph, select)
+            states[i] = states[i][:4] + (("FETCH", tray) if tray else (None, 0))
+
+    exprs = {
+        i: _query_expr(*state, queries[i]["target_type"])
+        for i, state in enumerate(states)
+        if state[4] is not None
+    }
+    actions = [WAIT] * len(queries)
+    if exprs:
+        egraph.register(*exprs.values())
+        for i, action in zip(exprs, schedule.run(egraph, list(exprs.values()))):
+            actions[i] = action
+    return actions
+
+
+def _command_rules(queries: list[dict]) -> list:
+    """Rule groups of the commands in queries (unknown commands idle)."""
+    kinds = {q["cmd_type"] for q in queries}
+    if not kinds <= COMMAND_RULES.keys():
+        kinds.add("IDLE")
+    if "FETCH_ANY_EMPTY" in kinds:
+        # Once its tray is selected, the query is answered as a FETCH
+        kinds.add("FETCH")
+    return [r for cmd, rules in COMMAND_RULES.items() if cmd in kinds for r in rules]
+
+
+def _answer_batch(
+    egraph: EGraph, queries: list[dict], schedule: SaturationSchedule
+) -> list[RobotAction]:
+    """Answer queries group by group, each group in its own push/pop scope."""
+    queries = [{**QUERY_DEFAULTS, **q} for q in queries]
+    actions: list[RobotAction] = [WAIT] * len(queries)
+    for group in _batch_groups(queries):
+        egraph.push()
+        try:
+            answers = _next_actions(egraph, [queries[i] for i in group], schedule)
+        finally:
+            egraph.pop()
+        for i, action in zip(group, answers):
+            actions[i] = action
+    return actions
+
+
+def _plan_mission(
+    egraph: EGraph,
+    warehouse,
+    cy: float,
+    cx: float,
+    holding: bool,
+    phase: str,
+    cmd_type: str,
+    target_id: int,
+    target_type: str,
+    locked_id: str,
+    deliver_id: str,
+) -> MissionPlan:
+    """
+    Derive the remaining mission on an e-graph that already holds the slots.
+
+    Open-ended choices (which empty tray, which free slot) are resolved
+    first, each to the candidate reached first: the tray from the platform,
+    the slot from where the tray is picked up. The last run chains every
+    action into its successor state so the whole plan is read back without
+    further saturation.
+    """
+    if phase == "fetch":
+        deliver_id = deliver_id or locked_id
+    searching = (phase == "fetch" and not deliver_id) or cmd_type == "SEARCH_TARGET"
+
+    if cmd_type == "FETCH_ANY_EMPTY":
+        tray = _select(egraph, Command.fetch_any_empty().select(f64(cy), f64(cx)))
+        if tray is None:
+            return MissionPlan()
+        cmd_type, target_id = "FETCH", tray
+
+    steps = []
+    if searching:
+        oy, ox = cy, cx
+        if phase == "fetch":
+            for s in warehouse._get_all_slots():
+                if s.tray and int(s.tray.tray_id) == target_id:
+                    oy, ox = s.y, s.x
+        search = Command.search_target(_slot_type_expr(target_type))
+        deliver_id = _select(egraph, search.select(f64(oy), f64(ox))) or ""
+        if phase == "deliver":
+            if not deliver_id:
+                return MissionPlan()
+            steps.append(PlanStep(RobotAction("lock", slot_id=deliver_id), deliver_id))
+            cmd_type = "DELIVER"
+
+    if phase == "deliver":
+        deliver_id = deliver_id or locked_id
+    if deliver_id:
+        egraph.register(LockedTarget(String(deliver_id)))
+        egraph.register(AfterPick(_command_expr("DELIVER", 0, target_type)))
+
+    state = (cy, cx, holding, phase, cmd_type, target_id, target_type)
+    egraph.register(_query_expr(*state))
+    egraph.run((run() + run(PLAN_RULES)).saturate())
+
+    slots_at = {(s.x, s.y): s for s in warehouse._get_all_slots()}
+    for _ in range(MAX_PLAN_STEPS):
+        action = _extract_action(egraph, _query_expr(*state))
+        atype = action.type
+        if atype == "wait":
+            break
+        cy, cx, holding, phase, cmd_type, target_id, target_type = state
+        if atype == "update_y":
+            steps.append(PlanStep(action))
+            state = (
+                action.val,
+                cx,
+                holding,
+                phase,
+                cmd_type,
+                target_id,
+                target_type,
+            )
+        elif atype == "update_x":
+            steps.append(PlanStep(action))
+            state = (
+                cy,
+                action.val,
+                holding,
+                phase,
+                cmd_type,
+                target_id,
+                target_type,
+            )
+        elif atype == "pick":
+            slot = slots_at.get((cx, cy))
+            steps.append(PlanStep(action, slot.slot_id if slot else "", target_id))
+            if not deliver_id:
+                break
+            if searching:
+                steps.append(
+                    PlanStep(RobotAction("lock", slot_id=deliver_id), deliver_id)
+                )
+            state = (cy, cx, True, "deliver", "DELIVER", target_id, target_type)
+        else:
+            steps.append(PlanStep(action, deliver_id))
+            break
+    return MissionPlan(steps)
+
+
+class PlannerSession:
+    """
+    Long-lived egglog planner.
+
+    The rules are registered once and the slot facts are kept in sync with
+    the warehouse by applying only the slots whose occupancy changed since
+    the previous query. Each query runs inside a push/pop scope, so the
+    base e-graph only ever holds rules and slot facts. Queries run under a
+    SaturationSchedule, whose stats cover the whole session.
+    """
+
+    def __init__(
+        self, rules=WAREHOUSE_RULES, schedule: SaturationSchedule | None = None
+    ):
+        self.egraph = EGraph()
+        self.schedule = schedule or SaturationSchedule()
+        self.egraph.register(*rules)
+        # slot_id -> (slot key, registered Slot fact)
+        self._facts: dict[str, tuple[tuple, Slot]] = {}
+        self._synced_hash: int | None = None
+        # SlotStore occupancy at the last sync (columnar warehouses only)
+        self._snapshot: tuple | None = None
+        # Warehouse of the last sync; a different one invalidates the two above
+        self._warehouse = None
+
+    def sync(self, warehouse) -> int:
+        """Apply slot deltas from warehouse. Returns the number of facts changed."""
+        if warehouse is not self._warehouse:
+            # Sessions can be reused across warehouses: diff all slots once,
+            # after dropping the facts of slots the new one does not have
+            self._warehouse = warehouse
+            self._synced_hash = None
+            self._snapshot = None
+            present = {s.slot_id for s in warehouse._get_all_slots()}
+            for slot_id in [i for i in self._facts if i not in present]:
+                self.egraph.register(delete(self._facts.pop(slot_id)[1]))
+        # Warehouses that track an occupancy hash let us skip the slot scan
+        occupancy = getattr(warehouse, "occupancy_hash", None)
+        if occupancy is not None and occupancy == self._synced_hash:
+            return 0
+        self._synced_hash = occupancy
+
+        store = getattr(warehouse, "store", None)
+        if store is not None:
+            # Columnar warehouses diff the occupancy arrays instead
+            candidates = [store.views[i] for i in store.changed_since(self._snapshot)]
+            self._snapshot = store.snapshot()
+        else:
+            candidates = warehouse._get_all_slots()
+
+        changed = 0
+        for s in candidates:
+            key = _slot_key(s)
+            known = self._facts.get(s.slot_id)
+            if known is not None and known[0] == key:
+                continue
+            if known is not None:
+                self.egraph.register(delete(known[1]))
+            fact = _slot_fact(s)
+            # Inserted through an action rather than a top-level expression:
+            # egglog binds top-level expressions to a global once, so a fact
+            # that was deleted could not be registered again.
+            self.egraph.register(union(fact).with_(fact))
+            self._facts[s.slot_id] = (key, fact)
+            changed += 1
+        return changed
+
+    def next_action(
+        self,
+        warehouse,
+        cy: float,
+        cx: float,
+        holding: bool,
+        phase: str,
+        cmd_type: str,
+        target_id: int = 0,
+        target_type: str = "",
+        locked_id: str = "",
+    ) -> RobotAction:
+        """Same contract as get_next_action_from_egglog, on the live e-graph."""
+        query = dict(
+            cy=cy,
+            cx=cx,
+            holding=holding,
+            phase=phase,
+            cmd_type=cmd_type,
+            target_id=target_id,
+            target_type=target_type,
+            locked_id=locked_id,
+        )
+        return self.next_actions(warehouse, [query])[0]
+
+    def next_actions(self, warehouse, queries: list[dict]) -> list[RobotAction]:
+        """
+        Answer a batch of queries against one warehouse snapshot.
+
+        Each query is a dict of next_action's arguments (target_id,
+        target_type and locked_id are optional). The slots are synced once
+        and the queries are registered together, so a batch costs one
+        saturation instead of one per query. Queries that cannot share an
+        e-graph (different locked_id, or FETCH_ANY_EMPTY/SEARCH_TARGET from
+        different positions) get one push/pop scope per group.
+        """
+        self.sync(warehouse)
+        return _answer_batch(self.egraph, queries, self.schedule)
+
+    def verify(
+        self,
+        warehouse,
+        action: RobotAction,
+        cy: float,
+        cx: float,
+        holding: bool,
+        phase: str,
+        cmd_type: str,
+        target_id: int = 0,
+        target_type: str = "",
+        locked_id: str = "",
+    ) -> bool:
+        """
+        Check a decision made outside egglog against the rules.
+
+        A non-wait action is accepted when the rules union it into the query's
+        e-class, so any of several equally valid choices (e.g. which free slot
+        to lock) passes. A wait is accepted when no rule derives an action.
+        """
+        self.sync(warehouse)
+        query = _query_expr(cy, cx, holding, phase, cmd_type, target_id, target_type)
+
+        self.egraph.push()
+        try:
+            if locked_id:
+                self.egraph.register(LockedTarget(String(locked_id)))
+            self.egraph.register(query)
+            best = self.schedule.run(self.egraph, [query])[0]
+            if action == WAIT:
+                return best == WAIT
+            return self.egraph.check_bool(eq(query).to(_action_expr(action)))
+        finally:
+            self.egraph.pop()
+
+    def plan_mission(
+        self,
+        warehouse,
+        cy: float,
+        cx: float,
+        holding: bool,
+        phase: str,
+        cmd_type: str,
+        target_id: int = 0,
+        target_type: str = "",
+        locked_id: str = "",
+        deliver_id: str = "",
+    ) -> MissionPlan:
+        """Same contract as plan_mission, on the live e-graph."""
+        self.sync(warehouse)
+        self.egraph.push()
+        try:
+            return _plan_mission(
+                self.egraph,
+                warehouse,
+                cy,
+                cx,
+                holding,
+                phase,
+                cmd_type,
+                target_id,
+                target_type,
+                locked_id,
+                deliver_id,
+            )
+        finally:
+            self.egraph.pop()
+
+
+class ActionCache:
+    """
+    LRU cache of planner decisions for one warehouse.
+
+    Keys combine the query inputs with the warehouse occupancy hash. The
+    rules only compare the platform position for equality with slot
+    coordinates (and X with 0.0), so any position off those values is
+    folded into a single OFF_GRID class: a Y move in progress hits the
+    same entry on every tick. Commands that pick the nearest candidate
+    depend on the exact position and are never folded.
+    """
+
+    OFF_GRID = None
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: OrderedDict[tuple, RobotAction] = OrderedDict()
+        self._xs: frozenset[float] = frozenset()
+        self._ys: frozenset[float] = frozenset()
+
+    def key(
+        self,
+        warehouse,
+        cy: float,
+        cx: float,
+        holding: bool,
+        phase: str,
+        cmd_type: str,
+        target_id: int = 0,
+        target_type: str = "",
+        locked_id: str = "",
+    ) -> tuple:
+        """Build the cache key for a query against warehouse."""
+        if not self._ys:
+            slots = warehouse._get_all_slots()
+            self._xs = frozenset(s.x for s in slots) | {0.0}
+            self._ys = frozenset(s.y for s in slots)
+        exact = cmd_type in NEAREST_COMMANDS
+        return (
+            cy if exact or cy in self._ys else self.OFF_GRID,
+            cx if exact or cx in self._xs else self.OFF_GRID,
+            holding,
+            phase,
+            cmd_type,
+            target_id,
+            target_type,
+            locked_id,
+            warehouse.occupancy_hash,
+        )
+
+    def get(self, key: tuple) -> RobotAction | None:
+        """Return the cached action for key, or None on a miss."""
+        action = self._entries.get(key)
+        if action is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return action
+
+    def put(self, key: tuple, action: RobotAction):
+        """Store action, evicting the least recently used entry if full."""
+        self._entries[key] = action
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        """Drop every entry and reset the counters."""
+        self._entries.clear()
+        self.hits = self.misses = self.evictions = 0
+
+    @property
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self._entries),
+        }
+
+
 def get_next_action_from_egglog(
     warehouse,
     cy: float,
@@ -278,96 +1183,140 @@ def get_next_action_from_egglog(
     target_id: int = 0,
     target_type: str = "",
     locked_id: str = "",
-) -> dict:
+    session: PlannerSession | None = None,
+    cache: ActionCache | None = None,
+) -> RobotAction:
     """
-    Query egglog for next action. Returns {type, args} with typed fields.
+    Query egglog for next action. Returns a RobotAction with typed fields.
     Phase must be 'fetch' or 'deliver'.
+    If a PlannerSession is given, the query runs on its persistent e-graph
+    instead of a freshly built one. If an ActionCache is given, it is
+    consulted first; the warehouse must then provide occupancy_hash.
     """
-    egraph = EGraph()
-    egraph.register(*WAREHOUSE_RULES)
+    if cache is not None:
+        query = dict(
+            cy=cy,
+            cx=cx,
+            holding=holding,
+            phase=phase,
+            cmd_type=cmd_type,
+            target_id=target_id,
+            target_type=target_type,
+            locked_id=locked_id,
+        )
+        key = cache.key(warehouse, **query)
+        action = cache.get(key)
+        if action is None:
+            action = get_next_action_from_egglog(warehouse, **query, session=session)
+            cache.put(key, action)
+        return action
 
-    for s in warehouse._get_all_slots():
-        egg_tray = OptionTray.none()
-        if s.tray:
-            egg_tray = OptionTray.some(Tray(int(s.tray.tray_id), Bool(s.tray.is_full)))
-
-        stype_expr = (
-            SlotType.queue()
-            if s.slot_type == "queue"
-            else SlotType.bay()
-            if s.slot_type == "bay"
-            else SlotType.storage()
+    if session is not None:
+        return session.next_action(
+            warehouse,
+            cy,
+            cx,
+            holding,
+            phase,
+            cmd_type,
+            target_id=target_id,
+            target_type=target_type,
+            locked_id=locked_id,
         )
-        egraph.register(Slot(s.slot_id, stype_expr, f64(s.x), f64(s.y), egg_tray))
 
-    if locked_id:
-        egraph.register(LockedTarget(String(locked_id)))
+    query = dict(
+        cy=cy,
+        cx=cx,
+        holding=holding,
+        phase=phase,
+        cmd_type=cmd_type,
+        target_id=target_id,
+        target_type=target_type,
+        locked_id=locked_id,
+    )
+    return get_next_actions_from_egglog(warehouse, [query])[0]
 
-    phase_expr = MissionPhase.deliver() if phase == "deliver" else MissionPhase.fetch()
 
-    if cmd_type == "FETCH":
-        cmd_expr = Command.fetch_tray(i64(target_id))
-    elif cmd_type == "DELIVER":
-        st_expr = (
-            SlotType.queue()
-            if target_type == "queue"
-            else SlotType.bay()
-            if target_type == "bay"
-            else SlotType.storage()
-        )
-        cmd_expr = Command.deliver_to(st_expr)
-    elif cmd_type == "FETCH_ANY_EMPTY":
-        cmd_expr = Command.fetch_any_empty()
-    elif cmd_type == "SEARCH_TARGET":
-        st_expr = (
-            SlotType.queue()
-            if target_type == "queue"
-            else SlotType.bay()
-            if target_type == "bay"
-            else SlotType.storage()
-        )
-        cmd_expr = Command.search_target(st_expr)
-    else:
-        cmd_expr = Command.idle()
+def get_next_actions_from_egglog(
+    warehouse,
+    queries: list[dict],
+    session: PlannerSession | None = None,
+    schedule: SaturationSchedule | None = None,
+    selector: FactSelector | None = None,
+) -> list[RobotAction]:
+    """
+    Batch form of get_next_action_from_egglog: one RobotAction per query
+    dict (same keyword arguments; target_id, target_type and locked_id are
+    optional), all against the same warehouse snapshot. The e-graph is
+    built once and saturated once per group of compatible queries (see
+    PlannerSession.next_actions), which is usually a single group. It only
+    holds the rule groups (COMMAND_RULES) of the batch's commands and the
+    candidate slots a FactSelector picks for them; pass one to reuse its
+    indexes across calls. schedule bounds each run (a session uses its
+    own, session.schedule).
+    """
+    if session is not None:
+        return session.next_actions(warehouse, queries)
+    if not queries:
+        return []
 
-    query = RobotState(
-        f64(cy), f64(cx), Bool(holding), phase_expr, cmd_expr
-    ).next_action()
-    egraph.register(query)
-    egraph.run(10)
+    egraph = EGraph()
+    egraph.register(*_command_rules(queries))
 
-    try:
-        best = egraph.extract(query)
-        s = str(best)
-
-        if "update_y(" in s:
-            val = float(
-                [
-                    x
-                    for x in s.replace("(", " ").replace(")", " ").split()
-                    if x.replace(".", "").replace("-", "").isdigit()
-                ][0]
-            )
-            return {"type": "update_y", "val": val}
-        elif "update_x(" in s:
-            val = float(
-                [
-                    x
-                    for x in s.replace("(", " ").replace(")", " ").split()
-                    if x.replace(".", "").replace("-", "").isdigit()
-                ][0]
-            )
-            return {"type": "update_x", "val": val}
-        elif "pick(" in s:
-            return {"type": "pick"}
-        elif "place(" in s:
-            return {"type": "place"}
-        elif "lock(" in s:
-            import re
-
-            m = re.search(r'"([^"]*)"', s)
-            return {"type": "lock", "slot_id": m.group(1) if m else ""}
-        return {"type": "wait"}
-    except Exception as e:
-        logging.error(f"Egglog extraction failed: {e}")
-        return {"type": "wait"}
+    selector = selector or FactSelector()
+    for s in selector.select(warehouse, queries):
+        egraph.register(_slot_fact(s))
+
+    return _answer_batch(egraph, queries, schedule or SaturationSchedule())
+
+
+def plan_mission(
+    warehouse,
+    cy: float,
+    cx: float,
+    holding: bool,
+    phase: str,
+    cmd_type: str,
+    target_id: int = 0,
+    target_type: str = "",
+    locked_id: str = "",
+    deliver_id: str = "",
+    session: PlannerSession | None = None,
+) -> MissionPlan:
+    """
+    Plan every remaining action of a mission in at most two egglog runs.
+    Takes the same state as get_next_action_from_egglog; in the fetch phase
+    target_type is the delivery slot type and deliver_id the destination
+    slot if it is already known (otherwise a free slot is searched for).
+    """
+    if session is not None:
+        return session.plan_mission(
+            warehouse,
+            cy,
+            cx,
+            holding,
+            phase,
+            cmd_type,
+            target_id=target_id,
+            target_type=target_type,
+            locked_id=locked_id,
+            deliver_id=deliver_id,
+        )
+
+    egraph = EGraph()
+    egraph.register(*WAREHOUSE_RULES)
+    for s in warehouse._get_all_slots():
+        egraph.register(_slot_fact(s))
+    return _plan_mission(
+        egraph,
+        warehouse,
+        cy,
+        cx,
+        holding,
+        phase,
+        cmd_type,
+        target_id,
+        target_type,
+        locked_id,
+        deliver_id,
+    )
@@ -0,0 +1,167 @@
+import heapq
+import json
+import uuid
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+
+@dataclass
+class PlanTask:
+    """One task of a production plan, as dispatched to a machine."""
+
+    # Plan position (job, then task order): ready tasks go out in this order
+    order: int
+    job_id: str
+    task_id: str
+    name: str
+    machine: str
+    tray: Optional[int] = None
+    dependencies: tuple = ()
+
+    @property
+    def key(self) -> tuple:
+        """Task IDs are only unique within their job."""
+        return (self.job_id, self.task_id)
+
+    def __str__(self) -> str:
+        return f"{self.job_id}/{self.task_id} {self.name}" + (
+            f"({self.tray})" if self.tray is not None else ""
+        )
+
+
+def read_plan_tasks(plan: dict, default_machine: str = "") -> list[PlanTask]:
+    """
+    Tasks of every job of a production plan (models/production_plan.json
+    format), in plan order. A task goes to its first eligible machine.
+    """
+    tasks = []
+    for j, job in enumerate(plan["jobs"]):
+        job_id = str(job.get("id", j))
+        for i, task in enumerate(job["tasks"]):
+            machines = task.get("eligible_machines") or [default_machine]
+            tasks.append(
+                PlanTask(
+                    order=len(tasks),
+                    job_id=job_id,
+                    task_id=str(task.get("id", i)),
+                    name=task["name"],
+                    machine=machines[0],
+                    tray=task.get("parameters", {}).get("tray_number"),
+                    dependencies=tuple(map(str, task.get("dependencies", ()))),
+                )
+            )
+    return tasks
+
+
+class TaskDispatcher:
+    """
+    Dispatches a task DAG to machines, keeping up to max_in_flight tasks
+    outstanding per machine so each machine's own queue always has the
+    next task waiting.
+
+    A task becomes ready once every dependency has finished: each task
+    keeps an in-degree counter of unfinished dependencies, and finishing
+    a task decrements those of its dependents. Ready tasks wait in a heap
+    per machine, in plan order. In-flight tasks are matched by the
+    correlation ID of their request. A failed task still releases its
+    dependents, as the sequential scheduler moved on after an error.
+    Raises ValueError for unknown dependencies or dependency cycles.
+    """
+
+    def __init__(
+        self,
+        tasks: list[PlanTask],
+        max_in_flight: int = 4,
+        new_id: Callable[[], str] = lambda: str(uuid.uuid4()),
+    ):
+        self.max_in_flight = max_in_flight
+        self.new_id = new_id
+        self.tasks = {task.key: task for task in tasks}
+        self._pending: dict[tuple, int] = {}
+        self._dependents: dict[tuple, list[PlanTask]] = {key: [] for key in self.tasks}
+        self._ready: dict[str, list] = {}
+        self._in_flight: dict[str, PlanTask] = {}
+        self._load: dict[str, int] = {}
+        self.finished: list[PlanTask] = []
+        self.failed: list[PlanTask] = []
+
+        for task in tasks:
+            deps = set(task.dependencies)
+            for dep in deps:
+                if (task.job_id, dep) not in self.tasks:
+                    raise ValueError(f"{task}: unknown dependency {dep}")
+                self._dependents[(task.job_id, dep)].append(task)
+            self._pending[task.key] = len(deps)
+            if not deps:
+                self._push_ready(task)
+        self._check_acyclic()
+
+    @classmethod
+    def from_file(cls, path: str, **kwargs) -> "TaskDispatcher":
+        """Dispatcher for every job of a production plan file."""
+        with open(path) as f:
+            return cls(read_plan_tasks(json.load(f)), **kwargs)
+
+    def _check_acyclic(self):
+        # Kahn's algorithm on a copy of the counters
+        pending = dict(self._pending)
+        stack = [key for key, n in pending.items() if n == 0]
+        seen = 0
+        while stack:
+            seen += 1
+            for task in self._dependents[stack.pop()]:
+                pending[task.key] -= 1
+                if pending[task.key] == 0:
+                    stack.append(task.key)
+        if seen != len(self.tasks):
+            raise ValueError("Dependency cycle in plan")
+
+    def _push_ready(self, task: PlanTask):
+        heapq.heappush(self._ready.setdefault(task.machine, []), (task.order, task))
+
+    def __len__(self) -> int:
+        """Tasks not finished yet (waiting, ready or in flight)."""
+        return len(self.tasks) - len(self.finished) - len(self.failed)
+
+    @property
+    def done(self) -> bool:
+        return len(self) == 0
+
+    @property
+    def in_flight(self) -> dict[str, PlanTask]:
+        """Correlation ID -> task sent and not answered yet."""
+        return self._in_flight
+
+    def dispatch(self) -> list[tuple[str, PlanTask]]:
+        """
+        Take the ready tasks that fit within each machine's in-flight
+        limit, in plan order, and return them with new correlation IDs.
+        """
+        sent = []
+        for machine, ready in self._ready.items():
+            load = self._load.get(machine, 0)
+            while ready and load < self.max_in_flight:
+                _, task = heapq.heappop(ready)
+                corr_id = self.new_id()
+                self._in_flight[corr_id] = task
+                sent.append((corr_id, task))
+                load += 1
+            self._load[machine] = load
+        return sent
+
+    def complete(self, corr_id: str, ok: bool = True) -> Optional[PlanTask]:
+        """
+        Record the answer to a request: its task finished (or failed) and
+        dependents whose last dependency it was become ready. Returns the
+        task, or None if corr_id is not in flight.
+        """
+        task = self._in_flight.pop(corr_id, None)
+        if task is None:
+            return None
+        self._load[task.machine] -= 1
+        (self.finished if ok else self.failed).append(task)
+        for dependent in self._dependents[task.key]:
+            self._pending[dependent.key] -= 1
+            if self._pending[dependent.key] == 0:
+                self._push_ready(dependent)
+        return task
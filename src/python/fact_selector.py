@@ -0,0 +1,108 @@
+from layout import normalize_slot_type
+from spatial_index import NearestIndex
+from warehouse_platform import Platform
+
+
+def rule_cost(cy: float, cx: float, sy: float, sx: float) -> int:
+    """
+    Extraction cost (ms) the rules attach to a candidate slot reached from
+    (cy, cx): cfg_engine's _travel_cost, or _row_travel_cost within the
+    platform's row, evaluated in the same order so the values are equal.
+    """
+    vx = float(Platform.extract_speed)
+    if cy == sy:
+        return int(abs(sx - cx) / vx * 1000.0)
+    vy = float(Platform.speed_y)
+    return int(((abs(cx) + abs(sx)) / vx + abs(sy - cy) / vy) * 1000.0)
+
+
+def _candidate_cost(x: float, y: float, slot) -> int:
+    return rule_cost(y, x, slot.y, slot.x)
+
+
+def _y_cost(dy: float) -> int:
+    """Lower bound of rule_cost for a slot dy away in y."""
+    return int(dy / float(Platform.speed_y) * 1000.0)
+
+
+class FactSelector:
+    """
+    Picks the slots whose facts a batch of next_action queries can use, so
+    the e-graph of a stateless query stays the same size as the warehouse
+    grows:
+
+    - FETCH: the slot holding target_id
+    - FETCH_ANY_EMPTY: the k slots holding an empty tray cheapest to reach
+    - DELIVER: the locked slot
+    - SEARCH_TARGET: the k free slots of the requested type cheapest to reach
+
+    "Cheapest" uses the rules' own extraction cost (rule_cost) from the
+    query position, and slots tied with the k-th are kept, so the candidate
+    the rules pick is always exported and the decisions are the same as
+    with every slot. Slots come back in layout order. The indexes are
+    rebuilt when the warehouse or its occupancy hash changes (on every call
+    for warehouses that do not track one).
+    """
+
+    def __init__(self, k: int = 4):
+        self.k = k
+        self._warehouse = None
+        self._indexed_hash: int | None = None
+        # slot_id -> position in the layout, for the warehouse's lifetime
+        self._order: dict = {}
+        self._by_id: dict = {}
+        self._by_tray: dict = {}
+        self._empty_trays = NearestIndex(())
+        self._free_by_type: dict = {}
+
+    def _index(self, warehouse):
+        occupancy = getattr(warehouse, "occupancy_hash", None)
+        same = warehouse is self._warehouse and occupancy is not None
+        if same and occupancy == self._indexed_hash:
+            return
+        slots = warehouse._get_all_slots()
+        if not same:
+            self._warehouse = warehouse
+            self._order = {s.slot_id: i for i, s in enumerate(slots)}
+            self._by_id = {s.slot_id: s for s in slots}
+        self._indexed_hash = occupancy
+
+        self._by_tray = {}
+        free, empty_trays = {}, []
+        for s in slots:
+            if s.tray is None:
+                free.setdefault(normalize_slot_type(s.slot_type), []).append(s)
+                continue
+            self._by_tray[int(s.tray.tray_id)] = s
+            if not s.tray.is_full:
+                empty_trays.append(s)
+        self._empty_trays = NearestIndex(empty_trays)
+        self._free_by_type = {t: NearestIndex(group) for t, group in free.items()}
+
+    def _nearest(self, candidates: NearestIndex, q: dict) -> list:
+        return candidates.k_nearest(
+            q["cx"], q["cy"], self.k, cost=_candidate_cost, y_cost=_y_cost
+        )
+
+    def select(self, warehouse, queries: list[dict]) -> list:
+        """Slots to export for queries (next_action keyword dicts)."""
+        self._index(warehouse)
+        chosen = {}
+        for q in queries:
+            cmd_type = q["cmd_type"]
+            if cmd_type == "FETCH":
+                slots = [self._by_tray.get(int(q.get("target_id", 0)))]
+            elif cmd_type == "FETCH_ANY_EMPTY":
+                slots = self._nearest(self._empty_trays, q)
+            elif cmd_type == "DELIVER":
+                slots = [self._by_id.get(q.get("locked_id", ""))]
+            elif cmd_type == "SEARCH_TARGET":
+                target_type = normalize_slot_type(q.get("target_type", ""))
+                candidates = self._free_by_type.get(target_type)
+                slots = self._nearest(candidates, q) if candidates else []
+            else:
+                slots = []
+            for s in slots:
+                if s is not None:
+                    chosen[s.slot_id] = s
+        return sorted(chosen.values(), key=lambda s: self._order[s.slot_id])
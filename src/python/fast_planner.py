@@ -0,0 +1,156 @@
+from cfg_engine import WAIT, RobotAction
+from layout import SLOT_TYPES, normalize_slot_type
+from spatial_index import NearestIndex
+
+PICK = RobotAction("pick")
+PLACE = RobotAction("place")
+RETRACT = RobotAction("update_x", val=0.0)
+
+
+class FastPlanner:
+    """
+    Table-driven pure-Python implementation of WAREHOUSE_RULES.
+
+    Slot data is indexed by slot ID, tray ID, empty tray and free slot type,
+    and the move/lock actions of each slot are built once. The index is
+    rebuilt only when the warehouse occupancy hash changes (or on every call
+    for warehouses that do not track one). Decisions mirror the egglog
+    rules, which remain the specification: use PlannerSession.verify to
+    check an answer against them.
+
+    Like the rule costs, FETCH_ANY_EMPTY and SEARCH_TARGET pick the
+    candidate with the shortest travel time from the platform
+    (NearestIndex); set SELECT_NEAREST to False for the first one in
+    layout order instead.
+    """
+
+    SELECT_NEAREST = True
+
+    def __init__(self):
+        self._indexed_hash: int | None = None
+        self._by_id: dict = {}
+        self._by_tray: dict = {}
+        # NearestIndex of slots holding an empty tray, and of free slots by type
+        self._empty_trays = NearestIndex(())
+        self._free_by_type: dict = {}
+        # SlotStore the slot ID index was built from (columnar warehouses)
+        self._store = None
+        # slot_id -> (update_y, update_x, lock) actions, built on first use
+        self._actions: dict = {}
+
+    def _index(self, warehouse):
+        occupancy = getattr(warehouse, "occupancy_hash", None)
+        if occupancy is not None and occupancy == self._indexed_hash:
+            return
+        self._indexed_hash = occupancy
+
+        self._actions = {}
+        store = getattr(warehouse, "store", None)
+        if store is not None:
+            self._index_store(store)
+            return
+
+        self._store = None
+        self._by_id, self._by_tray = {}, {}
+        free, empty_trays = {}, []
+        for s in warehouse._get_all_slots():
+            self._by_id[s.slot_id] = s
+            if s.tray is None:
+                free.setdefault(normalize_slot_type(s.slot_type), []).append(s)
+                continue
+            self._by_tray[int(s.tray.tray_id)] = s
+            if not s.tray.is_full:
+                empty_trays.append(s)
+        self._empty_trays = NearestIndex(empty_trays)
+        self._free_by_type = {t: NearestIndex(slots) for t, slots in free.items()}
+
+    def _index_store(self, store):
+        """Vectorized _index for warehouses backed by a SlotStore."""
+        if store is not self._store:
+            self._store = store
+            self._by_id = {v.slot_id: v for v in store.views}
+        views = store.views
+        self._by_tray = {int(store.tray_id[i]): views[i] for i in store.occupied()}
+        self._empty_trays = NearestIndex(views[i] for i in store.with_empty_tray())
+        self._free_by_type = {
+            slot_type: NearestIndex(views[i] for i in store.empty(slot_type))
+            for slot_type in SLOT_TYPES
+        }
+
+    def _slot_actions(self, slot) -> tuple:
+        actions = self._actions.get(slot.slot_id)
+        if actions is None:
+            actions = (
+                RobotAction("update_y", val=slot.y),
+                RobotAction("update_x", val=slot.x),
+                RobotAction("lock", slot_id=slot.slot_id),
+            )
+            self._actions[slot.slot_id] = actions
+        return actions
+
+    def _approach(self, cy: float, cx: float, slot, final: RobotAction):
+        """Retract X, move Y, extend X, then the final action (as the rules do)."""
+        if cy != slot.y:
+            return RETRACT if cx != 0.0 else self._slot_actions(slot)[0]
+        if cx != slot.x:
+            return self._slot_actions(slot)[1]
+        return final
+
+    def _fetch(self, cy, cx, target_id, target_type, locked_id):
+        slot = self._by_tray.get(target_id)
+        return self._approach(cy, cx, slot, PICK) if slot else WAIT
+
+    def _select(self, candidates: NearestIndex, cy: float, cx: float):
+        """Candidate to use: the nearest from the platform, or the first."""
+        if self.SELECT_NEAREST:
+            return candidates.nearest(cx, cy)
+        return candidates.first()
+
+    def _fetch_any_empty(self, cy, cx, target_id, target_type, locked_id):
+        slot = self._select(self._empty_trays, cy, cx)
+        return self._approach(cy, cx, slot, PICK) if slot else WAIT
+
+    def _deliver(self, cy, cx, target_id, target_type, locked_id):
+        slot = self._by_id.get(locked_id)
+        if slot is None or slot.tray is not None:
+            return WAIT
+        if normalize_slot_type(slot.slot_type) != normalize_slot_type(target_type):
+            return WAIT
+        return self._approach(cy, cx, slot, PLACE)
+
+    def _search_target(self, cy, cx, target_id, target_type, locked_id):
+        candidates = self._free_by_type.get(normalize_slot_type(target_type))
+        slot = self._select(candidates, cy, cx) if candidates else None
+        return self._slot_actions(slot)[2] if slot else WAIT
+
+    # cmd_type -> (required holding, required phase or None for any, handler)
+    _TABLE = {
+        "FETCH": (False, "fetch", _fetch),
+        "FETCH_ANY_EMPTY": (False, "fetch", _fetch_any_empty),
+        "DELIVER": (True, "deliver", _deliver),
+        "SEARCH_TARGET": (True, None, _search_target),
+    }
+
+    def next_action(
+        self,
+        warehouse,
+        cy: float,
+        cx: float,
+        holding: bool,
+        phase: str,
+        cmd_type: str,
+        target_id: int = 0,
+        target_type: str = "",
+        locked_id: str = "",
+    ) -> RobotAction:
+        """Same contract as get_next_action_from_egglog."""
+        entry = self._TABLE.get(cmd_type)
+        if entry is None:
+            return WAIT
+        need_holding, need_phase, handler = entry
+        # Like _query_expr, any phase other than "deliver" means fetch
+        phase = "deliver" if phase == "deliver" else "fetch"
+        if holding != need_holding or (need_phase and phase != need_phase):
+            return WAIT
+        self._index(warehouse)
+        return handler(self, cy, cx, target_id, target_type, locked_id)
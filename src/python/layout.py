@@ -0,0 +1,87 @@
+import json
+import os
+
+import yaml
+
+from slot import Slot
+from tray import Tray
+
+SLOT_TYPES = ("storage", "queue", "bay")
+
+
+def normalize_slot_type(name: str) -> str:
+    """Slot type name as the planner rules see it: unknown names are storage."""
+    return name if name in ("queue", "bay") else "storage"
+
+
+def read_layout(path: str) -> dict:
+    """Read a layout description from a .json or .yml/.yaml file."""
+    with open(path) as f:
+        if os.path.splitext(path)[1].lower() == ".json":
+            return json.load(f)
+        return yaml.safe_load(f)
+
+
+def _row_range(key) -> range:
+    """Parse a row key: 3, "3" or an inclusive range "0-2"."""
+    if isinstance(key, int):
+        return range(key, key + 1)
+    first, _, last = str(key).partition("-")
+    return range(int(first), int(last or first) + 1)
+
+
+def build_slots(spec: dict, row_pitch: float) -> list[Slot]:
+    """
+    Expand the columns of a layout into slots, row by row (bottom-up, then
+    across columns, the order Warehouse() uses).
+    Every row is a storage slot "<type>_<column>_<row>" unless the column's
+    "slots" entry for that row (or row range) gives another type or ID.
+    """
+    columns = []
+    for col in spec["columns"]:
+        overrides = {}
+        for key, override in (col.get("slots") or {}).items():
+            rows = _row_range(key)
+            if "id" in override and len(rows) > 1:
+                raise ValueError(f"Column {col['name']}: id given for rows {key}")
+            for row in rows:
+                overrides[row] = override
+        rows = int(col.get("rows", spec.get("rows", 0)))
+        columns.append((col, float(col["x"]), rows, overrides))
+
+    slots = []
+    for row in range(max((c[2] for c in columns), default=0)):
+        y = row * row_pitch
+        for col, x, rows, overrides in columns:
+            if row >= rows:
+                continue
+            override = overrides.get(row, {})
+            slot_type = override.get("type", col.get("type", "storage"))
+            if slot_type not in SLOT_TYPES:
+                raise ValueError(f"Unknown slot type: {slot_type}")
+            slot_id = override.get("id", f"{slot_type}_{col['name']}_{row}")
+            slots.append(Slot(slot_id, x, y, slot_type))
+    return slots
+
+
+def place_trays(spec: dict, slots_by_id: dict[str, Slot]):
+    """
+    Put the initial tray inventory into its slots, without callbacks.
+    Trays without an explicit "id" are numbered sequentially from 1.
+    """
+    Tray._next_id = 1
+    seen = set()
+    for entry in spec.get("trays") or ():
+        slot = slots_by_id.get(entry["slot"])
+        if slot is None:
+            raise ValueError(f"Unknown slot for tray: {entry['slot']}")
+        if slot.tray is not None:
+            raise ValueError(f"Slot {slot.slot_id} already holds a tray")
+        tray = Tray(weight=entry.get("weight"))
+        if "id" in entry:
+            tray.tray_id = int(entry["id"])
+            Tray._next_id = max(Tray._next_id, tray.tray_id + 1)
+        if tray.tray_id in seen:
+            raise ValueError(f"Duplicate tray ID: {tray.tray_id}")
+        seen.add(tray.tray_id)
+        slot.tray = tray
@@ -0,0 +1,267 @@
+import heapq
+import logging
+from dataclasses import dataclass
+from itertools import count
+from typing import Any, Optional
+
+QUEUE_POLICIES = ("fifo", "lookahead")
+# Mission priorities: lower values start first
+PRIORITY_NORMAL = 0
+PRIORITY_BACKGROUND = 1
+
+
+class QueueFull(Exception):
+    """Raised when a mission is submitted to a queue at its max depth."""
+
+
+@dataclass(frozen=True)
+class MissionSpec:
+    """
+    A mission the warehouse accepts: its data-model method node (under
+    Machine/) and the WarehouseController method that starts it.
+    """
+
+    name: str
+    # WarehouseController method called with the tray (if takes_tray)
+    entry: str
+    # The first request argument is a tray number
+    takes_tray: bool = False
+    # Rejected without a tray number
+    needs_tray: bool = False
+    priority: int = PRIORITY_NORMAL
+
+    def parse_tray(self, args) -> Optional[int]:
+        """
+        Tray number from a method request's arguments, or None without one.
+        Raises ValueError if the argument is not a tray number.
+        """
+        if not self.takes_tray or not args or args[0] is None:
+            return None
+        try:
+            return int(args[0])
+        except (TypeError, ValueError):
+            raise ValueError(f"{self.name}: bad tray number {args[0]!r}") from None
+
+
+MISSIONS = {
+    spec.name: spec
+    for spec in (
+        MissionSpec("ExtractTray", "extract", takes_tray=True),
+        MissionSpec("SendBack", "sendback"),
+        MissionSpec("FetchAnyEmpty", "fetch_any_empty"),
+        MissionSpec(
+            "Enqueue",
+            "enqueue",
+            takes_tray=True,
+            needs_tray=True,
+            priority=PRIORITY_BACKGROUND,
+        ),
+    )
+}
+MISSION_NAMES = tuple(MISSIONS)
+
+
+@dataclass
+class QueuedMission:
+    """A mission request waiting in the controller queue."""
+
+    name: str
+    tray: Optional[int] = None
+    # Caller's handle for the request (task ID, correlation ID, ...)
+    ref: Any = None
+    priority: int = PRIORITY_NORMAL
+    # Times (s, caller's clock): dropped by expire() once deadline passes
+    deadline: Optional[float] = None
+    submitted: Optional[float] = None
+
+    def __str__(self) -> str:
+        return f"{self.name}({self.tray})" if self.tray else self.name
+
+    def resources(self, warehouse) -> set:
+        """
+        What the mission touches: "bay", "queue" and ("tray", N). Two
+        missions that share a resource must run in submission order.
+        """
+        if self.name == "Enqueue":
+            used = {"queue"}
+        elif self.name == "ExtractTray" and not self.tray:
+            used = {"bay", "queue"}
+        else:
+            used = {"bay"}
+        if self.tray:
+            used.add(("tray", self.tray))
+            if warehouse.tray_in_bay == self.tray:
+                used.add("bay")
+        return used
+
+    def pickup_slot(self, warehouse):
+        """Slot the mission will pick its tray from, if known now."""
+        if self.name == "SendBack":
+            return warehouse.get_occupied_bay_slot()
+        if self.name == "ExtractTray" and not self.tray:
+            return warehouse.get_occupied_queue_slot()
+        if self.tray:
+            return warehouse.get_slot_by_tray(self.tray)
+        # FetchAnyEmpty: the closest empty tray
+        plat = warehouse.platform
+        empties = [
+            s for s in warehouse._get_all_slots() if s.tray and not s.tray.is_full
+        ]
+        return min(empties, key=plat.time_to, default=None)
+
+
+class MissionQueue:
+    """
+    Missions waiting for the controller, in a heap ordered by priority
+    (lower first), then submission order. Appending and popping are
+    O(log n).
+
+    "fifo" starts them in that order. "lookahead" looks at the first
+    `lookahead` missions and starts the one with the shortest empty trip
+    from the platform to its pickup slot, as long as it shares no resource
+    with the missions it overtakes. A mission never waits behind one of a
+    lower priority, even if they share a resource.
+
+    With max_depth, append() raises QueueFull once that many missions
+    wait. Missions with a deadline are dropped by expire().
+    """
+
+    def __init__(
+        self, policy: str = "fifo", lookahead: int = 4, max_depth: Optional[int] = None
+    ):
+        if policy not in QUEUE_POLICIES:
+            raise ValueError(f"Unknown queue policy: {policy}")
+        self.policy = policy
+        self.lookahead = lookahead
+        self.max_depth = max_depth
+        # (priority, seq, mission); entries whose seq left _live are stale
+        self._heap: list = []
+        self._deadlines: list = []
+        self._live: dict[int, QueuedMission] = {}
+        self._seq = count()
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.started = 0
+        # Started missions with both submission and start times
+        self.waited = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.rejected = 0
+        self.expired = 0
+
+    def __len__(self) -> int:
+        return len(self._live)
+
+    def __iter__(self):
+        """Waiting missions in queue order."""
+        return (m for _, seq, m in sorted(self._heap) if seq in self._live)
+
+    def append(self, mission: QueuedMission):
+        if self.max_depth is not None and len(self._live) >= self.max_depth:
+            self.rejected += 1
+            raise QueueFull(f"{len(self._live)} missions already queued")
+        seq = next(self._seq)
+        self._live[seq] = mission
+        heapq.heappush(self._heap, (mission.priority, seq, mission))
+        if mission.deadline is not None:
+            heapq.heappush(self._deadlines, (mission.deadline, seq))
+
+    def _drop_stale(self):
+        heap = self._heap
+        while heap and heap[0][1] not in self._live:
+            heapq.heappop(heap)
+
+    def peek(self) -> Optional[QueuedMission]:
+        """Next mission in queue order."""
+        self._drop_stale()
+        return self._heap[0][2] if self._heap else None
+
+    def expire(self, now: float) -> list[QueuedMission]:
+        """Remove and return the missions whose deadline is before now."""
+        expired = []
+        deadlines = self._deadlines
+        while deadlines and deadlines[0][0] < now:
+            _, seq = heapq.heappop(deadlines)
+            mission = self._live.pop(seq, None)
+            if mission is not None:
+                expired.append(mission)
+        self.expired += len(expired)
+        return expired
+
+    @property
+    def stats(self) -> dict:
+        """Depth, started/rejected/expired counts and wait times (s)."""
+        return {
+            "depth": len(self),
+            "started": self.started,
+            "mean_wait": self.total_wait / self.waited if self.waited else 0.0,
+            "max_wait": self.max_wait,
+            "rejected": self.rejected,
+            "expired": self.expired,
+        }
+
+    def _pickup_time(self, mission: QueuedMission, warehouse) -> float:
+        slot = mission.pickup_slot(warehouse)
+        # Unknown pickups (e.g. a tray that is missing) are not worth jumping to
+        return warehouse.platform.time_to(slot) if slot else float("inf")
+
+    def _pop_live(self):
+        self._drop_stale()
+        entry = heapq.heappop(self._heap)
+        del self._live[entry[1]]
+        return entry
+
+    def _started(self, mission: QueuedMission, now: Optional[float]):
+        self.started += 1
+        if now is None or mission.submitted is None:
+            return
+        wait = now - mission.submitted
+        self.waited += 1
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+
+    def pop_next(self, warehouse, now: Optional[float] = None):
+        """
+        Remove and return the mission to start now (None if empty). With
+        now, its wait since submission is added to the stats.
+        """
+        if not self._live:
+            return None
+        if self.policy == "fifo" or len(self._live) == 1:
+            mission = self._pop_live()[2]
+            self._started(mission, now)
+            return mission
+
+        # Window: the first `lookahead` missions of the head's priority
+        window = [self._pop_live()]
+        while len(window) < self.lookahead and self._live:
+            self._drop_stale()
+            if self._heap[0][0] != window[0][0]:
+                break
+            window.append(self._pop_live())
+
+        head = window[0][2]
+        best, best_time = 0, self._pickup_time(head, warehouse)
+        head_time, blocked = best_time, set(head.resources(warehouse))
+        for i in range(1, len(window)):
+            mission = window[i][2]
+            used = mission.resources(warehouse)
+            if not used & blocked:
+                time = self._pickup_time(mission, warehouse)
+                if time < best_time:
+                    best, best_time = i, time
+            blocked |= used
+
+        for i, entry in enumerate(window):
+            if i != best:
+                self._live[entry[1]] = entry[2]
+                heapq.heappush(self._heap, entry)
+        mission = window[best][2]
+        if best:
+            logging.info(
+                f"Look-ahead: {mission} moved ahead of {best} queued mission(s), "
+                f"empty trip {best_time:.2f}s instead of {head_time:.2f}s"
+            )
+        self._started(mission, now)
+        return mission
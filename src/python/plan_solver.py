@@ -0,0 +1,208 @@
+import copy
+import json
+import math
+import os
+import tempfile
+import uuid
+from collections import defaultdict
+from dataclasses import replace
+from typing import Callable, Optional
+
+try:
+    from frost_planner.executor.dynamic_executor import DynamicExecutor
+    from frost_planner.generator.instance_generator import load_instance_from_json
+    from frost_planner.solver.dummy_solver import DummySolver
+    from frost_planner.solver.genetic_solver import GeneticAlgorithmSolver
+except ImportError:  # frost-planner is only needed for solver-ordered dispatch
+    DynamicExecutor = None
+
+from dispatcher import PlanTask, read_plan_tasks
+from simulator import Simulator
+
+SOLVERS = ("genetic", "dummy")
+
+
+def estimate_processing_times(
+    tasks: list[PlanTask], simulator: Optional[Simulator] = None
+) -> dict[tuple, int]:
+    """
+    Seconds each task takes on the warehouse model (PlanTask.key -> s).
+    The tasks are simulated in plan order on the default warehouse, so
+    each one starts from the state the previous ones leave behind. Rounded
+    up to whole seconds, at least 1, as processing_time in plan files.
+    """
+    simulator = simulator or Simulator()
+    report = simulator.run(
+        [{"id": t.task_id, "name": t.name, "tray": t.tray} for t in tasks]
+    )
+    return {
+        task.key: max(1, math.ceil(result.finished - result.dispatched))
+        for task, result in zip(tasks, report.tasks)
+    }
+
+
+def plan_with_processing_times(plan: dict, times: dict[tuple, int]) -> dict:
+    """Copy of a production plan with processing_time set from times."""
+    plan = copy.deepcopy(plan)
+    for j, job in enumerate(plan["jobs"]):
+        job_id = str(job.get("id", j))
+        for i, task in enumerate(job["tasks"]):
+            key = (job_id, str(task.get("id", i)))
+            if key in times:
+                task["processing_time"] = times[key]
+    return plan
+
+
+class SolverDispatcher:
+    """
+    Dispatches a plan in the order a frost_planner solver picks, with the
+    same interface as TaskDispatcher (dispatch, complete, done, in_flight).
+
+    The plan's processing times are replaced by estimate_processing_times
+    and the resulting SchedulingInstance is solved by a DynamicExecutor
+    ("genetic" or "dummy" solver). dispatch() sends the executor's ready
+    tasks, up to max_in_flight per machine. A failed task is reported to
+    the executor as finished, so its dependents are released as with
+    TaskDispatcher, and the remaining tasks are re-solved from the current
+    time. clock() gives that time in seconds.
+    Scheduled tasks are sent as the plan task with the same job and task
+    ID. Requires frost-planner, unless an executor with the same methods
+    (update_task_status, update_schedule, next_ready_tasks, task_started,
+    task_completed) is passed in; its tasks then need a job_id.
+    """
+
+    def __init__(
+        self,
+        plan: dict,
+        solver: str = "genetic",
+        max_in_flight: int = 4,
+        new_id: Callable[[], str] = lambda: str(uuid.uuid4()),
+        clock: Callable[[], float] = lambda: 0.0,
+        processing_times: Optional[dict[tuple, int]] = None,
+        executor=None,
+    ):
+        if executor is None and DynamicExecutor is None:
+            raise ImportError("Solver dispatch requires frost-planner")
+        if solver not in SOLVERS:
+            raise ValueError(f"Unknown solver: {solver}")
+        self.max_in_flight = max_in_flight
+        self.new_id = new_id
+        self.clock = clock
+        self.tasks = read_plan_tasks(plan)
+        if processing_times is None:
+            processing_times = estimate_processing_times(self.tasks)
+        self.processing_times = processing_times
+        # Job ID of each instance task (by id()), for tasks without job_id
+        self._job_of: dict[int, str] = {}
+        if executor is None:
+            executor = self._solve(plan, solver)
+        self.executor = executor
+        self.executor.update_schedule(start_time=self.clock())
+
+        # Plan tasks not sent yet, by PlanTask.key
+        self._unsent: dict[tuple, PlanTask] = {task.key: task for task in self.tasks}
+        self._in_flight: dict[str, tuple] = {}
+        self._load: dict[str, int] = defaultdict(int)
+        self.finished: list[PlanTask] = []
+        self.failed: list[PlanTask] = []
+        self.resolves = 0
+
+    def _solve(self, plan: dict, solver: str):
+        """DynamicExecutor for the plan with the estimated processing times."""
+        # load_instance_from_json reads files only
+        with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as f:
+            json.dump(plan_with_processing_times(plan, self.processing_times), f)
+        try:
+            instance = load_instance_from_json(f.name)
+        finally:
+            os.remove(f.name)
+        self._job_of = {
+            id(task): str(job.id) for job in instance.jobs for task in job.tasks
+        }
+        solver_cls = GeneticAlgorithmSolver if solver == "genetic" else DummySolver
+        return DynamicExecutor(solver_cls(instance=instance))
+
+    @classmethod
+    def from_file(cls, path: str, **kwargs) -> "SolverDispatcher":
+        with open(path) as f:
+            return cls(json.load(f), **kwargs)
+
+    def __len__(self) -> int:
+        return len(self.tasks) - len(self.finished) - len(self.failed)
+
+    @property
+    def done(self) -> bool:
+        return len(self) == 0
+
+    @property
+    def in_flight(self) -> dict[str, PlanTask]:
+        return {corr_id: task for corr_id, (_, task) in self._in_flight.items()}
+
+    def _take_plan_task(self, scheduled) -> PlanTask:
+        """
+        The unsent plan task of a scheduled task, by job and task ID (task
+        IDs are only unique within their job). Raises ValueError if there
+        is none, as the executor's instance does not match the plan.
+        """
+        task = scheduled.task
+        job_id = getattr(task, "job_id", None)
+        if job_id is None:
+            job_id = self._job_of.get(id(task))
+        key = (str(job_id), str(task.id))
+        plan_task = self._unsent.get(key)
+        if plan_task is None or plan_task.name != task.name:
+            raise ValueError(
+                f"Scheduled task {key} {task.name} is not an unsent plan task"
+            )
+        del self._unsent[key]
+        return plan_task
+
+    def dispatch(self) -> list[tuple[str, PlanTask]]:
+        """Start the executor's ready tasks that fit the in-flight limits."""
+        now = self.clock()
+        self.executor.update_task_status()
+        running = {id(scheduled) for scheduled, _ in self._in_flight.values()}
+        sent = []
+        for scheduled, machine in self.executor.next_ready_tasks():
+            if (
+                id(scheduled) in running
+                or self._load[machine.name] >= self.max_in_flight
+            ):
+                continue
+            plan_task = replace(self._take_plan_task(scheduled), machine=machine.name)
+            scheduled.start_time = now
+            self.executor.task_started(scheduled)
+            corr_id = self.new_id()
+            self._in_flight[corr_id] = (scheduled, plan_task)
+            self._load[machine.name] += 1
+            sent.append((corr_id, plan_task))
+        return sent
+
+    def complete(
+        self, corr_id: str, ok: bool = True, resolve: bool = True
+    ) -> Optional[PlanTask]:
+        """
+        Record the answer to a request, re-solving the remaining tasks if
+        it failed (unless resolve is False). Returns the task, or None if
+        corr_id is not in flight.
+        """
+        entry = self._in_flight.pop(corr_id, None)
+        if entry is None:
+            return None
+        scheduled, plan_task = entry
+        self._load[plan_task.machine] -= 1
+        scheduled.end_time = self.clock()
+        self.executor.task_completed(scheduled)
+        if ok:
+            self.finished.append(plan_task)
+        else:
+            self.failed.append(plan_task)
+            if resolve:
+                self.resolve()
+        return plan_task
+
+    def resolve(self):
+        """Re-solve the unfinished tasks from the current time."""
+        self.executor.update_task_status()
+        self.executor.update_schedule(start_time=self.clock())
+        self.resolves += 1
@@ -0,0 +1,43 @@
+from typing import Optional
+
+from mission_queue import MISSIONS, MissionSpec, QueuedMission
+
+
+class RequestRouter:
+    """
+    Maps data-model method node paths (models/warehouse.yml) to missions.
+    Every accepted spelling of each path ("/Machine/ExtractTray",
+    "Machine/ExtractTray") is resolved once here, so routing a request is
+    a single dict lookup however many method nodes there are.
+    """
+
+    def __init__(self, root: str = "Machine", missions: dict = MISSIONS):
+        self._routes: dict[str, MissionSpec] = {}
+        for spec in missions.values():
+            path = f"{root}/{spec.name}"
+            self._routes[path] = spec
+            self._routes[f"/{path}"] = spec
+
+    def __len__(self) -> int:
+        return len(self._routes)
+
+    @property
+    def nodes(self) -> list[str]:
+        """Data-model paths of the routed method nodes."""
+        return [path for path in self._routes if not path.startswith("/")]
+
+    def resolve(self, node: str) -> Optional[MissionSpec]:
+        """Mission for a method node path, or None if it is not routed."""
+        return self._routes.get(node)
+
+    def route(self, payload, ref=None) -> Optional[QueuedMission]:
+        """
+        Mission for a method request payload (node and args), with its tray
+        number parsed and its default priority, or None if the node is not
+        a warehouse mission. Raises ValueError for a bad tray number.
+        """
+        spec = self._routes.get(getattr(payload, "node", ""))
+        if spec is None:
+            return None
+        tray = spec.parse_tray(getattr(payload, "args", []))
+        return QueuedMission(spec.name, tray, ref, spec.priority)
@@ -0,0 +1,251 @@
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # optional dependency, only needed for .parquet output
+    pyarrow = None
+
+import csv
+import logging
+import os
+import random
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Iterable, Optional
+
+from cfg_engine import PlannerSession
+from layout import build_slots, read_layout
+from simulator import Simulator
+from tray import Tray
+from warehouse import Warehouse
+
+DEFAULT_LAYOUT = os.path.join(
+    os.path.dirname(__file__), "..", "..", "models", "warehouse_layout.yml"
+)
+# Relative frequency of each task while the bay is free (SendBack clears it)
+DEFAULT_MIX = {"ExtractTray": 0.4, "FetchAnyEmpty": 0.3, "Enqueue": 0.3}
+# One row per simulated task, in this column order
+COLUMNS = (
+    "tag",
+    "seed",
+    "task",
+    "name",
+    "tray",
+    "status",
+    "dispatched",
+    "finished",
+    "latency",
+    "moves",
+    "planner_calls",
+)
+
+
+def random_inventory(
+    layout: dict, rng: random.Random, trays: int, empty_ratio: float = 0.3
+) -> dict:
+    """
+    Copy of layout with its trays replaced by the given number of trays in
+    random storage/queue slots; an empty_ratio fraction of them are empty.
+    """
+    pitch = float(layout.get("row_pitch", Warehouse.SLOT_HEIGHT))
+    free = [s.slot_id for s in build_slots(layout, pitch) if s.slot_type != "bay"]
+    if trays > len(free):
+        raise ValueError(f"{trays} trays do not fit in {len(free)} slots")
+    placed = []
+    for slot_id in rng.sample(free, trays):
+        empty = rng.random() < empty_ratio
+        weight = Tray.MIN_W if empty else rng.uniform(Tray.MIN_W + 0.02, Tray.MAX_W)
+        placed.append({"slot": slot_id, "weight": weight})
+    return dict(layout, trays=placed)
+
+
+def random_tasks(
+    rng: random.Random, trays: int, count: int, mix: Optional[dict] = None
+) -> list[dict]:
+    """
+    Random task stream: tasks that fill the bay are followed by a SendBack,
+    others are drawn from mix with a random tray ID from 1..trays.
+    """
+    mix = mix or DEFAULT_MIX
+    names, weights = list(mix), list(mix.values())
+    tasks, bay_full = [], False
+    for i in range(count):
+        name = "SendBack" if bay_full else rng.choices(names, weights)[0]
+        tray = rng.randint(1, trays) if name in ("ExtractTray", "Enqueue") else None
+        bay_full = name in ("ExtractTray", "FetchAnyEmpty")
+        tasks.append({"id": f"T{i + 1}", "name": name, "tray": tray})
+    return tasks
+
+
+# Per-process state set by _init_worker: layout, stream settings, simulator
+_worker: dict = {}
+
+
+def _init_worker(
+    layout: dict, trays: int, tasks: int, mix, empty_ratio, options, quiet=True
+):
+    """Build the simulator (and egglog session) once per worker process."""
+    if quiet:
+        # Rejections and waits are expected outcomes, reported in the rows
+        logging.disable(logging.ERROR)
+    options = dict(options)
+    if options.get("planner_backend", "python") != "python":
+        # Rules are registered once; each run only re-syncs changed slots
+        options.setdefault("planner", PlannerSession())
+    _worker.update(
+        layout=layout,
+        trays=trays,
+        tasks=tasks,
+        mix=mix,
+        empty_ratio=empty_ratio,
+        simulator=Simulator(**options),
+    )
+
+
+def run_scenario(seed: int) -> list[tuple]:
+    """Generate and simulate the scenario of one seed (in a worker)."""
+    rng = random.Random(seed)
+    layout = random_inventory(
+        _worker["layout"], rng, _worker["trays"], _worker["empty_ratio"]
+    )
+    tasks = random_tasks(rng, _worker["trays"], _worker["tasks"], _worker["mix"])
+    sim = _worker["simulator"]
+    sim.warehouse_factory = lambda: Warehouse(layout)
+    report = sim.run(tasks)
+    return [
+        (
+            seed,
+            t.task_id,
+            t.name,
+            t.tray,
+            t.status,
+            t.dispatched,
+            t.finished,
+            t.latency,
+            t.moves,
+            t.planner_calls,
+        )
+        for t in report.tasks
+    ]
+
+
+class _RowWriter:
+    """Append rows to a CSV file, or to a Parquet file (requires pyarrow)."""
+
+    def __init__(self, path: str):
+        self.parquet = os.path.splitext(path)[1].lower() == ".parquet"
+        if self.parquet and pyarrow is None:
+            raise ImportError("Parquet output requires pyarrow")
+        self.path = path
+        self._file = None
+        self._writer = None
+
+    def write(self, rows: list[tuple]):
+        if not rows:
+            return
+        if not self.parquet:
+            if self._writer is None:
+                self._file = open(self.path, "w", newline="")
+                self._writer = csv.writer(self._file)
+                self._writer.writerow(COLUMNS)
+            self._writer.writerows(rows)
+            return
+        table = pyarrow.Table.from_pylist([dict(zip(COLUMNS, r)) for r in rows])
+        if self._writer is None:
+            self._writer = pyarrow.parquet.ParquetWriter(self.path, table.schema)
+        self._writer.write_table(table)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+        elif self._writer is not None:
+            self._writer.close()
+
+
+@dataclass
+class ScenarioSummary:
+    """Aggregate throughput and latency of a scenario sweep."""
+
+    scenarios: int = 0
+    statuses: dict = field(default_factory=dict)
+    # Sum of the makespans, in logical seconds
+    sim_time: float = 0.0
+    wall_time: float = 0.0
+    # Task name -> latencies (s) of completed tasks
+    latencies: dict = field(default_factory=dict)
+
+    def add(self, rows: list[tuple]):
+        """Fold in the rows of one scenario (as returned by run_scenario)."""
+        self.scenarios += 1
+        makespan = 0.0
+        for _, _, name, _, status, _, finished, latency, _, _ in rows:
+            makespan = max(makespan, finished)
+            self.statuses[status] = self.statuses.get(status, 0) + 1
+            if status == "done":
+                self.latencies.setdefault(name, []).append(latency)
+        self.sim_time += makespan
+
+    @property
+    def throughput(self) -> float:
+        """Completed tasks per simulated hour."""
+        done = self.statuses.get("done", 0)
+        return done / self.sim_time * 3600 if self.sim_time else 0.0
+
+    def percentiles(self, name: Optional[str] = None, q=(50, 90, 99)) -> dict:
+        """Latency percentiles (s) for one task name, or over all tasks."""
+        if name is not None:
+            values = self.latencies.get(name, [])
+        else:
+            values = [v for vs in self.latencies.values() for v in vs]
+        if len(values) < 2:
+            return {p: values[0] if values else None for p in q}
+        cuts = statistics.quantiles(values, n=100, method="inclusive")
+        return {p: cuts[p - 1] for p in q}
+
+
+def run_scenarios(
+    seeds: Iterable[int],
+    out_path: str,
+    layout: str | dict = DEFAULT_LAYOUT,
+    trays: int = 10,
+    tasks: int = 20,
+    mix: Optional[dict] = None,
+    empty_ratio: float = 0.3,
+    workers: Optional[int] = None,
+    tag: str = "",
+    **controller_options,
+) -> ScenarioSummary:
+    """
+    Simulate one random scenario per seed across a process pool and stream
+    the task rows to out_path (.csv, or .parquet with pyarrow) as they come.
+    Every seed gives the same inventory and task stream on any machine.
+    controller_options select the policy (e.g. planner_backend); tag is
+    written to every row to tell layouts and policies apart in a sweep.
+    workers=1 runs in this process (controller logging is left on).
+    """
+    if isinstance(layout, str):
+        layout = read_layout(layout)
+    init_args = (layout, trays, tasks, mix, empty_ratio, controller_options)
+    summary = ScenarioSummary()
+    writer = _RowWriter(out_path)
+    start = time.perf_counter()
+    pool = None
+    if workers == 1:
+        _init_worker(*init_args, quiet=False)
+        results = map(run_scenario, seeds)
+    else:
+        pool = ProcessPoolExecutor(
+            workers, initializer=_init_worker, initargs=init_args
+        )
+        results = pool.map(run_scenario, seeds, chunksize=16)
+    try:
+        for rows in results:
+            summary.add(rows)
+            writer.write([(tag, *r) for r in rows])
+    finally:
+        writer.close()
+        if pool is not None:
+            pool.shutdown()
+    summary.wall_time = time.perf_counter() - start
+    return summary
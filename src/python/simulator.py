@@ -0,0 +1,237 @@
+import json
+import math
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+from mission_queue import MISSION_NAMES
+from warehouse import Warehouse
+from warehouse_controller import WarehouseController
+
+
+def load_plan(path: str) -> list[dict]:
+    """
+    Read the tasks of a production plan (models/production_plan.json format)
+    in dispatch order: {"id", "name", "tray"} per task, jobs one after another.
+    """
+    with open(path) as f:
+        plan = json.load(f)
+    tasks = []
+    for job in plan["jobs"]:
+        for task in job["tasks"]:
+            tray = task.get("parameters", {}).get("tray_number")
+            tasks.append({"id": task.get("id", ""), "name": task["name"], "tray": tray})
+    return tasks
+
+
+@dataclass
+class TaskResult:
+    """Outcome and timing (logical seconds) of one dispatched task."""
+
+    task_id: str
+    name: str
+    tray: Optional[int]
+    # "done", "rejected" (PHYSICAL_ERROR_IMPOSSIBLE) or "stalled" (planner waits)
+    status: str
+    dispatched: float
+    finished: float
+    moves: int = 0
+    # Platform travel (m), summed over both axes
+    distance: float = 0.0
+    planner_calls: int = 0
+
+    @property
+    def latency(self) -> float:
+        """Time from dispatch to the completion or error response."""
+        return self.finished - self.dispatched
+
+
+@dataclass
+class SimulationReport:
+    """Per-task results of one simulated production plan."""
+
+    tasks: list[TaskResult] = field(default_factory=list)
+    makespan: float = 0.0
+
+    @property
+    def planner_calls(self) -> int:
+        return sum(t.planner_calls for t in self.tasks)
+
+    @property
+    def distance(self) -> float:
+        return sum(t.distance for t in self.tasks)
+
+    @property
+    def completed(self) -> int:
+        return sum(t.status == "done" for t in self.tasks)
+
+
+class Simulator:
+    """
+    Headless discrete-event replay of Scheduler + WarehouseUnit.
+
+    A virtual clock jumps from one platform arrival to the next through
+    WarehouseController.advance, so idle time costs nothing. The LF timing
+    is kept: tasks are sent one at a time, a mission starts and its
+    completion is noticed on the control_period timer, and the scheduler
+    waits done_delay after PHYSICAL_DONE and error_delay after an error.
+    Set control_period to None to drop the timer quantization.
+    Tasks with an "at" time are not sent before it; with a slotting
+    optimizer, the controller relocates trays in the idle gap.
+    """
+
+    def __init__(
+        self,
+        warehouse_factory: Callable[[], Warehouse] = Warehouse,
+        control_period: Optional[float] = 0.05,
+        done_delay: float = 0.05,
+        error_delay: float = 1.0,
+        **controller_options,
+    ):
+        """
+        warehouse_factory builds the initial warehouse of every run.
+        controller_options go to WarehouseController; the default backend
+        is the python planner, which keeps a run well under a millisecond.
+        """
+        controller_options.setdefault("planner_backend", "python")
+        self.warehouse_factory = warehouse_factory
+        self.control_period = control_period
+        self.done_delay = done_delay
+        self.error_delay = error_delay
+        self.controller_options = controller_options
+
+    def _on_timer(self, t: float) -> float:
+        """First control_loop tick at or after t."""
+        if not self.control_period:
+            return t
+        # Small slack so float noise does not skip a tick that is due
+        return math.ceil(t / self.control_period - 1e-9) * self.control_period
+
+    def run(self, tasks: list[dict], batch: bool = False) -> SimulationReport:
+        """
+        Simulate tasks ({"name", "tray", optional "id" and "at"}) on a fresh
+        warehouse. By default they are sent one at a time, as Scheduler
+        does, each no earlier than its "at" time (s). With
+        batch, all of them are submitted to the controller queue at t=0 and
+        each starts as soon as the previous one is done, in the order the
+        controller's queue_policy picks.
+        """
+        for task in tasks:
+            if task["name"] not in MISSION_NAMES:
+                raise ValueError(f"Unknown task: {task['name']}")
+
+        slotting = self.controller_options.get("slotting")
+        if slotting is not None:
+            # Access counts and throttle state do not carry over between runs
+            slotting.reset()
+        ctrl = WarehouseController(self.warehouse_factory(), **self.controller_options)
+        report = SimulationReport()
+        now = 0.0
+        if batch:
+            for task in tasks:
+                ctrl.submit(task["name"], task.get("tray"), ref=task)
+            while True:
+                calls = ctrl.planner_calls
+                started = ctrl.start_next()
+                if started is None:
+                    break
+                mission, ok = started
+                result = self._run_task(ctrl, mission.ref, 0.0, now, ok, calls)
+                report.tasks.append(result)
+                now = result.finished
+        else:
+            for task in tasks:
+                dispatched = max(now, task.get("at", 0.0))
+                now = self._idle(ctrl, now, dispatched)
+                calls = ctrl.planner_calls
+                ok = ctrl.start(task["name"], task.get("tray"))
+                result = self._run_task(ctrl, task, dispatched, now, ok, calls)
+                report.tasks.append(result)
+                delay = self.done_delay if result.status == "done" else self.error_delay
+                now = result.finished + delay
+        report.makespan = max((t.finished for t in report.tasks), default=0.0)
+        return report
+
+    def run_file(self, path: str, batch: bool = False) -> SimulationReport:
+        """Simulate a production plan file."""
+        return self.run(load_plan(path), batch)
+
+    def _idle(self, ctrl: WarehouseController, now: float, until: float) -> float:
+        """
+        Let the controller run slotting relocations from now until the next
+        task arrives at until. Returns when that task can start: until, or
+        later if the platform has to finish a move or a relocation that
+        already picked up its tray.
+        """
+        slotting = ctrl.slotting
+        if slotting is None or until <= now:
+            return until
+        plat = ctrl.wh.platform
+        t = self._on_timer(now)
+        while True:
+            if ctrl.is_busy:
+                if t >= until and ctrl.preempt_relocation():
+                    # The move in progress still ends before the task starts
+                    plat.settle(t)
+                    return t
+                arrival = ctrl.advance(t)
+                if arrival is not None:
+                    t = arrival
+                    continue
+                if ctrl.is_busy:
+                    ctrl.set_idle()
+                t = self._on_timer(t)
+            elif t >= until:
+                # A relocation ran past the task's arrival
+                return t
+            elif not ctrl.start_relocation(t):
+                if slotting.ready(t, ctrl.idle_since):
+                    # Nothing worth moving, and nothing changes until the task
+                    return until
+                ready = self._on_timer(slotting.ready_at(ctrl.idle_since))
+                if ready >= until:
+                    return until
+                t = ready if ready > t else t + self.control_period
+
+    def _run_task(
+        self,
+        ctrl: WarehouseController,
+        task: dict,
+        dispatched: float,
+        now: float,
+        started: bool,
+        calls: int,
+    ) -> TaskResult:
+        """Advance a task started (or rejected) at time now to completion."""
+        result = TaskResult(
+            task_id=task.get("id", ""),
+            name=task["name"],
+            tray=task.get("tray"),
+            status="rejected",
+            dispatched=dispatched,
+            finished=now,
+        )
+        if not started:
+            return result
+
+        # The mission is driven from the next control_loop tick
+        plat = ctrl.wh.platform
+        t = self._on_timer(now)
+        while True:
+            arrival = ctrl.advance(t)
+            if arrival is None:
+                break
+            _, start, target = plat.move[:3]
+            result.moves += 1
+            result.distance += abs(target - start)
+            t = arrival
+
+        result.planner_calls = ctrl.planner_calls - calls
+        if ctrl.is_busy:
+            # Nothing else changes the warehouse, so a waiting planner never resumes
+            ctrl.set_idle()
+            result.status = "stalled"
+            result.finished = t
+            return result
+        result.status = "done"
+        result.finished = self._on_timer(t)
+        return result
@@ -2,6 +2,13 @@ from tray import Tray
 
 
 class Slot:
+    __slots__ = ("x", "y", "slot_id", "slot_type", "tray", "on_change")
+
+    # Defines the physical size of the slot (shared by every slot)
+    length = 1.62
+    height = 0.16725
+    width = 0.7
+
     def __init__(self, slot_id: str, x: float, y: float, slot_type: str = "storage"):
         # Unique coordinates and identifier for this specific slot.
         self.x = x
@@ -9,14 +16,12 @@ class Slot:
         self.slot_id = slot_id
         self.slot_type = slot_type
 
-        # Defines the physical size of the slot
-        self.length = 1.62
-        self.height = 0.16725
-        self.width = 0.7
-
         # Holds the Tray object if occupied, otherwise None.
         self.tray = None
 
+        # Optional callback(slot, tray) run after a tray is added or removed.
+        self.on_change = None
+
     def __repr__(self):
         status = "Full" if self.tray else "Empty"
         return f"<Slot ID: '{self.slot_id}' ({status})>"
@@ -32,6 +37,8 @@ class Slot:
             )  # Slot is full
 
         self.tray = tray_to_add
+        if self.on_change:
+            self.on_change(self, tray_to_add)
         return True
 
     def remove_tray(self):
@@ -44,4 +51,6 @@ class Slot:
 
         tray_removed = self.tray
         self.tray = None
+        if self.on_change:
+            self.on_change(self, tray_removed)
         return tray_removed
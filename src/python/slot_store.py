@@ -0,0 +1,151 @@
+try:
+    import numpy as np
+except ImportError:  # optional dependency, only needed for columnar warehouses
+    np = None
+
+from layout import SLOT_TYPES
+from slot import Slot
+from tray import Tray
+
+
+class SlotView:
+    """
+    Slot API over one row of a SlotStore. Views are created once per slot,
+    so identity comparisons between slots keep working.
+    """
+
+    __slots__ = ("_store", "_i")
+
+    # Same behaviour as Slot, through the properties below
+    add_tray = Slot.add_tray
+    remove_tray = Slot.remove_tray
+    __repr__ = Slot.__repr__
+
+    length = Slot.length
+    height = Slot.height
+    width = Slot.width
+
+    def __init__(self, store: "SlotStore", index: int):
+        self._store = store
+        self._i = index
+
+    @property
+    def slot_id(self) -> str:
+        return self._store.ids[self._i]
+
+    @property
+    def slot_type(self) -> str:
+        return SLOT_TYPES[self._store.type_code[self._i]]
+
+    @property
+    def x(self) -> float:
+        return float(self._store.x[self._i])
+
+    @property
+    def y(self) -> float:
+        return float(self._store.y[self._i])
+
+    @property
+    def tray(self) -> Tray | None:
+        return self._store.trays.get(self._i)
+
+    @tray.setter
+    def tray(self, tray: Tray | None):
+        self._store.set_tray(self._i, tray)
+
+    @property
+    def on_change(self):
+        return self._store.on_change
+
+    @on_change.setter
+    def on_change(self, callback):
+        self._store.on_change = callback
+
+
+class SlotStore:
+    """
+    Columnar slot storage: NumPy arrays for x, y, type code, tray ID per slot
+    (0 = empty) and tray weight, plus the Tray objects of occupied slots.
+    Index i is the i-th slot passed in, and views[i] its SlotView.
+    The store is for vectorized queries, not memory: with a SlotView per
+    slot and the Tray objects kept, a columnar warehouse uses about as
+    much memory as an object one.
+    """
+
+    def __init__(self, slots):
+        if np is None:
+            raise ImportError("SlotStore requires numpy (pip install numpy)")
+        slots = list(slots)
+        n = len(slots)
+        self.ids = [s.slot_id for s in slots]
+        self.x = np.fromiter((s.x for s in slots), dtype=np.float64, count=n)
+        self.y = np.fromiter((s.y for s in slots), dtype=np.float64, count=n)
+        self.type_code = np.fromiter(
+            (SLOT_TYPES.index(s.slot_type) for s in slots), dtype=np.int8, count=n
+        )
+        self.tray_id = np.zeros(n, dtype=np.int64)
+        self.tray_weight = np.zeros(n, dtype=np.float64)
+        self.trays: dict[int, Tray] = {}
+        self.on_change = None
+        self.views = tuple(SlotView(self, i) for i in range(n))
+        for i, s in enumerate(slots):
+            if s.tray is not None:
+                self.set_tray(i, s.tray)
+
+    def set_tray(self, i: int, tray: Tray | None):
+        """Store (or clear, with None) the tray of slot i."""
+        if tray is None:
+            self.trays.pop(i, None)
+            self.tray_id[i] = 0
+            self.tray_weight[i] = 0.0
+        else:
+            self.trays[i] = tray
+            self.tray_id[i] = tray.tray_id
+            self.tray_weight[i] = tray.weight
+
+    def full_mask(self):
+        """Boolean array: slot holds a full tray (same threshold as Tray.is_full)."""
+        return self.tray_weight > Tray.MIN_W + 0.01
+
+    def _first(self, mask) -> SlotView | None:
+        # argmax raises on an empty array
+        if not mask.any():
+            return None
+        return self.views[int(mask.argmax())]
+
+    def first_empty(self, slot_type: str) -> SlotView | None:
+        """First slot of the given type without a tray."""
+        code = SLOT_TYPES.index(slot_type)
+        return self._first((self.type_code == code) & (self.tray_id == 0))
+
+    def first_with_empty_tray(self) -> SlotView | None:
+        """First slot holding a tray that is not full."""
+        return self._first((self.tray_id != 0) & ~self.full_mask())
+
+    def empty(self, slot_type: str):
+        """Indexes of all slots of the given type without a tray."""
+        code = SLOT_TYPES.index(slot_type)
+        return np.flatnonzero((self.type_code == code) & (self.tray_id == 0))
+
+    def with_empty_tray(self):
+        """Indexes of all slots holding a tray that is not full."""
+        return np.flatnonzero((self.tray_id != 0) & ~self.full_mask())
+
+    def slot_of_tray(self, tray_id: int) -> SlotView | None:
+        """Slot holding the given tray."""
+        return self._first(self.tray_id == int(tray_id))
+
+    def occupied(self):
+        """Indexes of all slots holding a tray."""
+        return np.flatnonzero(self.tray_id)
+
+    def snapshot(self) -> tuple:
+        """Copy of the occupancy columns, for changed_since."""
+        return self, self.tray_id.copy(), self.full_mask()
+
+    def changed_since(self, snapshot: tuple | None):
+        """Indexes of slots whose tray or fullness differs from snapshot."""
+        if snapshot is None or snapshot[0] is not self:
+            return np.arange(len(self.views))
+        _, tray_id, full = snapshot
+        return np.flatnonzero((self.tray_id != tray_id) | (self.full_mask() != full))
@@ -0,0 +1,131 @@
+from collections import Counter
+from typing import Optional
+
+from warehouse_platform import Platform
+
+# Mission name of the optimizer's own moves (never submitted by callers)
+RELOCATE = "Relocate"
+
+
+class SlottingOptimizer:
+    """
+    Moves frequently extracted trays to free storage slots near the bay
+    while the controller has nothing else to do.
+
+    Accesses are counted per tray as extract missions start. A relocation
+    is proposed for the most accessed tray that would get at least
+    min_gain seconds closer to the bay (Platform.approach_time from the bay
+    slot). The throttle keeps it out of the way of real requests: the
+    controller must have been idle for min_idle seconds, relocations start
+    at most once per cooldown, and only moves whose loaded leg (pickup to
+    new slot) takes at most max_delay are proposed. Before the pickup, a
+    relocation is preempted by any queued request (see
+    WarehouseController.start_next), so max_delay bounds how long a request
+    can wait for one.
+    """
+
+    def __init__(
+        self,
+        min_idle: float = 5.0,
+        cooldown: float = 30.0,
+        min_accesses: int = 2,
+        min_gain: float = 1.0,
+        # About one short loaded leg: the 9.3 s in/out X legs plus ~2 m of Y
+        max_delay: float = 20.0,
+    ):
+        self.min_idle = min_idle
+        self.cooldown = cooldown
+        self.min_accesses = min_accesses
+        self.min_gain = min_gain
+        self.max_delay = max_delay
+        self.reset()
+
+    def reset(self):
+        """Forget access counts, throttle state and counters."""
+        self.accesses: Counter = Counter()
+        self.relocations = 0
+        self.preempted = 0
+        self._last_start: Optional[float] = None
+
+    def record(self, tray_id: int):
+        """Count one access (extract) of a tray."""
+        self.accesses[int(tray_id)] += 1
+
+    def ready_at(self, idle_since: float) -> float:
+        """Earliest time the throttle allows the next relocation to start."""
+        earliest = idle_since + self.min_idle
+        if self._last_start is not None:
+            earliest = max(earliest, self._last_start + self.cooldown)
+        return earliest
+
+    def ready(self, now: float, idle_since: float) -> bool:
+        """True if the throttle allows a relocation to start at time now."""
+        return now >= self.ready_at(idle_since)
+
+    def propose(self, warehouse) -> Optional[tuple]:
+        """
+        Next relocation as (source slot, free storage slot), or None.
+
+        The most accessed tray that can get min_gain seconds closer to the
+        bay moves to the nearest free storage slot, if that is close
+        enough. Otherwise a colder tray in a closer slot first makes room:
+        it moves to a free slot at least as far from the bay as the hot
+        tray, which takes its place on a later call.
+        """
+        bay = warehouse.get_tray_bay_slot()
+        if bay is None:
+            return None
+        approach = Platform.approach_time
+
+        def bay_time(slot) -> float:
+            return approach(bay.x, bay.y, slot.x, slot.y)
+
+        # Storage slots from the bay outwards
+        slots = sorted(warehouse.storage_slots, key=bay_time)
+        free = [s for s in slots if s.tray is None]
+        if not free:
+            return None
+
+        for tray_id, count in self.accesses.most_common():
+            if count < self.min_accesses:
+                break
+            slot = warehouse.get_slot_by_tray(tray_id)
+            if slot is None or slot.slot_type != "storage":
+                continue
+            limit = bay_time(slot) - self.min_gain
+            if bay_time(free[0]) <= limit:
+                move = (slot, free[0])
+            else:
+                move = self._make_room(slots, free, slot, count, limit, bay_time)
+            if move is None:
+                continue
+            src, dst = move
+            if approach(src.x, src.y, dst.x, dst.y) <= self.max_delay:
+                return move
+        return None
+
+    def _make_room(self, slots, free, slot, count, limit, bay_time):
+        """Move the first colder tray closer than limit out past slot."""
+        for near in slots:
+            if bay_time(near) > limit:
+                return None
+            if near.tray is None or self.accesses[int(near.tray.tray_id)] >= count:
+                continue
+            far = bay_time(slot)
+            # The farthest free slot if none is as far as the hot tray
+            dst = next((s for s in free if bay_time(s) >= far), free[-1])
+            return near, dst
+        return None
+
+    def started(self, now: float):
+        """Note that a proposed relocation started at time now."""
+        self._last_start = now
+        self.relocations += 1
+
+    @property
+    def stats(self) -> dict:
+        return {
+            "relocations": self.relocations,
+            "preempted": self.preempted,
+            "tracked_trays": len(self.accesses),
+        }
@@ -0,0 +1,177 @@
+from bisect import bisect_left
+from heapq import heappush, heapreplace
+
+from warehouse_platform import Platform, travel_time
+
+# Max distance (per axis, exclusive) between a position and the slot at it
+TOLERANCE = 0.01
+
+
+def _matches(slot, x: float, y: float, tol: float) -> bool:
+    return abs(slot.x - x) < tol and abs(slot.y - y) < tol
+
+
+class SortedIndex:
+    """
+    Slot lookup by position for any layout: bisect over slots sorted by y,
+    then scan the few slots within the tolerance band. O(log n).
+    """
+
+    def __init__(self, slots, tol: float = TOLERANCE):
+        self.tol = tol
+        entries = sorted((s.y, i, s) for i, s in enumerate(slots))
+        self._ys = [e[0] for e in entries]
+        self._entries = entries
+
+    def lookup(self, x: float, y: float):
+        """Return the first slot (in layout order) within tolerance, or None."""
+        tol = self.tol
+        best = None
+        # Widened window, exact tolerance check below
+        j = bisect_left(self._ys, y - 2 * tol)
+        while j < len(self._ys) and self._ys[j] <= y + 2 * tol:
+            _, order, slot = self._entries[j]
+            if _matches(slot, x, y, tol) and (best is None or order < best[0]):
+                best = (order, slot)
+            j += 1
+        return best[1] if best else None
+
+
+class GridIndex:
+    """
+    Slot lookup by position for regular layouts: rows on a fixed y pitch and
+    a few distinct x columns. The cell is computed directly. O(1).
+    Raises ValueError if the slots do not form such a grid.
+    """
+
+    def __init__(self, slots, tol: float = TOLERANCE, eps: float = 1e-6):
+        self.tol = tol
+        slots = list(slots)
+        if not slots:
+            raise ValueError("Empty layout")
+
+        ys = sorted({s.y for s in slots})
+        gaps = [b - a for a, b in zip(ys, ys[1:]) if b - a > eps]
+        self.y0 = ys[0]
+        self.pitch = min(gaps) if gaps else 1.0
+        self.xs = sorted({s.x for s in slots})
+        if self.pitch <= 2 * tol or any(
+            b - a <= 2 * tol for a, b in zip(self.xs, self.xs[1:])
+        ):
+            raise ValueError("Slots closer than the lookup tolerance")
+
+        self._cells = {}
+        for s in slots:
+            row = round((s.y - self.y0) / self.pitch)
+            if abs(s.y - (self.y0 + row * self.pitch)) > eps:
+                raise ValueError(f"Slot {s.slot_id} is off the row pitch")
+            cell = (bisect_left(self.xs, s.x), row)
+            if cell in self._cells:
+                raise ValueError(f"Slot {s.slot_id} shares a grid cell")
+            self._cells[cell] = s
+
+    def lookup(self, x: float, y: float):
+        """Return the slot within tolerance of (x, y), or None."""
+        i = bisect_left(self.xs, x)
+        if i == len(self.xs) or (i > 0 and x - self.xs[i - 1] < self.xs[i] - x):
+            i -= 1
+        slot = self._cells.get((i, round((y - self.y0) / self.pitch)))
+        if slot is not None and _matches(slot, x, y, self.tol):
+            return slot
+        return None
+
+
+def _approach_cost(x: float, y: float, slot) -> float:
+    return Platform.approach_time(x, y, slot.x, slot.y)
+
+
+def _y_travel_time(dy: float) -> float:
+    return travel_time(dy, Platform.speed_y, Platform.accel_y)
+
+
+class NearestIndex:
+    """
+    Candidate slots sorted by y, for the one with the shortest platform
+    travel time from a position (Platform.approach_time). The search walks
+    out from the position's row and stops once the Y travel alone is longer
+    than the best time found. Ties go to the first slot in layout order.
+    """
+
+    def __init__(self, slots):
+        entries = sorted((s.y, i, s) for i, s in enumerate(slots))
+        self._ys = [e[0] for e in entries]
+        self._entries = entries
+        self._first = min(entries, key=lambda e: e[1])[2] if entries else None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def first(self):
+        """First candidate in layout order (the rules' arbitrary choice)."""
+        return self._first
+
+    def nearest(self, x: float, y: float):
+        """Candidate reached first from (x, y), or None if there are none."""
+        ys, entries = self._ys, self._entries
+        approach = Platform.approach_time
+        hi = bisect_left(ys, y)
+        lo = hi - 1
+        best, best_key = None, None
+        while lo >= 0 or hi < len(ys):
+            # Expand towards the closer row first
+            if hi >= len(ys) or (lo >= 0 and y - ys[lo] <= ys[hi] - y):
+                j, lo = lo, lo - 1
+            else:
+                j, hi = hi, hi + 1
+            sy, order, slot = entries[j]
+            if best_key is not None and (
+                travel_time(sy - y, Platform.speed_y, Platform.accel_y) > best_key[0]
+            ):
+                break
+            key = (approach(x, y, slot.x, sy), order)
+            if best_key is None or key < best_key:
+                best, best_key = slot, key
+        return best
+
+    def k_nearest(self, x: float, y: float, k: int, cost=None, y_cost=None) -> list:
+        """
+        The k candidates cheapest to reach from (x, y), plus any that tie
+        with the k-th, in layout order. cost(x, y, slot) defaults to
+        Platform.approach_time. y_cost(dy) must not exceed the cost of any
+        slot dy away in y (by default the Y travel time); the search stops
+        once it exceeds the k-th best cost.
+        """
+        if k <= 0:
+            return []
+        cost = cost or _approach_cost
+        y_cost = y_cost or _y_travel_time
+        ys, entries = self._ys, self._entries
+        hi = bisect_left(ys, y)
+        lo = hi - 1
+        # Max-heap (negated) of the k best costs so far
+        best: list = []
+        seen = []
+        while lo >= 0 or hi < len(ys):
+            if hi >= len(ys) or (lo >= 0 and y - ys[lo] <= ys[hi] - y):
+                j, lo = lo, lo - 1
+            else:
+                j, hi = hi, hi + 1
+            sy, order, slot = entries[j]
+            if len(best) == k and y_cost(abs(sy - y)) > -best[0]:
+                break
+            c = cost(x, y, slot)
+            seen.append((order, c, slot))
+            if len(best) < k:
+                heappush(best, -c)
+            elif c < -best[0]:
+                heapreplace(best, -c)
+        limit = -best[0] if best else None
+        return [slot for order, c, slot in sorted(seen) if c <= limit]
+
+
+def build_spatial_index(slots, tol: float = TOLERANCE):
+    """Use a GridIndex when the layout is regular, a SortedIndex otherwise."""
+    try:
+        return GridIndex(slots, tol)
+    except ValueError:
+        return SortedIndex(slots, tol)
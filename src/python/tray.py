@@ -1,4 +1,6 @@
 class Tray:
+    __slots__ = ("tray_id", "weight")
+
     # --- System Counter for Unique ID ---
     _next_id = 1
 
@@ -6,16 +8,16 @@ class Tray:
     MIN_W = 2.960  # The weight of an empty tray.
     MAX_W = 4.960  # The maximum weight of a fully loaded tray.
 
+    # --- Fixed Physical Dimensions (shared by every tray) ---
+    length = 1.62
+    height = 0.16725
+    width = 0.7
+
     def __init__(self, weight=None):
         # 1. Assign unique ID and increment the counter
         self.tray_id = Tray._next_id
         Tray._next_id += 1
 
-        # --- Fixed Physical Dimensions ---
-        self.length = 1.62
-        self.height = 0.16725
-        self.width = 0.7
-
         self.weight = weight if weight is not None and weight>=self.MIN_W and weight<=self.MAX_W else self.MIN_W
 
     @property
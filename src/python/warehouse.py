@@ -1,6 +1,9 @@
 from warehouse_platform import Platform
 from slot import Slot
 from tray import Tray
+from spatial_index import build_spatial_index
+from layout import build_slots, place_trays, read_layout
+from slot_store import SlotStore
 
 
 class Warehouse:
@@ -8,16 +11,39 @@ class Warehouse:
     X_RIGHT = 0.7
     SLOT_HEIGHT = 0.16725
     NUM_ROWS = 20
+    # Callable(slots) -> index with lookup(x, y); picks grid or bisect by default
+    SPATIAL_INDEX = staticmethod(build_spatial_index)
 
-    def __init__(self):
+    def __init__(self, layout: dict | None = None, columnar: bool = False):
+        """
+        Build the default 20-row tower with sample trays, or the layout
+        described by a dict (see layout.py and from_file).
+        With columnar, slot data lives in a NumPy SlotStore (self.store) and
+        the slot lists hold SlotView objects (requires numpy).
+        """
         Tray._next_id = 1
 
         # --- Physical Components ---
         self.platform = Platform()
         self.storage_slots = []
         self.queued_slots = []
+        self.bay_slots = []
         self.in_view_slot = None
 
+        # XOR of per-slot occupancy hashes, updated by Slot.add_tray/remove_tray
+        self.occupancy_hash = 0
+
+        # --- Lookup indexes (built by _index_slots) ---
+        self._all_slots: tuple[Slot, ...] = ()
+        self._slots_by_id: dict[str, Slot] = {}
+        self._slots_by_tray: dict[int, Slot] = {}
+        self._spatial = None
+        self.store: SlotStore | None = None
+
+        if layout is not None:
+            self._load_layout(layout, columnar)
+            return
+
         # --- Initialize all slot positions ---
         for i in range(self.NUM_ROWS):
             y_pos = i * self.SLOT_HEIGHT
@@ -46,6 +72,7 @@ class Warehouse:
                     slot_id=slot_id, x=self.X_RIGHT, y=y_pos, slot_type="bay"
                 )
                 self.in_view_slot = new_slot
+                self.bay_slots.append(new_slot)
 
             else:  # Rows 4-19 (Storage)
                 slot_id = f"storage_R_{i}"
@@ -55,6 +82,8 @@ class Warehouse:
                 )
                 self.storage_slots.append(new_slot)
 
+        self._index_slots()
+
         try:
             # --- Initialize Trays: They get sequential IDs 1, 2, 3, 4, 5 ecc ecc ---
 
@@ -81,34 +110,98 @@ class Warehouse:
         except AttributeError as e:
             print(f"Error during warehouse initialization: {e}")
 
+        if columnar:
+            self._use_store()
+            self._index_slots()
+
+    @classmethod
+    def from_file(cls, path: str, columnar: bool = False) -> "Warehouse":
+        """Build a warehouse from a YAML or JSON layout file."""
+        return cls(read_layout(path), columnar)
+
+    def _load_layout(self, layout: dict, columnar: bool = False):
+        """Build all slots and trays of a layout in bulk, then index them."""
+        slots = build_slots(layout, float(layout.get("row_pitch", self.SLOT_HEIGHT)))
+        by_id = {}
+        for slot in slots:
+            if slot.slot_id in by_id:
+                raise ValueError(f"Duplicate slot ID: {slot.slot_id}")
+            by_id[slot.slot_id] = slot
+            if slot.slot_type == "queue":
+                self.queued_slots.append(slot)
+            elif slot.slot_type == "bay":
+                self.bay_slots.append(slot)
+            else:
+                self.storage_slots.append(slot)
+        self.in_view_slot = self.bay_slots[0] if self.bay_slots else None
+
+        place_trays(layout, by_id)
+        if columnar:
+            self._use_store()
+        self._index_slots()
+
+    def _use_store(self):
+        """Move all slots into a columnar SlotStore and swap in its views."""
+        slots = self.storage_slots + self.queued_slots + self.bay_slots
+        self.store = SlotStore(slots)
+        views = dict(zip((s.slot_id for s in slots), self.store.views))
+        self.storage_slots = [views[s.slot_id] for s in self.storage_slots]
+        self.queued_slots = [views[s.slot_id] for s in self.queued_slots]
+        self.bay_slots = [views[s.slot_id] for s in self.bay_slots]
+        if self.in_view_slot:
+            self.in_view_slot = views[self.in_view_slot.slot_id]
+
+    def _index_slots(self):
+        """
+        Rebuild the all-slots tuple, the spatial index, the slot ID / tray ID
+        indexes and the occupancy hash.
+        Must be called again if slots are added to the layout lists.
+        """
+        self._all_slots = tuple(self.storage_slots + self.queued_slots + self.bay_slots)
+        self._slots_by_id = {slot.slot_id: slot for slot in self._all_slots}
+        self._spatial = self.SPATIAL_INDEX(self._all_slots)
+        self._slots_by_tray = {
+            int(slot.tray.tray_id): slot for slot in self._all_slots if slot.tray
+        }
+        self.occupancy_hash = 0
+        for slot in self._slots_by_tray.values():
+            self.occupancy_hash ^= self._occupancy_term(slot, slot.tray)
+        for slot in self._all_slots:
+            slot.on_change = self._on_slot_change
+
+    @staticmethod
+    def _occupancy_term(slot: Slot, tray: Tray) -> int:
+        """Contribution of one occupied slot to the occupancy hash."""
+        return hash((slot.slot_id, tray.tray_id, tray.is_full))
+
+    def _on_slot_change(self, slot: Slot, tray: Tray):
+        """Toggle the (slot, tray) pair in the occupancy hash, update tray index."""
+        self.occupancy_hash ^= self._occupancy_term(slot, tray)
+        tid = int(tray.tray_id)
+        if slot.tray is tray:
+            self._slots_by_tray[tid] = slot
+        elif self._slots_by_tray.get(tid) is slot:
+            del self._slots_by_tray[tid]
+
     def has_tray(self, tray_id: int | str) -> bool:
         """Check whether a tray with the given ID exists anywhere in the warehouse."""
-        tid = int(tray_id)
-        for slot in self._get_all_slots():
-            if slot.tray and slot.tray.tray_id == tid:
-                return True
-        return False
+        return int(tray_id) in self._slots_by_tray
+
+    def get_slot_by_tray(self, tray_id: int | str) -> Slot | None:
+        """Returns the slot currently holding the given tray, or None."""
+        return self._slots_by_tray.get(int(tray_id))
 
     def get_slot_at(self, x: float, y: float) -> Slot | None:
-        for slot in self._get_all_slots():
-            if abs(slot.x - x) < 0.01 and abs(slot.y - y) < 0.01:
-                return slot
-        return None
+        """Returns the slot within 0.01 of (x, y) on both axes, or None."""
+        return self._spatial.lookup(x, y)
 
-    def _get_all_slots(self):
-        """Helper to return one single list of all slots."""
-        # Combines all slot lists into one for easy searching
-        all_slots = self.storage_slots + self.queued_slots
-        if self.in_view_slot:
-            all_slots.append(self.in_view_slot)
-        return all_slots
+    def _get_all_slots(self) -> tuple[Slot, ...]:
+        """Helper to return one single (cached, immutable) tuple of all slots."""
+        return self._all_slots
 
     def get_slot_by_id(self, slot_id: str):
         """Finds and returns a slot object from its ID string."""
-        for slot in self._get_all_slots():
-            if slot.slot_id == slot_id:
-                return slot
-        return None  # Controller must handle if ID is not found
+        return self._slots_by_id.get(slot_id)  # None if ID is not found
 
     # --- State Methods for the Controller ---
 
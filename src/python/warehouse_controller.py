@@ -1,8 +1,21 @@
 import logging
+import random
 from typing import Optional
 from enum import Enum
 from slot import Slot
-from cfg_engine import get_next_action_from_egglog
+from cfg_engine import (
+    ActionCache,
+    MissionPlan,
+    PlannerSession,
+    RobotAction,
+    get_next_action_from_egglog,
+    plan_mission,
+)
+from fast_planner import FastPlanner
+from mission_queue import MISSIONS, MissionQueue, QueuedMission
+from slotting import RELOCATE, SlottingOptimizer
+
+PLANNER_BACKENDS = ("egglog", "python", "shadow")
 
 
 class MissionState(Enum):
@@ -16,8 +29,37 @@ class MissionState(Enum):
 class WarehouseController:
     """Controller for warehouse robot missions using egglog planning."""
 
-    def __init__(self, warehouse):
-        """Initialize controller with warehouse reference."""
+    def __init__(
+        self,
+        warehouse,
+        plan_missions: bool = False,
+        planner_backend: str = "egglog",
+        shadow_rate: float = 0.1,
+        planner: Optional[PlannerSession] = None,
+        queue_policy: str = "fifo",
+        lookahead: int = 4,
+        slotting: Optional[SlottingOptimizer] = None,
+        max_queue: Optional[int] = None,
+    ):
+        """
+        Initialize controller with warehouse reference.
+        With plan_missions, each mission is planned once and replayed tick
+        by tick instead of querying egglog on every tick.
+        planner_backend selects who decides each tick: "egglog", the
+        table-driven "python" planner, or "shadow" (python decides, and on a
+        shadow_rate fraction of ticks egglog verifies the decision; any
+        divergence is logged). plan_missions only applies to egglog.
+        An existing PlannerSession can be passed in to reuse its registered
+        rules across controllers.
+        queue_policy orders submitted missions ("fifo" or "lookahead", see
+        MissionQueue); lookahead also chains a SendBack towards the pickup
+        of the mission queued after it. With max_queue, submit() raises
+        QueueFull once that many missions wait.
+        With a SlottingOptimizer, extracts are counted per tray and
+        start_relocation() moves hot trays towards the bay when idle.
+        """
+        if planner_backend not in PLANNER_BACKENDS:
+            raise ValueError(f"Unknown planner backend: {planner_backend}")
         self.wh = warehouse
         self.state = MissionState.IDLE
         self.source_slot: Optional[Slot] = None
@@ -25,6 +67,37 @@ class WarehouseController:
         self.dest_type: Optional[str] = None
         self.locked_target_id: Optional[str] = None
         self.target_tray_id: Optional[int] = None
+        # Created on first egglog query: the python backend never needs it
+        self._planner: Optional[PlannerSession] = planner
+        self.action_cache = ActionCache()
+        self.plan_missions = plan_missions
+        self.plan: Optional[MissionPlan] = None
+        self.planner_backend = planner_backend
+        self.fast_planner = FastPlanner()
+        self.shadow_rate = shadow_rate
+        self.shadow_checks = 0
+        self.shadow_divergences = 0
+        # Planner invocations; replayed mission-plan steps are not counted
+        self.planner_calls = 0
+        # Submitted missions, and the one start_next() started last
+        self.queue = MissionQueue(queue_policy, lookahead, max_queue)
+        self.mission: Optional[QueuedMission] = None
+        # Logical time (s) while advance() runs: moves become analytic
+        self._now: Optional[float] = None
+        self.slotting = slotting
+        # Logical time the last mission finished (set by advance())
+        self.idle_since: Optional[float] = None
+        # Mission name -> (spec, bound entry point), resolved once
+        self._entries = {
+            name: (spec, getattr(self, spec.entry)) for name, spec in MISSIONS.items()
+        }
+
+    @property
+    def planner(self) -> PlannerSession:
+        """Long-lived egglog session, built on first use."""
+        if self._planner is None:
+            self._planner = PlannerSession()
+        return self._planner
 
     @property
     def is_busy(self) -> bool:
@@ -43,7 +116,9 @@ class WarehouseController:
         self.dest_slot = dst
         self.dest_type = dst_type
         self.target_tray_id = tray_id
+        self.plan = None
         self.state = MissionState.FETCH
+        self.idle_since = None
 
     # TODO: enqueue any empty tray?
     def build_enqueue_sequence(self, tray_number: int) -> bool:
@@ -73,16 +148,20 @@ class WarehouseController:
                 return False
             logging.info(f"Starting EXTRACT from queue: {src.slot_id} -> {dst.slot_id}")
             self._start_mission(src, dst)
+        if self.slotting:
+            self.slotting.record(self.target_tray_id or self.source_slot.tray.tray_id)
         return True
 
-    def build_sendback_sequence(self) -> bool:
-        """Move tray from bay to any storage slot."""
+    def build_sendback_sequence(self, dst: Optional[Slot] = None) -> bool:
+        """Move tray from bay to dst, or to any storage slot."""
         src = self.wh.get_occupied_bay_slot()
         if not src:
             logging.error("[REJECTED] SendBack: Bay is empty")
             return False
-        logging.info(f"Starting SENDBACK: {src.slot_id} -> storage")
-        self._start_mission(src, None, "storage")
+        logging.info(
+            f"Starting SENDBACK: {src.slot_id} -> {dst.slot_id if dst else 'storage'}"
+        )
+        self._start_mission(src, dst, "storage")
         return True
 
     def build_fetch_any_empty_sequence(self) -> bool:
@@ -94,6 +173,143 @@ class WarehouseController:
         self._start_mission(None, dst)
         return True
 
+    def start(self, name: str, tray: Optional[int] = None) -> bool:
+        """Start a mission by name (see MISSIONS) right away."""
+        try:
+            spec, entry = self._entries[name]
+        except KeyError:
+            raise ValueError(f"Unknown mission: {name}") from None
+        if not spec.takes_tray:
+            return entry()
+        if spec.needs_tray and tray is None:
+            return False
+        return entry(tray or 0)
+
+    def submit(
+        self,
+        name: str,
+        tray: Optional[int] = None,
+        ref=None,
+        priority: Optional[int] = None,
+        deadline: Optional[float] = None,
+        now: Optional[float] = None,
+    ) -> QueuedMission:
+        """
+        Queue a mission; start_next() runs it once the controller is idle.
+        priority defaults to the mission's (see MISSIONS). With a deadline,
+        queue.expire() drops it if it has not started by then; now is the
+        submission time for the wait statistics.
+        """
+        spec = MISSIONS.get(name)
+        if spec is None:
+            raise ValueError(f"Unknown mission: {name}")
+        if priority is None:
+            priority = spec.priority
+        mission = QueuedMission(name, tray, ref, priority, deadline, now)
+        self.queue.append(mission)
+        return mission
+
+    def start_next(
+        self, now: Optional[float] = None
+    ) -> Optional[tuple[QueuedMission, bool]]:
+        """
+        If idle, take the next queued mission (by queue policy) and start it.
+        A relocation that has not picked up its tray yet gives way to it.
+        Returns the mission and whether it started, or None if nothing ran.
+        now (same clock as submit) records how long the mission waited.
+        """
+        if self.is_busy and not (self.queue and self.preempt_relocation()):
+            return None
+        mission = self.queue.pop_next(self.wh, now)
+        if mission is None:
+            return None
+        self.mission = mission
+        if mission.name == "SendBack" and self.queue.policy == "lookahead":
+            started = self.build_sendback_sequence(self._chained_storage_slot())
+        else:
+            started = self.start(mission.name, mission.tray)
+        return mission, started
+
+    def _chained_storage_slot(self) -> Optional[Slot]:
+        """
+        Free storage slot that minimizes bay -> slot -> pickup of the next
+        queued mission, so the platform does not return empty across the
+        tower. None (any slot) if the next pickup is not known.
+        """
+        bay = self.wh.get_occupied_bay_slot()
+        following = self.queue.peek()
+        pickup = following.pickup_slot(self.wh) if following else None
+        if bay is None or pickup is None:
+            return None
+        approach = self.wh.platform.approach_time
+        free = [s for s in self.wh.storage_slots if s.tray is None]
+        best = min(
+            free,
+            key=lambda s: approach(bay.x, bay.y, s.x, s.y)
+            + approach(s.x, s.y, pickup.x, pickup.y),
+            default=None,
+        )
+        if best is not None:
+            logging.info(
+                f"Chaining SendBack to {best.slot_id} before {following} "
+                f"picks up at {pickup.slot_id}"
+            )
+        return best
+
+    @property
+    def relocating(self) -> bool:
+        """True while a slotting relocation is running."""
+        return (
+            self.is_busy and self.mission is not None and self.mission.name == RELOCATE
+        )
+
+    def start_relocation(self, now: float) -> bool:
+        """
+        If idle with nothing queued and the slotting throttle allows it,
+        start moving a frequently extracted tray closer to the bay.
+        """
+        if self.slotting is None or self.is_busy or self.queue:
+            return False
+        if self.idle_since is None:
+            self.idle_since = now
+        if not self.slotting.ready(now, self.idle_since):
+            return False
+        move = self.slotting.propose(self.wh)
+        if move is None:
+            return False
+        src, dst = move
+        tray_id = int(src.tray.tray_id)
+        logging.info(
+            f"Starting RELOCATE of tray {tray_id}: {src.slot_id} -> {dst.slot_id}"
+        )
+        self.mission = QueuedMission(RELOCATE, tray_id)
+        self._start_mission(src, dst)
+        self.slotting.started(now)
+        return True
+
+    def next_relocation_check(self, now: float) -> Optional[float]:
+        """
+        After start_relocation(now) did not start one: the time it should be
+        tried again, or None if only new work (a submitted or finished
+        mission) can change its answer. Lets an idle caller sleep instead
+        of polling.
+        """
+        if self.slotting is None or self.is_busy or self.queue:
+            return None
+        idle_since = now if self.idle_since is None else self.idle_since
+        ready = self.slotting.ready_at(idle_since)
+        # Throttle open yet nothing proposed: only new accesses or moves help
+        return ready if ready > now else None
+
+    def preempt_relocation(self) -> bool:
+        """Abandon a relocation that has not picked up its tray yet."""
+        if not self.relocating or self.state != MissionState.FETCH:
+            return False
+        logging.info(f"Relocation of tray {self.mission.tray} preempted")
+        self.slotting.preempted += 1
+        self.set_idle()
+        return True
+
     def tick(self) -> bool:
         """Execute one mission step: query egglog and run action."""
         if not self.is_busy:
@@ -103,35 +319,97 @@ class WarehouseController:
         plat = self.wh.platform
         result = self._get_next_action(plat)
 
-        if result["type"] == "lock":
-            self.locked_target_id = result.get("slot_id", "")
+        if result.type == "lock":
+            self.locked_target_id = result.slot_id or ""
             if self.locked_target_id:
                 logging.info(f"Locked target: {self.locked_target_id}")
             return True
 
-        if result["type"] == "wait":
+        if result.type == "wait":
             return False
 
         if not self._execute_action(result, plat):
-            logging.error(f"Action failed: {result['type']}")
+            logging.error(f"Action failed: {result.type}")
             self.set_idle()
             return False
 
-        if result["type"] == "pick" and self.state == MissionState.FETCH:
+        if result.type == "pick" and self.state == MissionState.FETCH:
             if not self.source_slot:
                 self.source_slot = self.wh.get_slot_at(plat.curr_x, plat.curr_y)
             self.state = MissionState.DELIVER
             logging.info("Transitioned to DELIVER phase")
             return True
 
-        if result["type"] == "place" and self.state == MissionState.DELIVER:
+        if result.type == "place" and self.state == MissionState.DELIVER:
             logging.info("Mission complete")
             self.set_idle()
             return True
 
         return True
 
-    def _get_next_action(self, plat) -> dict:
+    def advance(self, now: float) -> Optional[float]:
+        """
+        Event-driven alternative to tick() at logical time now (s).
+        Settles a move that has arrived, then runs mission steps until the
+        platform starts the next analytic move. Returns that move's arrival
+        time, or None if the controller went idle or the planner is waiting.
+        """
+        plat = self.wh.platform
+        if not plat.settle(now):
+            return plat.arrival_time
+
+        self._now = now
+        try:
+            while self.is_busy and plat.move is None:
+                if not self.tick():
+                    break
+        finally:
+            self._now = None
+        if not self.is_busy and self.idle_since is None:
+            self.idle_since = now
+        return plat.arrival_time
+
+    def _get_next_action(self, plat) -> RobotAction:
+        query = self._planner_query(plat)
+        if self.planner_backend != "egglog":
+            self.planner_calls += 1
+            action = self.fast_planner.next_action(self.wh, **query)
+            if self.planner_backend == "shadow" and random.random() < self.shadow_rate:
+                self._shadow_check(action, query)
+            return action
+
+        if not self.plan_missions:
+            self.planner_calls += 1
+            return get_next_action_from_egglog(
+                warehouse=self.wh,
+                **query,
+                session=self.planner,
+                cache=self.action_cache,
+            )
+
+        if self.plan is None or not self.plan.is_valid(self.wh):
+            self.planner_calls += 1
+            self.plan = plan_mission(
+                self.wh,
+                **query,
+                deliver_id=self.dest_slot.slot_id if self.dest_slot else "",
+                session=self.planner,
+            )
+        return self.plan.next_action(plat.curr_y, plat.curr_x)
+
+    def _shadow_check(self, action: RobotAction, query: dict):
+        """Verify a python planner decision against the egglog rules."""
+        self.shadow_checks += 1
+        if self.planner.verify(self.wh, action, **query):
+            return
+        self.shadow_divergences += 1
+        expected = self.planner.next_action(self.wh, **query)
+        logging.warning(
+            f"Planner divergence: python={action} egglog={expected} query={query}"
+        )
+
+    def _planner_query(self, plat) -> dict:
+        """Build the planner inputs for the current mission state."""
         phase = "deliver" if self.state == MissionState.DELIVER else "fetch"
 
         if self.target_tray_id is not None:
@@ -168,8 +446,7 @@ class WarehouseController:
             cmd = "DELIVER"
             effective_locked_id = self.locked_target_id or ""
 
-        return get_next_action_from_egglog(
-            warehouse=self.wh,
+        return dict(
             cy=plat.curr_y,
             cx=plat.curr_x,
             holding=plat.is_holding_tray(),
@@ -180,10 +457,10 @@ class WarehouseController:
             locked_id=effective_locked_id,
         )
 
-    def _execute_action(self, action: dict, plat) -> bool:
+    def _execute_action(self, action: RobotAction, plat) -> bool:
         """Execute physical action on platform."""
         try:
-            atype = action["type"]
+            atype = action.type
 
             if atype == "pick":
                 target = self.source_slot or self.wh.get_slot_at(
@@ -212,14 +489,17 @@ class WarehouseController:
                     self.locked_target_id = None
                 return success
 
-            elif atype == "update_y":
-                return plat.update_y_position(action["val"])
-            elif atype == "update_x":
-                return plat.update_x_position(action["val"])
+            elif atype in ("update_y", "update_x"):
+                if self._now is not None:
+                    plat.start_move(atype[-1], action.val, self._now)
+                    return True
+                if atype == "update_y":
+                    return plat.update_y_position(action.val)
+                return plat.update_x_position(action.val)
 
             return True
         except Exception as e:
-            logging.error(f"[EXECUTION FAIL] {action['type']}: {e}")
+            logging.error(f"[EXECUTION FAIL] {action.type}: {e}")
             return False
 
     def set_idle(self):
@@ -230,6 +510,7 @@ class WarehouseController:
         self.dest_type = None
         self.target_tray_id = None
         self.locked_target_id = None
+        self.plan = None
 
     def is_ready(self) -> bool:
         """Return True if idle and can accept new missions."""
@@ -1,7 +1,52 @@
+import math
+
 from slot import Slot
 
 
+def travel_time(distance: float, speed: float, accel: float | None = None) -> float:
+    """
+    Time to cover distance from rest to rest at top speed, with an optional
+    acceleration limit (trapezoidal profile, triangular for short moves).
+    """
+    distance = abs(distance)
+    if not accel:
+        return distance / speed
+    if distance >= speed * speed / accel:
+        return distance / speed + speed / accel
+    return 2 * math.sqrt(distance / accel)
+
+
+def travel_distance(
+    t: float, distance: float, speed: float, accel: float | None = None
+) -> float:
+    """Distance covered t seconds into a move of the given length."""
+    distance = abs(distance)
+    total = travel_time(distance, speed, accel)
+    if t >= total:
+        return distance
+    if t <= 0:
+        return 0.0
+    if not accel:
+        return speed * t
+    peak = min(speed, math.sqrt(distance * accel))
+    ramp = peak / accel
+    if t < ramp:
+        return 0.5 * accel * t * t
+    if t <= total - ramp:
+        return 0.5 * peak * ramp + peak * (t - ramp)
+    left = total - t
+    return distance - 0.5 * accel * left * left
+
+
 class Platform:
+    __slots__ = ("curr_x", "curr_y", "held_tray", "move", "on_arrived")
+
+    speed_y = 0.2  # Movement speed along the Y-axis
+    extract_speed = 0.15  # Movement speed for X-axis (extraction)
+    # Optional acceleration limits (m/s^2) for analytic moves; None = instant
+    accel_y = None
+    accel_x = None
+
     def __init__(self):
         # Stores the current vertical and horizontal position of the platform.
         self.curr_x = 0.0
@@ -10,8 +55,10 @@ class Platform:
         # Holds the Tray object if the platform is carrying one, otherwise None.
         self.held_tray = None
 
-        self.speed_y = 0.2  # Movement speed along the Y-axis
-        self.extract_speed = 0.15  # Movement speed for X-axis (extraction)
+        # Analytic move in progress: (axis, start, target, start_time, arrival_time)
+        self.move = None
+        # Optional callback(platform) run once when a move is settled.
+        self.on_arrived = None
 
     def is_holding_tray(self):
         """Checks if the platform is currently holding a tray."""
@@ -82,3 +129,73 @@ class Platform:
             self.curr_x -= step
 
         return True
+
+    # --- Analytic (event-driven) motion ---
+
+    def _axis(self, axis: str) -> tuple[float, float | None]:
+        if axis == "y":
+            return self.speed_y, self.accel_y
+        return self.extract_speed, self.accel_x
+
+    def start_move(self, axis: str, target: float, now: float) -> float:
+        """
+        Start moving one axis ("x" or "y") to target at logical time now (s).
+        The position is only committed by settle(). Returns the arrival time.
+        """
+        start = self.curr_y if axis == "y" else self.curr_x
+        arrival = now + travel_time(target - start, *self._axis(axis))
+        self.move = (axis, start, target, now, arrival)
+        return arrival
+
+    @property
+    def arrival_time(self) -> float | None:
+        """Logical arrival time of the move in progress, or None."""
+        return self.move[4] if self.move else None
+
+    def position_at(self, t: float) -> tuple[float, float]:
+        """(x, y) of the platform at logical time t during the current move."""
+        if not self.move:
+            return self.curr_x, self.curr_y
+        axis, start, target, t0, _ = self.move
+        covered = travel_distance(t - t0, target - start, *self._axis(axis))
+        pos = start + math.copysign(covered, target - start)
+        return (self.curr_x, pos) if axis == "y" else (pos, self.curr_y)
+
+    def settle(self, now: float) -> bool:
+        """
+        Commit the current move if it has arrived by now, firing on_arrived.
+        Returns False if the platform is still moving.
+        """
+        if not self.move:
+            return True
+        axis, _, target, _, arrival = self.move
+        if now < arrival:
+            return False
+        if axis == "y":
+            self.curr_y = target
+        else:
+            self.curr_x = target
+        self.move = None
+        if self.on_arrived:
+            self.on_arrived(self)
+        return True
+
+    # --- Travel estimates ---
+
+    @classmethod
+    def approach_time(cls, x0: float, y0: float, x1: float, y1: float) -> float:
+        """
+        Time to go from (x0, y0) to (x1, y1) the way missions move: retract
+        X, travel Y, extend X (a move within one row only travels X).
+        """
+        if y0 == y1:
+            return travel_time(x1 - x0, cls.extract_speed, cls.accel_x)
+        return (
+            travel_time(x0, cls.extract_speed, cls.accel_x)
+            + travel_time(y1 - y0, cls.speed_y, cls.accel_y)
+            + travel_time(x1, cls.extract_speed, cls.accel_x)
+        )
+
+    def time_to(self, slot: Slot) -> float:
+        """Estimated travel time from the current position to a slot."""
+        return self.approach_time(self.curr_x, self.curr_y, slot.x, slot.y)
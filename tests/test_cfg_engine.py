@@ -1,7 +1,19 @@
 import pytest
 from dataclasses import dataclass
 from typing import List, Optional
-from cfg_engine import get_next_action_from_egglog
+from cfg_engine import (
+    COMMAND_RULES,
+    QUERY_DEFAULTS,
+    ActionCache,
+    PlannerSession,
+    RobotAction,
+    SaturationSchedule,
+    _batch_groups,
+    _command_rules,
+    get_next_action_from_egglog,
+    get_next_actions_from_egglog,
+    plan_mission,
+)
 
 
 @dataclass
@@ -26,6 +38,9 @@ class MockWarehouse:
     def _get_all_slots(self):
         return self.slots
 
+    def get_slot_by_id(self, slot_id: str):
+        return next((s for s in self.slots if s.slot_id == slot_id), None)
+
 
 @pytest.fixture
 def basic_warehouse():
@@ -49,8 +64,8 @@ def test_fetch_move_y(basic_warehouse):
         cmd_type="FETCH",
         target_id=1,
     )
-    assert action["type"] == "update_y"
-    assert action["val"] == 20.0
+    assert action.type == "update_y"
+    assert action.val == 20.0
 
 
 def test_fetch_move_x(basic_warehouse):
@@ -64,8 +79,8 @@ def test_fetch_move_x(basic_warehouse):
         cmd_type="FETCH",
         target_id=1,
     )
-    assert action["type"] == "update_x"
-    assert action["val"] == 10.0
+    assert action.type == "update_x"
+    assert action.val == 10.0
 
 
 def test_fetch_pick(basic_warehouse):
@@ -79,7 +94,7 @@ def test_fetch_pick(basic_warehouse):
         cmd_type="FETCH",
         target_id=1,
     )
-    assert action["type"] == "pick"
+    assert action.type == "pick"
 
 
 def test_search_lock(basic_warehouse):
@@ -93,8 +108,8 @@ def test_search_lock(basic_warehouse):
         cmd_type="SEARCH_TARGET",
         target_type="queue",
     )
-    assert action["type"] == "lock"
-    assert action["slot_id"] == "Q1"
+    assert action.type == "lock"
+    assert action.slot_id == "Q1"
 
 
 def test_deliver_move_y(basic_warehouse):
@@ -109,5 +124,521 @@ def test_deliver_move_y(basic_warehouse):
         target_type="queue",
         locked_id="Q1",
     )
-    assert action["type"] == "update_y"
-    assert action["val"] == 60.0
+    assert action.type == "update_y"
+    assert action.val == 60.0
+
+
+@pytest.mark.parametrize(
+    "state",
+    [
+        dict(
+            cy=0.0, cx=0.0, holding=False, phase="fetch", cmd_type="FETCH", target_id=1
+        ),
+        dict(
+            cy=20.0, cx=0.0, holding=False, phase="fetch", cmd_type="FETCH", target_id=1
+        ),
+        dict(
+            cy=20.0,
+            cx=10.0,
+            holding=False,
+            phase="fetch",
+            cmd_type="FETCH",
+            target_id=1,
+        ),
+        dict(
+            cy=0.0,
+            cx=0.0,
+            holding=True,
+            phase="deliver",
+            cmd_type="SEARCH_TARGET",
+            target_type="queue",
+        ),
+        dict(
+            cy=0.0,
+            cx=0.0,
+            holding=True,
+            phase="deliver",
+            cmd_type="DELIVER",
+            target_type="queue",
+            locked_id="Q1",
+        ),
+    ],
+)
+def test_session_matches_stateless(basic_warehouse, state):
+    """Test persistent session returns the same action as a fresh e-graph."""
+    session = PlannerSession()
+    expected = get_next_action_from_egglog(basic_warehouse, **state)
+    assert session.next_action(basic_warehouse, **state) == expected
+    # Second query reuses the e-graph and must not be affected by the first
+    assert (
+        get_next_action_from_egglog(basic_warehouse, session=session, **state)
+        == expected
+    )
+
+
+def test_session_applies_occupancy_deltas(basic_warehouse):
+    """Test session only re-registers changed slots and sees tray moves."""
+    session = PlannerSession()
+    assert session.sync(basic_warehouse) == 2
+    assert session.sync(basic_warehouse) == 0
+
+    # Move tray 1 from S1 to Q1
+    s1, q1 = basic_warehouse.slots
+    q1.tray, s1.tray = s1.tray, None
+    assert session.sync(basic_warehouse) == 2
+
+    action = session.next_action(
+        basic_warehouse,
+        cy=0.0,
+        cx=0.0,
+        holding=False,
+        phase="fetch",
+        cmd_type="FETCH",
+        target_id=1,
+    )
+    assert action == RobotAction("update_y", val=60.0)
+
+
+def test_session_restores_previous_occupancy(basic_warehouse):
+    """Test a slot that empties again is matched as empty again."""
+    session = PlannerSession()
+    state = dict(
+        cy=0.0,
+        cx=0.0,
+        holding=True,
+        phase="deliver",
+        cmd_type="DELIVER",
+        target_type="queue",
+        locked_id="Q1",
+    )
+    q1 = basic_warehouse.slots[1]
+    assert session.next_action(basic_warehouse, **state).type == "update_y"
+
+    q1.tray = MockTray(tray_id=2, is_full=False)
+    assert session.next_action(basic_warehouse, **state) == RobotAction("wait")
+
+    q1.tray = None
+    assert session.next_action(basic_warehouse, **state) == RobotAction(
+        "update_y", val=60.0
+    )
+
+
+def test_session_drops_slots_missing_from_new_warehouse(basic_warehouse):
+    """Test a session switched to a smaller warehouse forgets the old slots."""
+    session = PlannerSession()
+    state = dict(
+        cy=0.0,
+        cx=0.0,
+        holding=True,
+        phase="deliver",
+        cmd_type="SEARCH_TARGET",
+        target_type="storage",
+    )
+    # S1 is free in the first warehouse
+    basic_warehouse.slots[0].tray = None
+    assert session.next_action(basic_warehouse, **state) == RobotAction(
+        "lock", slot_id="S1"
+    )
+
+    other = MockWarehouse(
+        [
+            MockSlot("S2", "storage", 10.0, 30.0, MockTray(tray_id=1, is_full=True)),
+            MockSlot("Q1", "queue", 50.0, 60.0, None),
+        ]
+    )
+    expected = get_next_action_from_egglog(other, **state)
+    assert expected == RobotAction("wait")
+    assert session.next_action(other, **state) == expected
+    assert set(session._facts) == {"S2", "Q1"}
+
+    # Switching back re-registers S1
+    assert session.next_action(basic_warehouse, **state) == RobotAction(
+        "lock", slot_id="S1"
+    )
+
+
+def test_session_reused_across_warehouses(basic_warehouse):
+    """Test a session switched to another warehouse with the same hash resyncs."""
+    session = PlannerSession()
+    state = dict(
+        cy=0.0,
+        cx=0.0,
+        holding=True,
+        phase="deliver",
+        cmd_type="DELIVER",
+        target_type="queue",
+        locked_id="Q1",
+    )
+    basic_warehouse.occupancy_hash = 7
+    assert session.next_action(basic_warehouse, **state).type == "update_y"
+
+    other = MockWarehouse(
+        [
+            MockSlot("S1", "storage", 10.0, 20.0, None),
+            MockSlot("Q1", "queue", 50.0, 60.0, MockTray(tray_id=1, is_full=True)),
+        ]
+    )
+    other.occupancy_hash = 7
+    assert session.next_action(other, **state) == RobotAction("wait")
+
+
+def test_plan_mission_full_sequence(basic_warehouse):
+    """Test one plan covers fetch, lock and delivery in order."""
+    plan = plan_mission(
+        basic_warehouse,
+        cy=0.0,
+        cx=0.0,
+        holding=False,
+        phase="fetch",
+        cmd_type="FETCH",
+        target_id=1,
+        target_type="queue",
+    )
+    assert [step.action for step in plan.steps] == [
+        RobotAction("update_y", val=20.0),
+        RobotAction("update_x", val=10.0),
+        RobotAction("pick"),
+        RobotAction("lock", slot_id="Q1"),
+        RobotAction("update_x", val=0.0),
+        RobotAction("update_y", val=60.0),
+        RobotAction("update_x", val=50.0),
+        RobotAction("place"),
+    ]
+    assert (plan.steps[2].slot_id, plan.steps[2].tray_id) == ("S1", 1)
+    assert plan.steps[-1].slot_id == "Q1"
+
+
+def test_plan_mission_matches_per_tick_queries(basic_warehouse):
+    """Test each planned step is what a per-tick query would return."""
+    session = PlannerSession()
+    plan = plan_mission(
+        basic_warehouse,
+        cy=0.0,
+        cx=0.0,
+        holding=True,
+        phase="deliver",
+        cmd_type="DELIVER",
+        target_type="queue",
+        locked_id="Q1",
+        session=session,
+    )
+    cy, cx = 0.0, 0.0
+    for step in plan.steps:
+        action = session.next_action(
+            basic_warehouse,
+            cy=cy,
+            cx=cx,
+            holding=True,
+            phase="deliver",
+            cmd_type="DELIVER",
+            target_type="queue",
+            locked_id="Q1",
+        )
+        assert action == step.action
+        if action.type == "update_y":
+            cy = action.val
+        elif action.type == "update_x":
+            cx = action.val
+
+
+def test_plan_replay_holds_motion_until_reached(basic_warehouse):
+    """Test replay repeats a move until the platform reaches its target."""
+    plan = plan_mission(
+        basic_warehouse,
+        cy=0.0,
+        cx=0.0,
+        holding=False,
+        phase="fetch",
+        cmd_type="FETCH",
+        target_id=1,
+        deliver_id="Q1",
+        target_type="queue",
+    )
+    assert plan.next_action(5.0, 0.0) == RobotAction("update_y", val=20.0)
+    assert plan.next_action(20.0, 0.0) == RobotAction("update_x", val=10.0)
+    assert plan.next_action(20.0, 10.0) == RobotAction("pick")
+    assert plan.next_action(20.0, 10.0) == RobotAction("update_x", val=0.0)
+
+
+def test_plan_invalidated_by_occupancy_change(basic_warehouse):
+    """Test a plan is invalid once a slot it relies on changes."""
+    plan = plan_mission(
+        basic_warehouse,
+        cy=0.0,
+        cx=0.0,
+        holding=False,
+        phase="fetch",
+        cmd_type="FETCH",
+        target_id=1,
+        deliver_id="Q1",
+        target_type="queue",
+    )
+    assert plan.is_valid(basic_warehouse)
+    basic_warehouse.slots[1].tray = MockTray(tray_id=2, is_full=False)
+    assert not plan.is_valid(basic_warehouse)
+
+
+@pytest.fixture
+def signed_warehouse():
+    """Layout with negative and scientific-notation coordinates."""
+    return MockWarehouse(
+        [
+            MockSlot("L1", "storage", -0.7, -7e-05, MockTray(tray_id=3, is_full=True)),
+            MockSlot("B1", "bay", 0.7, 1e-12, None),
+        ]
+    )
+
+
+def test_extract_negative_and_tiny_coordinates(signed_warehouse):
+    """Test move targets keep their sign and exponent."""
+    fetch = dict(holding=False, phase="fetch", cmd_type="FETCH", target_id=3)
+    action = get_next_action_from_egglog(signed_warehouse, cy=0.5, cx=0.0, **fetch)
+    assert action == RobotAction("update_y", val=-7e-05)
+
+    action = get_next_action_from_egglog(signed_warehouse, cy=-7e-05, cx=0.0, **fetch)
+    assert action == RobotAction("update_x", val=-0.7)
+
+    deliver = dict(
+        holding=True,
+        phase="deliver",
+        cmd_type="DELIVER",
+        target_type="bay",
+        locked_id="B1",
+    )
+    action = get_next_action_from_egglog(signed_warehouse, cy=0.5, cx=0.0, **deliver)
+    assert action == RobotAction("update_y", val=1e-12)
+
+
+def test_extract_without_matching_rule_waits(basic_warehouse):
+    """Test an unresolved query extracts as wait."""
+    action = get_next_action_from_egglog(
+        basic_warehouse,
+        cy=0.0,
+        cx=0.0,
+        holding=False,
+        phase="fetch",
+        cmd_type="FETCH",
+        target_id=99,
+    )
+    assert action == RobotAction("wait")
+
+
+def test_action_cache_folds_positions_between_slots(basic_warehouse):
+    """Test a Y move in progress hits one cache entry."""
+    basic_warehouse.occupancy_hash = 0
+    cache = ActionCache()
+    fetch = dict(holding=False, phase="fetch", cmd_type="FETCH", target_id=1)
+
+    for cy in (0.0, 1.5, 7.25, 19.9):
+        action = get_next_action_from_egglog(
+            basic_warehouse, cy=cy, cx=0.0, cache=cache, **fetch
+        )
+        assert action == RobotAction("update_y", val=20.0)
+    assert (cache.hits, cache.misses) == (3, 1)
+
+    # On the slot row the decision changes, so it must not hit
+    action = get_next_action_from_egglog(
+        basic_warehouse, cy=20.0, cx=0.0, cache=cache, **fetch
+    )
+    assert action == RobotAction("update_x", val=10.0)
+    assert cache.misses == 2
+
+
+def test_action_cache_keeps_positions_for_nearest_commands(basic_warehouse):
+    """Test commands that pick the nearest candidate do not fold positions."""
+    basic_warehouse.occupancy_hash = 0
+    cache = ActionCache()
+    search = dict(
+        holding=True, phase="deliver", cmd_type="SEARCH_TARGET", target_type="queue"
+    )
+    for cy in (1.5, 7.25):
+        get_next_action_from_egglog(
+            basic_warehouse, cy=cy, cx=0.0, cache=cache, **search
+        )
+    assert (cache.hits, cache.misses) == (0, 2)
+
+
+@pytest.fixture
+def two_empty_warehouse():
+    """Two empty trays, the second one closer to the bottom rows."""
+    return MockWarehouse(
+        [
+            MockSlot("S1", "storage", 0.7, 3.0, MockTray(tray_id=1, is_full=False)),
+            MockSlot("S2", "storage", -0.7, 0.5, MockTray(tray_id=2, is_full=False)),
+            MockSlot("S3", "storage", 0.7, 2.75, None),
+            MockSlot("S4", "storage", -0.7, 0.25, None),
+        ]
+    )
+
+
+def test_plan_mission_selects_nearest_tray_and_slot(two_empty_warehouse):
+    """Test the plan fetches the nearest empty tray and stores it nearby."""
+    state = dict(holding=False, phase="fetch", target_type="storage")
+    plan = plan_mission(
+        two_empty_warehouse, cy=0.0, cx=0.0, cmd_type="FETCH_ANY_EMPTY", **state
+    )
+    assert (plan.steps[2].slot_id, plan.steps[2].tray_id) == ("S2", 2)
+    assert plan.steps[3].action == RobotAction("lock", slot_id="S4")
+
+    # From the top row, the other tray and slot are reached first
+    plan = plan_mission(
+        two_empty_warehouse, cy=3.0, cx=0.0, cmd_type="FETCH_ANY_EMPTY", **state
+    )
+    assert (plan.steps[1].slot_id, plan.steps[1].tray_id) == ("S1", 1)
+    assert plan.steps[2].action == RobotAction("lock", slot_id="S3")
+
+
+def test_action_cache_keys_on_occupancy(basic_warehouse):
+    """Test a new occupancy hash bypasses stale entries."""
+    basic_warehouse.occupancy_hash = 0
+    cache = ActionCache()
+    search = dict(
+        cy=0.0,
+        cx=0.0,
+        holding=True,
+        phase="deliver",
+        cmd_type="SEARCH_TARGET",
+        target_type="queue",
+    )
+    assert (
+        get_next_action_from_egglog(basic_warehouse, cache=cache, **search).type
+        == "lock"
+    )
+
+    basic_warehouse.slots[1].tray = MockTray(tray_id=2, is_full=False)
+    basic_warehouse.occupancy_hash = 1
+    assert (
+        get_next_action_from_egglog(basic_warehouse, cache=cache, **search).type
+        == "wait"
+    )
+    assert cache.hits == 0
+
+
+def test_action_cache_evicts_least_recently_used():
+    """Test LRU order and the eviction counter."""
+    cache = ActionCache(maxsize=2)
+    cache.put(("a",), RobotAction("pick"))
+    cache.put(("b",), RobotAction("place"))
+    assert cache.get(("a",)) == RobotAction("pick")
+    cache.put(("c",), RobotAction("wait"))
+
+    assert cache.get(("b",)) is None
+    assert cache.get(("a",)) == RobotAction("pick")
+    assert cache.stats == {"hits": 2, "misses": 1, "evictions": 1, "size": 2}
+
+
+@pytest.fixture
+def batch_queries():
+    """Queries across commands, positions and locked targets."""
+    fetch = dict(holding=False, phase="fetch", cmd_type="FETCH")
+    deliver = dict(holding=True, phase="deliver", cmd_type="DELIVER")
+    search = dict(holding=True, phase="deliver", cmd_type="SEARCH_TARGET")
+    return [
+        dict(cy=0.0, cx=0.0, target_id=1, **fetch),
+        dict(cy=3.0, cx=0.0, target_id=2, **fetch),
+        dict(cy=0.5, cx=-0.7, target_id=2, **fetch),
+        dict(cy=0.0, cx=0.0, holding=False, phase="fetch", cmd_type="FETCH_ANY_EMPTY"),
+        dict(cy=3.0, cx=0.0, holding=False, phase="fetch", cmd_type="FETCH_ANY_EMPTY"),
+        dict(cy=0.0, cx=0.0, target_type="storage", **search),
+        dict(cy=3.0, cx=0.7, target_type="storage", **search),
+        dict(cy=0.0, cx=0.0, target_type="storage", locked_id="S3", **deliver),
+        dict(cy=0.0, cx=0.0, target_type="storage", locked_id="S4", **deliver),
+        dict(cy=0.25, cx=-0.7, target_type="storage", locked_id="S4", **deliver),
+        dict(cy=0.0, cx=0.0, target_id=99, **fetch),
+    ]
+
+
+def test_batch_matches_single_queries(two_empty_warehouse, batch_queries):
+    """Test every batched answer equals its one-by-one query."""
+    expected = [
+        get_next_action_from_egglog(two_empty_warehouse, **q) for q in batch_queries
+    ]
+    assert get_next_actions_from_egglog(two_empty_warehouse, batch_queries) == expected
+    session = PlannerSession()
+    assert (
+        get_next_actions_from_egglog(two_empty_warehouse, batch_queries, session)
+        == expected
+    )
+    assert expected[3] == RobotAction("update_y", val=0.5)
+    assert expected[4] == RobotAction("update_x", val=0.7)
+    assert expected[-1] == RobotAction("wait")
+
+
+def test_batch_groups_share_scope_when_possible(batch_queries):
+    """Test only locked targets and nearest-command positions split a batch."""
+    queries = [{**QUERY_DEFAULTS, **q} for q in batch_queries]
+    groups = _batch_groups(queries)
+    # ("", origin 0,0), ("", origin 3,0), ("", origin 3,0.7), S3, S4
+    assert len(groups) == 5
+    assert sorted(i for g in groups for i in g) == list(range(len(queries)))
+    fetches = [0, 1, 2, 10]
+    assert any(set(fetches) <= set(g) for g in groups)
+
+    plain = [q for q in queries if q["cmd_type"] == "FETCH"]
+    assert len(_batch_groups(plain)) == 1
+
+
+def test_empty_batch(basic_warehouse):
+    assert get_next_actions_from_egglog(basic_warehouse, []) == []
+
+
+def test_schedule_stops_once_resolved(two_empty_warehouse, batch_queries):
+    """Test adaptive runs give the fixed-run answers in fewer iterations."""
+    fixed = SaturationSchedule(adaptive=False)
+    adaptive = SaturationSchedule()
+    expected = get_next_actions_from_egglog(
+        two_empty_warehouse, batch_queries, schedule=fixed
+    )
+    actions = get_next_actions_from_egglog(
+        two_empty_warehouse, batch_queries, schedule=adaptive
+    )
+    assert actions == expected
+    assert adaptive.runs == fixed.runs == 5
+    assert adaptive.iterations < fixed.iterations
+    # The group holding the unknown tray (target_id=99) waits for saturation
+    assert adaptive.stats["stops"] == {"resolved": 4, "saturated": 1}
+    matches = adaptive.stats["rule_matches"]
+    assert matches["search_target"] >= 1
+    assert matches["deliver_move_y"] >= 1
+    assert matches["fetch_pick"] == 1
+
+
+def test_schedule_bounds_unresolved_queries(basic_warehouse):
+    """Test the iteration cap and time budget stop a run; pending queries wait."""
+    fetch = dict(cx=0.0, holding=False, phase="fetch", cmd_type="FETCH")
+    queries = [dict(cy=0.0, target_id=1, **fetch), dict(cy=0.0, target_id=9, **fetch)]
+    for schedule, stop in (
+        (SaturationSchedule(max_iterations=1), "max_iterations"),
+        (SaturationSchedule(time_budget=0.0), "budget"),
+    ):
+        actions = get_next_actions_from_egglog(
+            basic_warehouse, queries, schedule=schedule
+        )
+        assert actions == [RobotAction("update_y", val=20.0), RobotAction("wait")]
+        assert schedule.stats["stops"] == {stop: 1}
+        assert schedule.iterations == 1
+
+
+def test_session_schedule_counts_verify(basic_warehouse):
+    session = PlannerSession()
+    query = dict(cy=0.0, cx=0.0, holding=False, phase="fetch", cmd_type="FETCH")
+    session.next_action(basic_warehouse, target_id=1, **query)
+    assert session.verify(
+        basic_warehouse, RobotAction("update_y", val=20.0), target_id=1, **query
+    )
+    assert session.schedule.runs == 2
+    assert session.schedule.stats["rule_matches"]["fetch_move_y"] == 2
+    session.schedule.reset()
+    assert session.schedule.stats["runs"] == 0
+
+
+def test_stateless_egraph_holds_only_relevant_rules(two_empty_warehouse):
+    """Test a batch registers the rule groups of its commands."""
+    fetch = dict(cmd_type="FETCH", target_id=2)
+    search = dict(cmd_type="SEARCH_TARGET", target_type="storage")
+    any_empty = dict(cmd_type="FETCH_ANY_EMPTY")
+    assert _command_rules([fetch]) == list(COMMAND_RULES["FETCH"])
+    assert len(_command_rules([any_empty, search])) == sum(
+        len(COMMAND_RULES[c]) for c in ("SEARCH_TARGET", "FETCH", "FETCH_ANY_EMPTY")
+    )
+    assert _command_rules([dict(cmd_type="NONE")]) == list(COMMAND_RULES["IDLE"])
@@ -0,0 +1,106 @@
+import itertools
+import os
+
+import pytest
+from dispatcher import TaskDispatcher, read_plan_tasks
+
+PRODUCTION_PLAN = os.path.join(
+    os.path.dirname(__file__), "..", "models", "production_plan.json"
+)
+
+
+def plan(*jobs) -> dict:
+    """Jobs of (task_id, dependencies) pairs, all on machine "m"."""
+    return {
+        "jobs": [
+            {
+                "id": f"J{j}",
+                "tasks": [
+                    {
+                        "id": tid,
+                        "name": "ExtractTray",
+                        "eligible_machines": ["m"],
+                        "parameters": {"tray_number": 1},
+                        "dependencies": list(deps),
+                    }
+                    for tid, deps in tasks
+                ],
+            }
+            for j, tasks in enumerate(jobs)
+        ]
+    }
+
+
+def dispatcher(plan_dict, **kwargs) -> TaskDispatcher:
+    ids = (f"c{i}" for i in itertools.count())
+    return TaskDispatcher(
+        read_plan_tasks(plan_dict), new_id=lambda: next(ids), **kwargs
+    )
+
+
+def sent_ids(sent) -> list[str]:
+    return [task.task_id for _, task in sent]
+
+
+def test_reads_every_job():
+    tasks = read_plan_tasks(plan([("A", ())], [("A", ()), ("B", ("A",))]))
+    assert [t.key for t in tasks] == [("J0", "A"), ("J1", "A"), ("J1", "B")]
+    assert tasks[2].dependencies == ("A",)
+    assert (tasks[0].machine, tasks[0].tray) == ("m", 1)
+
+
+def test_production_plan_is_a_chain():
+    d = TaskDispatcher.from_file(PRODUCTION_PLAN, max_in_flight=4)
+    for expected in ("T1", "T2", "T3", "T4", "T5"):
+        ((corr_id, task),) = d.dispatch()
+        assert task.task_id == expected
+        assert d.dispatch() == []
+        d.complete(corr_id)
+    assert d.done
+
+
+def test_independent_tasks_pipeline_up_to_limit():
+    d = dispatcher(
+        plan([("A", ()), ("B", ()), ("C", ()), ("D", ("A",))]), max_in_flight=2
+    )
+    first = d.dispatch()
+    assert sent_ids(first) == ["A", "B"]
+    assert d.dispatch() == []
+    # B answers first: C takes its place, D still waits for A
+    d.complete(first[1][0])
+    assert sent_ids(d.dispatch()) == ["C"]
+    d.complete(first[0][0])
+    assert sent_ids(d.dispatch()) == ["D"]
+    assert list(d.in_flight) == ["c2", "c3"]
+    d.complete("c2")
+    d.complete("c3")
+    assert d.done and len(d.finished) == 4
+
+
+def test_dependencies_are_per_job():
+    d = dispatcher(plan([("A", ()), ("B", ("A",))], [("A", ())]))
+    assert [t.key for _, t in d.dispatch()] == [("J0", "A"), ("J1", "A")]
+
+
+def test_failed_task_releases_dependents():
+    d = dispatcher(plan([("A", ()), ("B", ("A",))]))
+    ((corr_id, _),) = d.dispatch()
+    assert d.complete(corr_id, ok=False).task_id == "A"
+    assert sent_ids(d.dispatch()) == ["B"]
+    assert [t.task_id for t in d.failed] == ["A"]
+
+
+def test_unknown_correlation_id_is_ignored():
+    d = dispatcher(plan([("A", ())]))
+    d.dispatch()
+    assert d.complete("nope") is None
+    assert len(d) == 1
+
+
+@pytest.mark.parametrize(
+    "tasks",
+    [[("A", ("Z",))], [("A", ("B",)), ("B", ("A",))], [("A", ("A",))]],
+)
+def test_rejects_bad_dependencies(tasks):
+    with pytest.raises(ValueError):
+        dispatcher(plan(tasks))
@@ -0,0 +1,117 @@
+import random
+
+import pytest
+from cfg_engine import PlannerSession, get_next_actions_from_egglog
+from fact_selector import FactSelector, rule_cost
+from warehouse import Warehouse
+
+
+def tower(rows: int) -> dict:
+    """Two-column tower, a tray in every third left slot, every tenth one empty."""
+    return {
+        "rows": rows,
+        "columns": [
+            {"name": "L", "x": -0.7},
+            {"name": "R", "x": 0.7, "slots": {"0-2": {"type": "queue"}}},
+        ],
+        "trays": [
+            {"slot": f"storage_L_{r}", "weight": 0.0 if r % 30 == 0 else 3.5}
+            for r in range(0, rows, 3)
+        ],
+    }
+
+
+def random_queries(wh, n: int, seed: int = 0) -> list[dict]:
+    """Queries of every command from slot rows, between rows and off the X axis."""
+    rng = random.Random(seed)
+    slots = wh._get_all_slots()
+    trays = [int(s.tray.tray_id) for s in slots if s.tray]
+    free = [s.slot_id for s in slots if s.tray is None]
+    queries = []
+    for _ in range(n):
+        slot = rng.choice(slots)
+        cy = rng.choice((slot.y, slot.y + 0.05))
+        q = dict(cy=cy, cx=rng.choice((0.0, slot.x)))
+        kind = rng.choice(("fetch", "any", "deliver", "search"))
+        if kind == "fetch":
+            q.update(holding=False, phase="fetch", cmd_type="FETCH")
+            q["target_id"] = rng.choice(trays)
+        elif kind == "any":
+            q.update(holding=False, phase="fetch", cmd_type="FETCH_ANY_EMPTY")
+        elif kind == "deliver":
+            q.update(holding=True, phase="deliver", cmd_type="DELIVER")
+            q.update(target_type="storage", locked_id=rng.choice(free))
+        else:
+            q.update(holding=True, phase="deliver", cmd_type="SEARCH_TARGET")
+            q["target_type"] = rng.choice(("storage", "queue", ""))
+        queries.append(q)
+    return queries
+
+
+def test_selects_candidate_slots_per_command():
+    wh = Warehouse(tower(30))
+    selector = FactSelector(k=2)
+    fetch = dict(cy=0.0, cx=0.0, cmd_type="FETCH", target_id=3)
+    deliver = dict(cy=0.0, cx=0.0, cmd_type="DELIVER", locked_id="storage_L_4")
+    search = dict(cy=0.0, cx=0.0, cmd_type="SEARCH_TARGET", target_type="queue")
+    idle = dict(cy=0.0, cx=0.0, cmd_type="IDLE")
+
+    assert selector.select(wh, [fetch]) == [wh.get_slot_by_tray(3)]
+    assert selector.select(wh, [deliver]) == [wh.get_slot_by_id("storage_L_4")]
+    assert [s.slot_id for s in selector.select(wh, [search])] == [
+        "queue_R_0",
+        "queue_R_1",
+    ]
+    assert selector.select(wh, [idle]) == []
+    # Merged and deduplicated, in layout order
+    both = selector.select(wh, [search, fetch, fetch])
+    assert len(both) == 3
+    order = {s.slot_id: i for i, s in enumerate(wh._get_all_slots())}
+    assert [order[s.slot_id] for s in both] == sorted(order[s.slot_id] for s in both)
+
+
+def test_nearest_candidates_use_rule_costs():
+    wh = Warehouse(tower(60))
+    selector = FactSelector(k=3)
+    q = dict(cy=5.0, cx=0.7, cmd_type="SEARCH_TARGET", target_type="storage")
+    free = [s for s in wh.storage_slots if s.tray is None]
+    costs = sorted(rule_cost(5.0, 0.7, s.y, s.x) for s in free)
+    expected = [s for s in free if rule_cost(5.0, 0.7, s.y, s.x) <= costs[2]]
+    assert selector.select(wh, [q]) == expected
+
+
+def test_reindexes_on_occupancy_change():
+    wh = Warehouse(tower(30))
+    selector = FactSelector(k=1)
+    q = dict(cy=0.0, cx=0.0, cmd_type="FETCH", target_id=1)
+    (slot,) = selector.select(wh, [q])
+    tray = slot.remove_tray()
+    assert selector.select(wh, [q]) == []
+    free = next(s for s in wh.storage_slots if s.tray is None and s is not slot)
+    free.add_tray(tray)
+    assert selector.select(wh, [q]) == [free]
+
+
+@pytest.mark.parametrize("k", [1, 4])
+@pytest.mark.parametrize("layout", [None, tower(40)])
+def test_decisions_match_full_export(layout, k):
+    """Test the filtered e-graph gives the decisions of one with every slot."""
+    wh = Warehouse(layout) if layout else Warehouse()
+    queries = random_queries(wh, 60)
+    expected = PlannerSession().next_actions(wh, queries)
+    actions = get_next_actions_from_egglog(wh, queries, selector=FactSelector(k))
+    assert actions == expected
+
+
+def test_exported_facts_do_not_grow_with_the_warehouse():
+    sizes = []
+    for rows in (150, 1500):
+        wh = Warehouse(tower(rows))
+        queries = [
+            dict(cy=0.0, cx=0.0, cmd_type="FETCH", target_id=2),
+            dict(cy=0.0, cx=0.0, cmd_type="FETCH_ANY_EMPTY"),
+            dict(cy=0.0, cx=0.0, cmd_type="DELIVER", locked_id="storage_L_1"),
+            dict(cy=0.0, cx=0.0, cmd_type="SEARCH_TARGET", target_type="storage"),
+        ]
+        sizes.append(len(FactSelector().select(wh, queries)))
+    assert sizes[0] == sizes[1] <= 10
@@ -0,0 +1,150 @@
+import pytest
+from cfg_engine import PlannerSession, RobotAction, get_next_action_from_egglog
+from fast_planner import FastPlanner
+from test_cfg_engine import MockSlot, MockTray, MockWarehouse
+
+
+@pytest.fixture
+def warehouse():
+    """Layout with a full and an empty tray, free storage/queue/bay slots."""
+    return MockWarehouse(
+        [
+            MockSlot("S1", "storage", 10.0, 20.0, MockTray(tray_id=1, is_full=True)),
+            MockSlot("S2", "storage", -10.0, 30.0, MockTray(tray_id=2, is_full=False)),
+            MockSlot("S3", "storage", 10.0, 40.0, None),
+            MockSlot("Q1", "queue", 50.0, 60.0, None),
+            MockSlot("B1", "bay", 0.7, 1e-12, None),
+        ]
+    )
+
+
+FETCH = dict(holding=False, phase="fetch", cmd_type="FETCH", target_id=1)
+ANY_EMPTY = dict(holding=False, phase="fetch", cmd_type="FETCH_ANY_EMPTY")
+DELIVER = dict(holding=True, phase="deliver", cmd_type="DELIVER", target_type="queue")
+SEARCH = dict(
+    holding=True, phase="deliver", cmd_type="SEARCH_TARGET", target_type="storage"
+)
+
+
+@pytest.mark.parametrize(
+    "state",
+    [
+        dict(cy=0.0, cx=0.0, **FETCH),
+        dict(cy=0.0, cx=5.0, **FETCH),
+        dict(cy=20.0, cx=0.0, **FETCH),
+        dict(cy=20.0, cx=10.0, **FETCH),
+        dict(
+            cy=20.0,
+            cx=10.0,
+            holding=False,
+            phase="fetch",
+            cmd_type="FETCH",
+            target_id=99,
+        ),
+        dict(
+            cy=20.0, cx=10.0, holding=True, phase="fetch", cmd_type="FETCH", target_id=1
+        ),
+        dict(cy=0.0, cx=0.0, **ANY_EMPTY),
+        dict(cy=30.0, cx=0.0, **ANY_EMPTY),
+        dict(cy=30.0, cx=-10.0, **ANY_EMPTY),
+        dict(cy=0.0, cx=0.0, **DELIVER, locked_id="Q1"),
+        dict(cy=60.0, cx=0.0, **DELIVER, locked_id="Q1"),
+        dict(cy=60.0, cx=50.0, **DELIVER, locked_id="Q1"),
+        dict(cy=0.0, cx=0.0, **DELIVER, locked_id="S3"),
+        dict(cy=0.0, cx=0.0, **DELIVER),
+        dict(
+            cy=0.0,
+            cx=0.0,
+            holding=True,
+            phase="deliver",
+            cmd_type="DELIVER",
+            target_type="bay",
+            locked_id="B1",
+        ),
+        dict(
+            cy=0.0,
+            cx=0.0,
+            holding=True,
+            phase="deliver",
+            cmd_type="SEARCH_TARGET",
+            target_type="storage",
+        ),
+        dict(
+            cy=0.0,
+            cx=0.0,
+            holding=True,
+            phase="fetch",
+            cmd_type="SEARCH_TARGET",
+            target_type="queue",
+        ),
+        dict(cy=0.0, cx=0.0, holding=False, phase="fetch", cmd_type="IDLE"),
+    ],
+)
+def test_fast_planner_agrees_with_rules(warehouse, state):
+    """Every python decision is one the egglog rules derive."""
+    action = FastPlanner().next_action(warehouse, **state)
+    assert PlannerSession().verify(warehouse, action, **state)
+    # Both pick the nearest candidate, so the extracted action must match
+    assert action == get_next_action_from_egglog(warehouse, **state)
+
+
+def test_fast_planner_reindexes_on_occupancy_change(warehouse):
+    """Test tray moves are picked up on the next decision."""
+    planner = FastPlanner()
+    state = dict(cy=0.0, cx=0.0, **FETCH)
+    assert planner.next_action(warehouse, **state) == RobotAction("update_y", val=20.0)
+
+    warehouse.slots[2].tray, warehouse.slots[0].tray = warehouse.slots[0].tray, None
+    assert planner.next_action(warehouse, **state) == RobotAction("update_y", val=40.0)
+
+
+def test_verify_rejects_wrong_decisions(warehouse):
+    """Test the oracle catches actions the rules do not derive."""
+    session = PlannerSession()
+    state = dict(cy=0.0, cx=0.0, **FETCH)
+    assert session.verify(warehouse, RobotAction("update_y", val=20.0), **state)
+    assert not session.verify(warehouse, RobotAction("update_y", val=40.0), **state)
+    assert not session.verify(warehouse, RobotAction("pick"), **state)
+    assert not session.verify(warehouse, RobotAction("wait"), **state)
+
+
+@pytest.fixture
+def spread_warehouse():
+    """Two empty trays and two free storage slots, far and near row 0."""
+    return MockWarehouse(
+        [
+            MockSlot("S1", "storage", 0.7, 3.0, MockTray(tray_id=1, is_full=False)),
+            MockSlot("S2", "storage", -0.7, 0.5, MockTray(tray_id=2, is_full=False)),
+            MockSlot("S3", "storage", 0.7, 2.5, None),
+            MockSlot("S4", "storage", -0.7, 0.25, None),
+        ]
+    )
+
+
+@pytest.mark.parametrize(
+    "state, nearest, first",
+    [
+        (
+            dict(cy=0.0, cx=0.0, **ANY_EMPTY),
+            RobotAction("update_y", val=0.5),
+            RobotAction("update_y", val=3.0),
+        ),
+        (
+            dict(cy=0.0, cx=0.0, **SEARCH),
+            RobotAction("lock", slot_id="S4"),
+            RobotAction("lock", slot_id="S3"),
+        ),
+        (
+            dict(cy=3.0, cx=0.0, **SEARCH),
+            RobotAction("lock", slot_id="S3"),
+            RobotAction("lock", slot_id="S3"),
+        ),
+    ],
+)
+def test_fast_planner_selects_nearest(spread_warehouse, state, nearest, first):
+    """Test open-ended commands go to the candidate reached first, like egglog."""
+    assert FastPlanner().next_action(spread_warehouse, **state) == nearest
+    assert get_next_action_from_egglog(spread_warehouse, **state) == nearest
+
+    layout_order = type("FirstPlanner", (FastPlanner,), {"SELECT_NEAREST": False})
+    assert layout_order().next_action(spread_warehouse, **state) == first
@@ -0,0 +1,111 @@
+import json
+import os
+
+import pytest
+from layout import SLOT_TYPES, normalize_slot_type
+from warehouse import Warehouse
+from warehouse_controller import WarehouseController
+
+DEFAULT_LAYOUT = os.path.join(
+    os.path.dirname(__file__), "..", "models", "warehouse_layout.yml"
+)
+
+
+def describe(wh):
+    return [
+        (s.slot_id, s.slot_type, s.x, s.y, s.tray and (s.tray.tray_id, s.tray.weight))
+        for s in wh._get_all_slots()
+    ]
+
+
+@pytest.fixture
+def tower_spec():
+    """Three columns, two bays, queue rows given as a range."""
+    return {
+        "row_pitch": 0.2,
+        "rows": 50,
+        "columns": [
+            {"name": "L", "x": -0.7},
+            {"name": "M", "x": 0.0, "rows": 10, "slots": {"0-3": {"type": "queue"}}},
+            {
+                "name": "R",
+                "x": 0.7,
+                "slots": {0: {"id": "bay_0", "type": "bay"}, "1": {"type": "bay"}},
+            },
+        ],
+        "trays": [
+            {"slot": "storage_L_3", "weight": 3.5},
+            {"slot": "queue_M_0", "id": 40},
+            {"slot": "storage_R_49", "weight": 4.0},
+        ],
+    }
+
+
+def test_default_layout_file_matches_default_warehouse():
+    loaded = Warehouse.from_file(DEFAULT_LAYOUT)
+    default = Warehouse()
+    assert describe(loaded) == describe(default)
+    assert loaded.occupancy_hash == default.occupancy_hash
+
+
+def test_json_layout_builds_columns_queues_and_bays(tmp_path, tower_spec, capsys):
+    path = tmp_path / "tower.json"
+    path.write_text(json.dumps(tower_spec))
+    wh = Warehouse.from_file(str(path))
+
+    assert capsys.readouterr().out == ""
+    assert len(wh._get_all_slots()) == 50 + 10 + 50
+    assert [s.slot_id for s in wh.queued_slots] == [f"queue_M_{i}" for i in range(4)]
+    assert [s.slot_id for s in wh.bay_slots] == ["bay_0", "bay_R_1"]
+    assert wh.in_view_slot is wh.get_slot_by_id("bay_0")
+    assert wh.get_slot_at(0.7, 49 * 0.2).slot_id == "storage_R_49"
+
+    assert [wh.get_slot_by_tray(t).slot_id for t in (1, 40, 41)] == [
+        "storage_L_3",
+        "queue_M_0",
+        "storage_R_49",
+    ]
+    assert wh.get_occupied_queue_slot().tray.tray_id == 40
+
+
+def test_loaded_occupancy_hash_follows_tray_moves(tower_spec):
+    wh = Warehouse(tower_spec)
+    initial = wh.occupancy_hash
+    src, dst = wh.get_slot_by_id("storage_L_3"), wh.get_slot_by_id("storage_L_4")
+    dst.add_tray(src.remove_tray())
+    assert wh.occupancy_hash != initial
+    src.add_tray(dst.remove_tray())
+    assert wh.occupancy_hash == initial
+
+
+@pytest.mark.parametrize(
+    "change",
+    [
+        lambda spec: spec["columns"][0].update(type="shelf"),
+        lambda spec: spec["columns"][2]["slots"].update({"2-3": {"id": "x"}}),
+        lambda spec: spec["columns"][1].update(name="L", slots={}),
+        lambda spec: spec["trays"].append({"slot": "nowhere"}),
+        lambda spec: spec["trays"].append({"slot": "storage_L_3"}),
+        lambda spec: spec["trays"].append({"slot": "storage_L_9", "id": 40}),
+    ],
+)
+def test_invalid_layouts_rejected(tower_spec, change):
+    change(tower_spec)
+    with pytest.raises(ValueError):
+        Warehouse(tower_spec)
+
+
+def test_controller_runs_on_loaded_layout(tower_spec):
+    wh = Warehouse(tower_spec)
+    controller = WarehouseController(wh, planner_backend="python")
+    assert controller.extract(41) is True
+    for _ in range(5000):
+        if not controller.is_busy:
+            break
+        controller.tick()
+    assert wh.tray_in_bay == 41
+
+
+def test_unknown_slot_types_normalize_to_storage():
+    assert [normalize_slot_type(t) for t in SLOT_TYPES] == list(SLOT_TYPES)
+    assert normalize_slot_type("") == normalize_slot_type("shelf") == "storage"
@@ -0,0 +1,149 @@
+import logging
+
+import pytest
+from mission_queue import MissionQueue, QueuedMission, QueueFull
+from warehouse import Warehouse
+
+
+@pytest.fixture
+def warehouse():
+    # Trays: 1 storage_L_0, 2 storage_L_5, 3 storage_R_7, 4 storage_L_10,
+    # 5 storage_R_15, 6 queue_0 (empty); platform at row 0
+    return Warehouse()
+
+
+def names(queue, warehouse):
+    order = []
+    while len(queue):
+        order.append(str(queue.pop_next(warehouse)))
+    return order
+
+
+def test_unknown_policy_rejected():
+    with pytest.raises(ValueError):
+        MissionQueue("random")
+
+
+def test_resources(warehouse):
+    assert QueuedMission("SendBack").resources(warehouse) == {"bay"}
+    assert QueuedMission("ExtractTray").resources(warehouse) == {"bay", "queue"}
+    assert QueuedMission("Enqueue", 5).resources(warehouse) == {"queue", ("tray", 5)}
+    bay = warehouse.get_tray_bay_slot()
+    bay.add_tray(warehouse.get_slot_by_id("storage_L_0").remove_tray())
+    assert "bay" in QueuedMission("Enqueue", 1).resources(warehouse)
+
+
+def test_pickup_slot(warehouse):
+    assert (
+        QueuedMission("ExtractTray", 4).pickup_slot(warehouse).slot_id == "storage_L_10"
+    )
+    assert QueuedMission("ExtractTray").pickup_slot(warehouse).slot_id == "queue_0"
+    assert QueuedMission("SendBack").pickup_slot(warehouse) is None
+    # Closest empty tray to the platform at row 0
+    assert QueuedMission("FetchAnyEmpty").pickup_slot(warehouse).slot_id == "queue_0"
+
+
+def test_fifo_keeps_submission_order(warehouse):
+    queue = MissionQueue("fifo")
+    for tray in (5, 1, 4):
+        queue.append(QueuedMission("Enqueue", tray))
+    assert names(queue, warehouse) == ["Enqueue(5)", "Enqueue(1)", "Enqueue(4)"]
+
+
+def test_lookahead_starts_closest_independent_mission(warehouse, caplog):
+    queue = MissionQueue("lookahead")
+    queue.append(QueuedMission("ExtractTray", 5))
+    queue.append(QueuedMission("Enqueue", 1))
+    with caplog.at_level(logging.INFO):
+        assert str(queue.pop_next(warehouse)) == "Enqueue(1)"
+    assert "moved ahead of 1 queued mission" in caplog.text
+    assert str(queue.peek()) == "ExtractTray(5)"
+
+
+def test_lookahead_keeps_conflicting_order(warehouse):
+    queue = MissionQueue("lookahead")
+    # Tray 5 waits in the bay: enqueuing it competes with the SendBack
+    bay = warehouse.get_tray_bay_slot()
+    bay.add_tray(warehouse.get_slot_by_tray(5).remove_tray())
+    queue.append(QueuedMission("SendBack"))
+    queue.append(QueuedMission("Enqueue", 5))
+    queue.append(QueuedMission("FetchAnyEmpty"))
+    assert names(queue, warehouse) == ["SendBack", "Enqueue(5)", "FetchAnyEmpty"]
+
+
+def test_lookahead_window(warehouse):
+    queue = MissionQueue("lookahead", lookahead=2)
+    queue.append(QueuedMission("ExtractTray", 5))
+    queue.append(QueuedMission("Enqueue", 4))
+    queue.append(QueuedMission("Enqueue", 1))
+    # Tray 1 is closest but outside the window
+    assert str(queue.pop_next(warehouse)) == "Enqueue(4)"
+
+
+def test_priority_before_submission_order(warehouse):
+    queue = MissionQueue("fifo")
+    queue.append(QueuedMission("Enqueue", 5, priority=1))
+    queue.append(QueuedMission("ExtractTray", 4))
+    queue.append(QueuedMission("Enqueue", 1, priority=1))
+    queue.append(QueuedMission("SendBack"))
+    assert str(queue.peek()) == "ExtractTray(4)"
+    assert list(map(str, queue)) == [
+        "ExtractTray(4)",
+        "SendBack",
+        "Enqueue(5)",
+        "Enqueue(1)",
+    ]
+    assert names(queue, warehouse) == [
+        "ExtractTray(4)",
+        "SendBack",
+        "Enqueue(5)",
+        "Enqueue(1)",
+    ]
+
+
+def test_lookahead_window_stays_within_priority(warehouse):
+    queue = MissionQueue("lookahead")
+    queue.append(QueuedMission("ExtractTray", 5))
+    # Closer, but background
+    queue.append(QueuedMission("Enqueue", 1, priority=1))
+    assert str(queue.pop_next(warehouse)) == "ExtractTray(5)"
+    assert len(queue) == 1
+
+
+def test_max_depth_rejects(warehouse):
+    queue = MissionQueue(max_depth=2)
+    queue.append(QueuedMission("SendBack"))
+    queue.append(QueuedMission("FetchAnyEmpty"))
+    with pytest.raises(QueueFull):
+        queue.append(QueuedMission("ExtractTray", 4))
+    queue.pop_next(warehouse)
+    queue.append(QueuedMission("ExtractTray", 4))
+    assert queue.stats["rejected"] == 1
+    assert queue.stats["depth"] == 2
+
+
+def test_expire_drops_missions_past_deadline(warehouse):
+    queue = MissionQueue()
+    queue.append(QueuedMission("ExtractTray", 4, deadline=10.0))
+    queue.append(QueuedMission("SendBack"))
+    queue.append(QueuedMission("Enqueue", 1, deadline=5.0))
+    assert queue.expire(5.0) == []
+    assert list(map(str, queue.expire(7.0))) == ["Enqueue(1)"]
+    assert names(queue, warehouse) == ["ExtractTray(4)", "SendBack"]
+    # Already started: nothing left to expire
+    assert queue.expire(20.0) == []
+    assert queue.stats["expired"] == 1
+
+
+def test_wait_statistics(warehouse):
+    queue = MissionQueue("lookahead")
+    queue.append(QueuedMission("ExtractTray", 5, submitted=1.0))
+    queue.append(QueuedMission("Enqueue", 1, submitted=2.0))
+    queue.append(QueuedMission("SendBack"))
+    queue.pop_next(warehouse, now=4.0)
+    queue.pop_next(warehouse, now=6.0)
+    queue.pop_next(warehouse, now=8.0)
+    stats = queue.stats
+    assert (stats["depth"], stats["started"]) == (0, 3)
+    assert stats["mean_wait"] == pytest.approx(3.5)
+    assert stats["max_wait"] == pytest.approx(5.0)
@@ -0,0 +1,238 @@
+import itertools
+import json
+import os
+from types import SimpleNamespace
+
+import plan_solver
+import pytest
+from dispatcher import read_plan_tasks
+from plan_solver import (
+    SolverDispatcher,
+    estimate_processing_times,
+    plan_with_processing_times,
+)
+
+PRODUCTION_PLAN = os.path.join(
+    os.path.dirname(__file__), "..", "models", "production_plan.json"
+)
+
+
+@pytest.fixture
+def plan():
+    with open(PRODUCTION_PLAN) as f:
+        return json.load(f)
+
+
+def test_processing_times_come_from_the_warehouse_model(plan):
+    tasks = read_plan_tasks(plan)
+    times = estimate_processing_times(tasks)
+    assert list(times) == [t.key for t in tasks]
+    assert all(isinstance(s, int) and s >= 1 for s in times.values())
+    # Extracting tray 2 crosses the tower; the SendBack right after it does not
+    assert times[("Job_Stress", "T1")] > times[("Job_Stress", "T2")]
+
+
+def test_plan_with_processing_times(plan):
+    updated = plan_with_processing_times(plan, {("Job_Stress", "T3"): 7})
+    tasks = updated["jobs"][0]["tasks"]
+    assert [t["processing_time"] for t in tasks] == [20, 20, 7, 20, 20]
+    # The original plan is left alone
+    assert plan["jobs"][0]["tasks"][2]["processing_time"] == 20
+
+
+def test_solver_dispatch_requires_frost_planner(plan, monkeypatch):
+    monkeypatch.setattr(plan_solver, "DynamicExecutor", None)
+    with pytest.raises(ImportError):
+        SolverDispatcher(plan)
+
+
+def test_solver_dispatch_runs_the_plan(plan):
+    pytest.importorskip("frost_planner")
+    clock = [0.0]
+    dispatcher = SolverDispatcher(plan, solver="dummy", clock=lambda: clock[0])
+    order = []
+    while not dispatcher.done:
+        sent = dispatcher.dispatch()
+        assert sent, "executor stalled"
+        for corr_id, task in sent:
+            clock[0] += dispatcher.processing_times[task.key]
+            # FetchAnyEmpty (T3) fails: the remaining tasks are re-solved
+            ok = task.task_id != "T3"
+            order.append(dispatcher.complete(corr_id, ok).task_id)
+    assert sorted(order) == ["T1", "T2", "T3", "T4", "T5"]
+    assert [t.task_id for t in dispatcher.failed] == ["T3"]
+    assert dispatcher.resolves == 1
+
+
+class StubExecutor:
+    """
+    Executor with a fixed solver order of (job, task) IDs: ready tasks are
+    the unstarted ones whose dependencies completed, in that order.
+    Re-solving reverses the order of the tasks not started yet.
+    """
+
+    def __init__(self, plan: dict, order: list[tuple]):
+        self.machine = SimpleNamespace(name="m")
+        tasks = {(job["id"], t["id"]): t for job in plan["jobs"] for t in job["tasks"]}
+        self.deps = {
+            key: {(key[0], dep) for dep in t.get("dependencies", ())}
+            for key, t in tasks.items()
+        }
+        self.order = [
+            SimpleNamespace(
+                task=SimpleNamespace(job_id=j, id=i, name=tasks[j, i]["name"]),
+                start_time=None,
+            )
+            for j, i in order
+        ]
+        self.started, self.completed, self.schedules = set(), set(), []
+
+    @staticmethod
+    def key(scheduled) -> tuple:
+        return scheduled.task.job_id, scheduled.task.id
+
+    def update_task_status(self):
+        pass
+
+    def update_schedule(self, start_time):
+        if self.schedules:
+            waiting = [t for t in self.order if self.key(t) not in self.started]
+            self.order = [t for t in self.order if self.key(t) in self.started]
+            self.order += waiting[::-1]
+        self.schedules.append(start_time)
+
+    def next_ready_tasks(self):
+        return [
+            (t, self.machine)
+            for t in self.order
+            if self.key(t) not in self.started
+            and self.deps[self.key(t)] <= self.completed
+        ]
+
+    def task_started(self, scheduled):
+        self.started.add(self.key(scheduled))
+
+    def task_completed(self, scheduled):
+        self.completed.add(self.key(scheduled))
+
+
+def stub_plan(*jobs) -> dict:
+    """Jobs of (task_id, name, tray, dependencies), all on machine "m"."""
+    return {
+        "jobs": [
+            {
+                "id": job_id,
+                "tasks": [
+                    {
+                        "id": i,
+                        "name": n,
+                        "eligible_machines": ["m"],
+                        "parameters": {"tray_number": tray} if tray else {},
+                        "dependencies": list(d),
+                    }
+                    for i, n, tray, d in tasks
+                ],
+            }
+            for job_id, tasks in jobs
+        ]
+    }
+
+
+def stub_dispatcher(plan, executor, clock=lambda: 0.0, **kwargs):
+    ids = (f"c{i}" for i in itertools.count())
+    return SolverDispatcher(
+        plan,
+        new_id=lambda: next(ids),
+        clock=clock,
+        processing_times={},
+        executor=executor,
+        **kwargs,
+    )
+
+
+def test_solver_dispatch_with_stub_executor(monkeypatch):
+    # Runs without frost-planner: the executor is passed in
+    monkeypatch.setattr(plan_solver, "DynamicExecutor", None)
+    plan = stub_plan(
+        (
+            "J",
+            [
+                ("A", "ExtractTray", 1, ()),
+                ("B", "SendBack", None, ()),
+                ("C", "FetchAnyEmpty", None, ()),
+                ("D", "SendBack", None, ()),
+                ("E", "Enqueue", 1, ("A",)),
+            ],
+        )
+    )
+    executor = StubExecutor(plan, [("J", i) for i in "CADBE"])
+    clock = [0.0]
+    dispatcher = stub_dispatcher(
+        plan, executor, clock=lambda: clock[0], max_in_flight=2
+    )
+    assert executor.schedules == [0.0]
+
+    def sent(pairs):
+        return [(corr_id, task.task_id) for corr_id, task in pairs]
+
+    # Solver order, not plan order, and at most two in flight
+    assert sent(dispatcher.dispatch()) == [("c0", "C"), ("c1", "A")]
+    assert dispatcher.dispatch() == []
+    clock[0] = 5.0
+    assert dispatcher.complete("c1").task_id == "A"
+    # E became ready, but D comes first in the solver order
+    assert sent(dispatcher.dispatch()) == [("c2", "D")]
+
+    # A failure re-solves from now: the waiting B and E swap
+    clock[0] = 8.0
+    assert dispatcher.complete("c0", ok=False).task_id == "C"
+    assert executor.schedules == [0.0, 8.0]
+    assert dispatcher.resolves == 1
+    assert sent(dispatcher.dispatch()) == [("c3", "E")]
+    assert set(dispatcher.in_flight) == {"c2", "c3"}
+
+    # Other errors fail the task without re-solving
+    assert dispatcher.complete("c2", ok=False, resolve=False).task_id == "D"
+    assert executor.schedules == [0.0, 8.0]
+    # Both SendBacks map to their own plan task
+    ((corr_id, task),) = dispatcher.dispatch()
+    assert (task.task_id, task.name, task.machine) == ("B", "SendBack", "m")
+    assert not dispatcher.done
+    dispatcher.complete("c3")
+    dispatcher.complete(corr_id)
+    assert dispatcher.complete("c3") is None
+    assert dispatcher.done
+    assert [t.task_id for t in dispatcher.finished] == ["A", "E", "B"]
+    assert [t.task_id for t in dispatcher.failed] == ["C", "D"]
+    assert dispatcher.resolves == 1
+
+
+def test_solver_dispatch_matches_tasks_by_job(monkeypatch):
+    monkeypatch.setattr(plan_solver, "DynamicExecutor", None)
+    # Task IDs repeat across jobs
+    plan = stub_plan(
+        ("A", [("T1", "ExtractTray", 1, ()), ("T2", "SendBack", None, ("T1",))]),
+        ("B", [("T1", "ExtractTray", 2, ()), ("T2", "SendBack", None, ("T1",))]),
+    )
+    executor = StubExecutor(plan, [("B", "T1"), ("A", "T1"), ("B", "T2"), ("A", "T2")])
+    dispatcher = stub_dispatcher(plan, executor, max_in_flight=1)
+    ((corr_id, task),) = dispatcher.dispatch()
+    assert (task.key, task.tray) == (("B", "T1"), 2)
+    dispatcher.complete(corr_id)
+    # B/T2 is ready too, but A/T1 comes first in the solver order
+    sent = []
+    while not dispatcher.done:
+        ((corr_id, task),) = dispatcher.dispatch()
+        sent.append(task.key)
+        dispatcher.complete(corr_id)
+    assert sent == [("A", "T1"), ("B", "T2"), ("A", "T2")]
+
+
+def test_solver_dispatch_rejects_tasks_not_in_plan(monkeypatch):
+    monkeypatch.setattr(plan_solver, "DynamicExecutor", None)
+    plan = stub_plan(("A", [("T1", "ExtractTray", 1, ())]))
+    executor = StubExecutor(plan, [("A", "T1")])
+    executor.order[0].task.job_id = "B"
+    executor.deps[("B", "T1")] = set()
+    with pytest.raises(ValueError):
+        stub_dispatcher(plan, executor).dispatch()
@@ -1,5 +1,5 @@
 import pytest
-from warehouse_platform import Platform
+from warehouse_platform import Platform, travel_distance, travel_time
 from slot import Slot
 from tray import Tray
 
@@ -166,3 +166,56 @@ def test_sequential_operations(
     assert platform.place_into(empty_slot) is True
     assert platform.held_tray is None
     assert empty_slot.tray is test_tray
+
+
+def test_travel_time_constant_speed():
+    """Without an acceleration limit, time is distance / speed"""
+    assert travel_time(3.0, 0.2) == pytest.approx(15.0)
+    assert travel_time(-3.0, 0.2) == pytest.approx(15.0)
+    assert travel_distance(7.5, 3.0, 0.2) == pytest.approx(1.5)
+
+
+def test_travel_time_with_acceleration_limit():
+    """Trapezoidal profile for long moves, triangular for short ones"""
+    # Ramps take 0.4 s each and cover 0.04 m each
+    assert travel_time(3.0, 0.2, accel=0.5) == pytest.approx(0.4 + 2.92 / 0.2 + 0.4)
+    assert travel_time(0.01, 0.2, accel=0.5) == pytest.approx(2 * (0.01 / 0.5) ** 0.5)
+    total = travel_time(3.0, 0.2, accel=0.5)
+    assert travel_distance(total / 2, 3.0, 0.2, accel=0.5) == pytest.approx(1.5)
+    assert travel_distance(total, 3.0, 0.2, accel=0.5) == pytest.approx(3.0)
+
+
+def test_start_move_reports_position_and_arrives_once(platform):
+    """Analytic move: position at any time, one arrived event at the end"""
+    arrivals = []
+    platform.on_arrived = arrivals.append
+
+    arrival = platform.start_move("y", 1.0, now=2.0)
+    assert arrival == pytest.approx(7.0)
+    assert platform.position_at(4.5) == pytest.approx((0.0, 0.5))
+    assert platform.settle(6.9) is False
+    assert platform.curr_y == 0.0
+
+    assert platform.settle(arrival) is True
+    assert platform.curr_y == 1.0
+    assert platform.arrival_time is None
+    assert platform.settle(8.0) is True
+    assert arrivals == [platform]
+
+
+def test_start_move_x_axis_uses_extract_speed(platform):
+    arrival = platform.start_move("x", -0.3, now=0.0)
+    assert arrival == pytest.approx(0.3 / platform.extract_speed)
+    assert platform.position_at(1.0) == pytest.approx((-0.15, 0.0))
+
+
+def test_approach_time_retracts_before_vertical_moves(platform):
+    # Same row: only X travels
+    assert Platform.approach_time(0.7, 1.0, -0.7, 1.0) == pytest.approx(1.4 / 0.15)
+    # Other row: retract, climb, extend
+    assert Platform.approach_time(0.7, 0.0, -0.7, 1.0) == pytest.approx(
+        0.7 / 0.15 + 1.0 / 0.2 + 0.7 / 0.15
+    )
+    platform.curr_y = 1.0
+    slot = Slot(slot_id="s", x=-0.7, y=0.0, slot_type="storage")
+    assert platform.time_to(slot) == pytest.approx(1.0 / 0.2 + 0.7 / 0.15)
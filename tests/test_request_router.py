@@ -0,0 +1,70 @@
+from types import SimpleNamespace
+
+import pytest
+from mission_queue import MISSION_NAMES, MISSIONS
+from request_router import RequestRouter
+from warehouse import Warehouse
+from warehouse_controller import WarehouseController
+
+
+def request(node, *args):
+    return SimpleNamespace(node=node, args=list(args))
+
+
+def test_routes_every_method_node():
+    router = RequestRouter()
+    assert router.nodes == [f"Machine/{name}" for name in MISSION_NAMES]
+    for name in MISSION_NAMES:
+        assert router.resolve(f"/Machine/{name}") is MISSIONS[name]
+        assert router.resolve(f"Machine/{name}") is MISSIONS[name]
+
+
+def test_unknown_nodes_are_not_routed():
+    router = RequestRouter()
+    assert router.resolve("/Machine/Status/Busy") is None
+    assert router.route(request("/Machine/Teleport", 3)) is None
+    # Exact paths only: no substring matches
+    assert router.route(request("/Machine/ExtractTrayFast", 3)) is None
+    assert router.route(SimpleNamespace()) is None
+
+
+@pytest.mark.parametrize(
+    "args, tray", [((4,), 4), (("4",), 4), ((), None), ((None,), None)]
+)
+def test_parses_tray_argument(args, tray):
+    mission = RequestRouter().route(request("/Machine/ExtractTray", *args), ref="a")
+    assert (mission.name, mission.tray, mission.ref) == ("ExtractTray", tray, "a")
+
+
+@pytest.mark.parametrize("arg", ["four", [4], "4.5"])
+def test_rejects_bad_tray_argument(arg):
+    # Not the same as no tray: ExtractTray() would extract from the queue
+    with pytest.raises(ValueError):
+        RequestRouter().route(request("/Machine/ExtractTray", arg))
+    with pytest.raises(ValueError):
+        MISSIONS["Enqueue"].parse_tray([arg])
+
+
+def test_ignores_arguments_of_trayless_missions():
+    mission = RequestRouter().route(request("/Machine/SendBack", 4))
+    assert (mission.name, mission.tray) == ("SendBack", None)
+
+
+def test_custom_root():
+    router = RequestRouter(root="Unit")
+    assert router.resolve("/Unit/Enqueue") is MISSIONS["Enqueue"]
+    assert router.resolve("/Machine/Enqueue") is None
+
+
+def test_routed_missions_start_through_controller_entries():
+    wh = Warehouse()
+    controller = WarehouseController(wh)
+    router = RequestRouter()
+    mission = router.route(request("/Machine/Enqueue"), ref="a")
+    # Enqueue needs a tray number
+    assert controller.start(mission.name, mission.tray) is False
+    mission = router.route(request("/Machine/ExtractTray", "2"), ref="b")
+    assert controller.start(mission.name, mission.tray) is True
+    assert controller.target_tray_id == 2
+    with pytest.raises(ValueError):
+        controller.start("Teleport")
@@ -0,0 +1,101 @@
+import csv
+import random
+
+import pytest
+from layout import read_layout
+from scenarios import (
+    COLUMNS,
+    DEFAULT_LAYOUT,
+    random_inventory,
+    random_tasks,
+    run_scenarios,
+)
+from tray import Tray
+
+
+@pytest.fixture
+def layout():
+    return read_layout(DEFAULT_LAYOUT)
+
+
+def read_rows(path):
+    with open(path, newline="") as f:
+        return list(csv.DictReader(f))
+
+
+def test_random_inventory_is_seeded(layout):
+    first = random_inventory(layout, random.Random(1), trays=12)
+    again = random_inventory(layout, random.Random(1), trays=12)
+    assert first == again
+    slots = [t["slot"] for t in first["trays"]]
+    assert len(slots) == len(set(slots)) == 12
+    assert "in_view" not in slots
+    assert layout["trays"] != first["trays"]
+
+
+def test_random_inventory_empty_ratio(layout):
+    trays = random_inventory(layout, random.Random(2), 30, empty_ratio=1.0)["trays"]
+    assert all(t["weight"] == Tray.MIN_W for t in trays)
+
+
+def test_random_inventory_rejects_overfull(layout):
+    with pytest.raises(ValueError):
+        random_inventory(layout, random.Random(0), trays=40)
+
+
+def test_random_tasks_send_back_after_bay_is_filled():
+    tasks = random_tasks(random.Random(3), trays=5, count=200)
+    for prev, task in zip(tasks, tasks[1:]):
+        fills_bay = prev["name"] in ("ExtractTray", "FetchAnyEmpty")
+        assert (task["name"] == "SendBack") == fills_bay
+    assert all(1 <= t["tray"] <= 5 for t in tasks if t["name"] == "Enqueue")
+
+
+def test_run_scenarios_streams_csv(tmp_path):
+    out = tmp_path / "rows.csv"
+    summary = run_scenarios(range(5), str(out), tasks=8, workers=1, tag="base")
+    rows = read_rows(out)
+    assert tuple(rows[0]) == COLUMNS
+    assert len(rows) == 40 == sum(summary.statuses.values())
+    assert {r["tag"] for r in rows} == {"base"}
+    assert summary.scenarios == 5
+    assert summary.throughput > 0
+    p = summary.percentiles()
+    assert 0 < p[50] <= p[90] <= p[99]
+
+
+def test_process_pool_matches_serial(tmp_path):
+    serial, pooled = tmp_path / "serial.csv", tmp_path / "pooled.csv"
+    run_scenarios(range(6), str(serial), tasks=6, workers=1)
+    run_scenarios(range(6), str(pooled), tasks=6, workers=2)
+    assert read_rows(serial) == read_rows(pooled)
+
+
+def test_egglog_workers_share_a_session(tmp_path):
+    out = tmp_path / "egglog.csv"
+    summary = run_scenarios(
+        range(2),
+        str(out),
+        tasks=2,
+        mix={"ExtractTray": 1.0},
+        workers=1,
+        planner_backend="egglog",
+        plan_missions=True,
+    )
+    python = run_scenarios(
+        range(2),
+        str(tmp_path / "python.csv"),
+        tasks=2,
+        mix={"ExtractTray": 1.0},
+        workers=1,
+    )
+    assert summary.statuses == python.statuses
+
+
+def test_parquet_output(tmp_path):
+    parquet = pytest.importorskip("pyarrow.parquet")
+    out = tmp_path / "rows.parquet"
+    run_scenarios(range(3), str(out), tasks=4, workers=1)
+    table = parquet.read_table(out)
+    assert tuple(table.column_names) == COLUMNS
+    assert table.num_rows == 12
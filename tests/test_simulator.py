@@ -0,0 +1,139 @@
+import os
+
+import pytest
+from simulator import Simulator, load_plan
+from warehouse_platform import Platform
+
+PRODUCTION_PLAN = os.path.join(
+    os.path.dirname(__file__), "..", "models", "production_plan.json"
+)
+
+
+@pytest.fixture
+def simulator():
+    return Simulator()
+
+
+def test_load_plan_reads_tasks_in_order():
+    tasks = load_plan(PRODUCTION_PLAN)
+    assert [t["id"] for t in tasks] == ["T1", "T2", "T3", "T4", "T5"]
+    assert tasks[0] == {"id": "T1", "name": "ExtractTray", "tray": 2}
+    assert tasks[1]["tray"] is None
+
+
+def test_production_plan_completes(simulator):
+    report = simulator.run_file(PRODUCTION_PLAN)
+    assert report.completed == 5
+    assert report.makespan == report.tasks[-1].finished
+    assert report.planner_calls == sum(t.planner_calls for t in report.tasks) > 0
+    # Tasks are sequential: each starts after the previous PHYSICAL_DONE
+    for prev, task in zip(report.tasks, report.tasks[1:]):
+        assert task.dispatched == pytest.approx(prev.finished + 0.05)
+
+
+def test_latency_matches_travel_time(simulator):
+    # Tray 2 sits in storage_L_5: climb, reach left, pick, back, descend, reach right
+    result = simulator.run([{"name": "ExtractTray", "tray": 2}]).tasks[0]
+    y = 5 * 0.16725
+    x = 0.7
+    travel = (
+        y + abs(y - 3 * 0.16725)
+    ) / Platform.speed_y + 3 * x / Platform.extract_speed
+    assert result.status == "done"
+    assert travel <= result.latency < travel + 0.05
+
+
+def test_rejected_task_waits_error_delay(simulator):
+    report = simulator.run([{"name": "SendBack"}, {"name": "ExtractTray", "tray": 2}])
+    rejected, extract = report.tasks
+    assert rejected.status == "rejected" and rejected.latency == 0
+    assert extract.dispatched == 1.0
+    assert extract.status == "done"
+
+
+def test_enqueue_without_tray_is_rejected(simulator):
+    assert simulator.run([{"name": "Enqueue"}]).tasks[0].status == "rejected"
+
+
+def test_unknown_task_raises(simulator):
+    with pytest.raises(ValueError):
+        simulator.run([{"name": "Teleport"}])
+
+
+def test_without_timer_no_quantization():
+    sim = Simulator(control_period=None, done_delay=0)
+    task = {"name": "ExtractTray", "tray": 2}
+    quantized = Simulator().run([task]).tasks[0]
+    exact = sim.run([task]).tasks[0]
+    assert exact.latency <= quantized.latency
+    assert exact.moves == quantized.moves
+
+
+def test_egglog_backend_agrees_on_makespan():
+    tasks = [{"name": "ExtractTray", "tray": 2}, {"name": "SendBack"}]
+    python = Simulator().run(tasks)
+    egglog = Simulator(planner_backend="egglog", plan_missions=True).run(tasks)
+    assert egglog.completed == python.completed == 2
+    assert egglog.tasks[0].latency == pytest.approx(python.tasks[0].latency)
+
+
+def test_batch_runs_queue_back_to_back():
+    tasks = [
+        {"id": "A", "name": "ExtractTray", "tray": 5},
+        {"id": "B", "name": "SendBack"},
+        {"id": "C", "name": "ExtractTray", "tray": 4},
+    ]
+    report = Simulator().run(tasks, batch=True)
+    assert [t.task_id for t in report.tasks] == ["A", "B", "C"]
+    assert all(t.dispatched == 0 for t in report.tasks)
+    for prev, task in zip(report.tasks, report.tasks[1:]):
+        assert task.finished > prev.finished
+    assert report.distance == pytest.approx(sum(t.distance for t in report.tasks))
+
+
+def test_lookahead_saves_travel_against_fifo():
+    tasks = [
+        {"name": "ExtractTray", "tray": 5},
+        {"name": "SendBack"},
+        {"name": "ExtractTray", "tray": 2},
+        {"name": "SendBack"},
+    ]
+    fifo = Simulator().run(tasks, batch=True)
+    lookahead = Simulator(queue_policy="lookahead").run(tasks, batch=True)
+    assert fifo.completed == lookahead.completed == 4
+    assert lookahead.distance < fifo.distance
+    assert lookahead.makespan < fifo.makespan
+
+
+def test_tasks_wait_for_their_release_time(simulator):
+    tasks = [{"name": "ExtractTray", "tray": 2}, {"name": "SendBack", "at": 100.0}]
+    report = simulator.run(tasks)
+    assert report.tasks[0].finished < 100.0
+    assert report.tasks[1].dispatched == 100.0
+    assert report.tasks[1].finished > 100.0
+
+
+def test_slotting_relocates_during_idle_gaps():
+    from slotting import SlottingOptimizer
+
+    # Tray 4 takes the slot nearest the bay, then tray 5 is extracted twice
+    tasks = [
+        {"name": "ExtractTray", "tray": 4},
+        {"name": "SendBack"},
+        {"name": "ExtractTray", "tray": 5},
+        {"name": "SendBack"},
+        {"name": "ExtractTray", "tray": 5, "at": 200.0},
+        {"name": "SendBack"},
+        {"name": "ExtractTray", "tray": 5, "at": 400.0},
+    ]
+    slotting = SlottingOptimizer(min_gain=0.5)
+    before = Simulator().run(tasks)
+    after = Simulator(slotting=slotting).run(tasks)
+
+    # Tray 4 made room, then tray 5 moved in: the last extract is shorter
+    assert slotting.relocations == 2
+    assert after.tasks[-1].dispatched == 400.0
+    assert after.tasks[-1].latency < before.tasks[-1].latency
+    assert [t.latency for t in after.tasks[:-1]] == [
+        t.latency for t in before.tasks[:-1]
+    ]
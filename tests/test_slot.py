@@ -75,3 +75,17 @@ def test_slot_with_custom_type():
     """Test slot creation with custom slot type"""
     slot = Slot(slot_id="queue1", x=0.0, y=0.0, slot_type="queue")
     assert slot.slot_type == "queue"
+
+
+def test_on_change_called_on_add_and_remove(empty_slot, test_tray):
+    """Test the change callback sees every add and remove"""
+    calls = []
+    empty_slot.on_change = lambda slot, tray: calls.append((slot, tray, slot.tray))
+
+    empty_slot.add_tray(test_tray)
+    empty_slot.remove_tray()
+
+    assert calls == [
+        (empty_slot, test_tray, test_tray),
+        (empty_slot, test_tray, None),
+    ]
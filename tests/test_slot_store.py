@@ -0,0 +1,106 @@
+import pytest
+
+pytest.importorskip("numpy")
+
+import slot_store  # noqa: E402
+from cfg_engine import PlannerSession  # noqa: E402
+from fast_planner import FastPlanner  # noqa: E402
+from slot import Slot  # noqa: E402
+from slot_store import SlotStore, SlotView  # noqa: E402
+from tray import Tray  # noqa: E402
+from warehouse import Warehouse  # noqa: E402
+from warehouse_controller import WarehouseController  # noqa: E402
+
+
+def describe(wh):
+    return [
+        (s.slot_id, s.slot_type, s.x, s.y, s.tray and s.tray.tray_id)
+        for s in wh._get_all_slots()
+    ]
+
+
+@pytest.fixture
+def columnar():
+    return Warehouse(columnar=True)
+
+
+def test_columnar_warehouse_matches_object_warehouse(columnar):
+    objects = Warehouse()
+    assert describe(columnar) == describe(objects)
+    assert columnar.occupancy_hash == objects.occupancy_hash
+    assert all(type(s) is SlotView for s in columnar._get_all_slots())
+    assert columnar.in_view_slot is columnar.get_slot_at(0.7, 3 * Warehouse.SLOT_HEIGHT)
+
+
+def test_views_write_through_to_arrays(columnar):
+    store = columnar.store
+    src = columnar.get_slot_by_id("storage_L_0")
+    dst = columnar.get_slot_by_id("storage_L_1")
+
+    dst.add_tray(src.remove_tray())
+    assert store.tray_id[src._i] == 0
+    assert store.tray_id[dst._i] == 1
+    assert columnar.get_slot_by_tray(1) is dst
+    with pytest.raises(ValueError):
+        dst.add_tray(Tray(weight=3.0))
+    with pytest.raises(ValueError):
+        src.remove_tray()
+
+
+def test_vectorized_queries_match_scans(columnar):
+    slots = columnar._get_all_slots()
+    store = columnar.store
+    for slot_type in ("storage", "queue", "bay"):
+        expected = next(
+            (s for s in slots if s.slot_type == slot_type and s.tray is None), None
+        )
+        assert store.first_empty(slot_type) is expected
+    assert store.first_with_empty_tray() is next(
+        s for s in slots if s.tray and not s.tray.is_full
+    )
+    for tid in range(1, 7):
+        assert store.slot_of_tray(tid) is columnar.get_slot_by_tray(tid)
+    assert store.slot_of_tray(99) is None
+
+
+@pytest.mark.parametrize("slots", [[], [Slot("S1", 0.0, 0.0, slot_type="bay")]])
+def test_queries_on_empty_selection(slots):
+    store = SlotStore(slots)
+    assert store.first_empty("storage") is None
+    assert store.first_with_empty_tray() is None
+    assert store.slot_of_tray(1) is None
+    assert len(store.empty("queue")) == 0
+
+
+def test_session_syncs_only_changed_slots(columnar):
+    session = PlannerSession()
+    assert session.sync(columnar) == len(columnar._get_all_slots())
+
+    src = columnar.get_slot_by_id("storage_L_0")
+    columnar.get_slot_by_id("storage_L_1").add_tray(src.remove_tray())
+    assert session.sync(columnar) == 2
+
+    state = dict(cy=0.0, cx=0.0, holding=False, phase="fetch", cmd_type="FETCH")
+    action = session.next_action(columnar, target_id=1, **state)
+    assert action.val == columnar.get_slot_by_id("storage_L_1").y
+    assert FastPlanner().next_action(columnar, target_id=1, **state) == action
+
+
+@pytest.mark.parametrize(
+    "options", [dict(planner_backend="python"), dict(plan_missions=True)]
+)
+def test_controller_completes_mission_on_columnar_warehouse(columnar, options):
+    controller = WarehouseController(columnar, **options)
+    assert controller.extract(2) is True
+    for _ in range(2000):
+        if not controller.is_busy:
+            break
+        controller.tick()
+    assert columnar.tray_in_bay == 2
+    assert columnar.store.tray_id[columnar.in_view_slot._i] == 2
+
+
+def test_store_requires_numpy(monkeypatch):
+    monkeypatch.setattr(slot_store, "np", None)
+    with pytest.raises(ImportError):
+        SlotStore([Slot("S1", 0.0, 0.0)])
@@ -0,0 +1,86 @@
+import pytest
+from slotting import SlottingOptimizer
+from warehouse import Warehouse
+
+
+@pytest.fixture
+def warehouse():
+    # Trays: 1 storage_L_0, 2 storage_L_5, 3 storage_R_7, 4 storage_L_10,
+    # 5 storage_R_15, 6 queue_0; the bay is on row 3, storage_L_3 is free
+    return Warehouse()
+
+
+@pytest.fixture
+def full_rows():
+    """Bay and two storage rows: the closest slot holds the cold tray 1."""
+    return Warehouse(
+        {
+            "row_pitch": 0.5,
+            "rows": 2,
+            "columns": [
+                {"name": "L", "x": -0.7},
+                {"name": "R", "x": 0.7, "slots": {0: {"id": "in_view", "type": "bay"}}},
+            ],
+            "trays": [
+                {"slot": "storage_L_0", "weight": 3.0},
+                {"slot": "storage_L_1", "weight": 3.0},
+            ],
+        }
+    )
+
+
+def slot_ids(move):
+    return tuple(s.slot_id for s in move) if move else None
+
+
+def test_hot_tray_moves_to_free_slot_nearest_bay(warehouse):
+    optimizer = SlottingOptimizer()
+    optimizer.record(5)
+    assert optimizer.propose(warehouse) is None  # below min_accesses
+    optimizer.record(5)
+    assert slot_ids(optimizer.propose(warehouse)) == ("storage_R_15", "storage_L_3")
+
+
+def test_hottest_tray_goes_first(warehouse):
+    optimizer = SlottingOptimizer()
+    for tray_id in (5, 5, 4, 4, 4):
+        optimizer.record(tray_id)
+    assert slot_ids(optimizer.propose(warehouse)) == ("storage_L_10", "storage_L_3")
+
+
+def test_no_move_without_enough_gain(warehouse):
+    optimizer = SlottingOptimizer(min_gain=5.0)
+    # Tray 2 (storage_L_5) is 1.7 s further from the bay than storage_L_3
+    optimizer.record(2)
+    optimizer.record(2)
+    assert optimizer.propose(warehouse) is None
+
+
+def test_max_delay_limits_loaded_leg(warehouse):
+    optimizer = SlottingOptimizer(max_delay=10.0)
+    optimizer.record(5)
+    optimizer.record(5)
+    assert optimizer.propose(warehouse) is None
+
+
+def test_colder_tray_makes_room(full_rows):
+    optimizer = SlottingOptimizer()
+    for tray_id in (1, 2, 2):
+        optimizer.record(tray_id)
+    src, dst = optimizer.propose(full_rows)
+    assert (src.slot_id, dst.slot_id) == ("storage_L_0", "storage_R_1")
+
+    dst.add_tray(src.remove_tray())
+    assert slot_ids(optimizer.propose(full_rows)) == ("storage_L_1", "storage_L_0")
+
+
+def test_throttle():
+    optimizer = SlottingOptimizer(min_idle=5.0, cooldown=30.0)
+    assert not optimizer.ready(4.0, idle_since=0.0)
+    assert optimizer.ready(5.0, idle_since=0.0)
+    optimizer.started(5.0)
+    assert optimizer.ready_at(idle_since=20.0) == 35.0
+    assert optimizer.stats == {"relocations": 1, "preempted": 0, "tracked_trays": 0}
+
+    optimizer.reset()
+    assert optimizer.ready(5.0, idle_since=0.0)
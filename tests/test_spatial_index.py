@@ -0,0 +1,123 @@
+import random
+
+import pytest
+from slot import Slot
+from spatial_index import GridIndex, NearestIndex, SortedIndex, build_spatial_index
+from warehouse import Warehouse
+from warehouse_platform import Platform
+
+
+def brute_force(slots, x, y):
+    """The original get_slot_at scan."""
+    for slot in slots:
+        if abs(slot.x - x) < 0.01 and abs(slot.y - y) < 0.01:
+            return slot
+    return None
+
+
+def probe_points(slots, n=2000, seed=0):
+    """Random points plus points on and around every slot and tolerance edge."""
+    rng = random.Random(seed)
+    xs = [s.x for s in slots]
+    ys = [s.y for s in slots]
+    points = [
+        (rng.uniform(min(xs) - 1, max(xs) + 1), rng.uniform(min(ys) - 1, max(ys) + 1))
+        for _ in range(n)
+    ]
+    for s in slots:
+        for dx in (0.0, 0.0099, -0.0099, 0.01, -0.01, 0.0101):
+            for dy in (0.0, 0.0099, -0.0099, 0.01, -0.0101):
+                points.append((s.x + dx, s.y + dy))
+    return points
+
+
+@pytest.fixture
+def irregular_slots():
+    """Uneven rows, an odd column and two overlapping slots."""
+    return [
+        Slot("a", -0.7, 0.0),
+        Slot("b", 0.7, 0.013),
+        Slot("c", 0.7, 0.5),
+        Slot("d", 0.31, 0.77),
+        Slot("e", 0.705, 0.505),
+        Slot("f", -0.7, 1e-12),
+    ]
+
+
+def test_regular_warehouse_uses_grid_index():
+    assert isinstance(Warehouse()._spatial, GridIndex)
+
+
+def test_irregular_layout_falls_back_to_sorted_index(irregular_slots):
+    assert isinstance(build_spatial_index(irregular_slots), SortedIndex)
+    with pytest.raises(ValueError):
+        GridIndex(irregular_slots)
+
+
+@pytest.mark.parametrize("index_cls", [GridIndex, SortedIndex])
+def test_index_matches_linear_scan_on_warehouse(index_cls):
+    slots = Warehouse()._get_all_slots()
+    index = index_cls(slots)
+    for x, y in probe_points(slots):
+        assert index.lookup(x, y) is brute_force(slots, x, y), (x, y)
+
+
+def test_sorted_index_matches_linear_scan_on_irregular(irregular_slots):
+    index = SortedIndex(irregular_slots)
+    for x, y in probe_points(irregular_slots):
+        assert index.lookup(x, y) is brute_force(irregular_slots, x, y), (x, y)
+
+
+def test_warehouse_spatial_index_is_pluggable():
+    layout = type("SortedWarehouse", (Warehouse,), {"SPATIAL_INDEX": SortedIndex})
+    wh = layout()
+    assert isinstance(wh._spatial, SortedIndex)
+    assert wh.get_slot_at(0.7, 3 * Warehouse.SLOT_HEIGHT) is wh.in_view_slot
+
+
+def test_nearest_index_matches_linear_scan():
+    slots = Warehouse()._get_all_slots()
+    rng = random.Random(1)
+    for _ in range(50):
+        candidates = rng.sample(slots, rng.randint(1, len(slots)))
+        index = NearestIndex(candidates)
+        x, y = rng.choice((-0.7, 0.0, 0.7)), rng.uniform(-0.5, 3.5)
+        expected = min(candidates, key=lambda s: Platform.approach_time(x, y, s.x, s.y))
+        assert index.nearest(x, y) is expected, (x, y)
+
+
+def test_nearest_index_breaks_ties_in_layout_order():
+    a, b, c = Slot("a", 0.7, 0.5), Slot("b", -0.7, 0.5), Slot("c", 0.7, 0.0)
+    index = NearestIndex([c, a, b])
+    assert index.first() is c
+    # a and b are the same distance away; a comes first in the input
+    assert NearestIndex([a, b]).nearest(0.0, 0.0) is a
+    assert NearestIndex([b, a]).nearest(0.0, 0.0) is b
+    assert index.nearest(0.0, 0.4) is a
+    assert NearestIndex([]).nearest(0.0, 0.0) is None
+
+
+def test_k_nearest_matches_sorted_costs():
+    slots = Warehouse()._get_all_slots()
+    rng = random.Random(2)
+    for _ in range(50):
+        candidates = rng.sample(slots, rng.randint(1, len(slots)))
+        k = rng.randint(1, 5)
+        x, y = rng.choice((-0.7, 0.0, 0.7)), rng.uniform(-0.5, 3.5)
+        costs = sorted(Platform.approach_time(x, y, s.x, s.y) for s in candidates)
+        limit = costs[min(k, len(costs)) - 1]
+        expected = [
+            s for s in candidates if Platform.approach_time(x, y, s.x, s.y) <= limit
+        ]
+        found = NearestIndex(candidates).k_nearest(x, y, k)
+        assert found == expected, (x, y, k)
+        assert len(found) >= min(k, len(candidates))
+
+
+def test_k_nearest_keeps_ties_with_the_kth():
+    a, b, c = Slot("a", 0.7, 0.5), Slot("b", -0.7, 0.5), Slot("c", 0.7, 2.0)
+    index = NearestIndex([c, a, b])
+    assert index.k_nearest(0.0, 0.0, 1) == [a, b]
+    assert index.k_nearest(0.0, 0.0, 3) == [c, a, b]
+    assert index.k_nearest(0.0, 0.0, 0) == []
+    assert NearestIndex([]).k_nearest(0.0, 0.0, 2) == []
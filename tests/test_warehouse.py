@@ -76,10 +76,45 @@ def test_tray_in_bay_property_returns_int(warehouse):
     assert result >= 0
 
 
-def test_get_all_slots_returns_list(warehouse):
-    """_get_all_slots should return a list of slots"""
+def test_get_all_slots_returns_cached_tuple(warehouse):
+    """_get_all_slots should return the same immutable tuple of slots"""
     result = warehouse._get_all_slots()
-    assert isinstance(result, list)
-    # All items in the list should be Slot objects
+    assert isinstance(result, tuple)
+    assert warehouse._get_all_slots() is result
+    # All items in the tuple should be Slot objects
     for slot in result:
         assert isinstance(slot, Slot)
+
+
+def test_occupancy_hash_tracks_tray_moves(warehouse):
+    """occupancy_hash changes on a move and is restored when it is undone"""
+    initial = warehouse.occupancy_hash
+    src = warehouse.get_slot_by_id("storage_L_0")
+    dst = warehouse.get_slot_by_id("storage_L_1")
+
+    dst.add_tray(src.remove_tray())
+    moved = warehouse.occupancy_hash
+    assert moved != initial
+
+    src.add_tray(dst.remove_tray())
+    assert warehouse.occupancy_hash == initial
+
+
+def test_tray_index_follows_tray_moves(warehouse):
+    """get_slot_by_tray/has_tray follow add_tray and remove_tray"""
+    src = warehouse.get_slot_by_id("storage_L_0")
+    dst = warehouse.get_slot_by_id("storage_L_1")
+    tray_id = src.tray.tray_id
+    assert warehouse.get_slot_by_tray(tray_id) is src
+
+    tray = src.remove_tray()
+    assert not warehouse.has_tray(tray_id)
+    assert warehouse.get_slot_by_tray(tray_id) is None
+
+    dst.add_tray(tray)
+    assert warehouse.has_tray(str(tray_id))
+    assert warehouse.get_slot_by_tray(tray_id) is dst
+
+
+def test_get_slot_by_id_unknown_returns_none(warehouse):
+    assert warehouse.get_slot_by_id("nope") is None
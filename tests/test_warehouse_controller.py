@@ -5,6 +5,7 @@ Tests mission initialization, state transitions, and basic operations.
 
 import pytest
 from unittest.mock import Mock, patch
+from cfg_engine import RobotAction
 from warehouse_controller import WarehouseController, MissionState
 
 
@@ -313,7 +314,7 @@ class TestWarehouseControllerFundamentals:
         self, mock_get_action, controller, mock_warehouse
     ):
         """tick handles lock action by storing locked_target_id."""
-        mock_get_action.return_value = {"type": "lock", "slot_id": "SLOT_001"}
+        mock_get_action.return_value = RobotAction("lock", slot_id="SLOT_001")
         controller.state = MissionState.FETCH
         controller.target_tray_id = 100
 
@@ -327,7 +328,7 @@ class TestWarehouseControllerFundamentals:
         self, mock_get_action, controller, mock_warehouse
     ):
         """tick transitions from FETCH to DELIVER after successful pick."""
-        mock_get_action.return_value = {"type": "pick"}
+        mock_get_action.return_value = RobotAction("pick")
         controller.state = MissionState.FETCH
         controller.source_slot = None
 
@@ -348,7 +349,7 @@ class TestWarehouseControllerFundamentals:
         self, mock_get_action, controller, mock_warehouse
     ):
         """tick sets controller to IDLE after successful place in DELIVER phase."""
-        mock_get_action.return_value = {"type": "place"}
+        mock_get_action.return_value = RobotAction("place")
         controller.state = MissionState.DELIVER
 
         # Setup required state for place action
@@ -370,7 +371,7 @@ class TestWarehouseControllerFundamentals:
         self, mock_get_action, controller, mock_warehouse
     ):
         """tick resets controller to IDLE if action execution fails."""
-        mock_get_action.return_value = {"type": "update_y", "val": 10.0}
+        mock_get_action.return_value = RobotAction("update_y", val=10.0)
         mock_warehouse.platform.update_y_position.return_value = False  # Action fails
         controller.state = MissionState.FETCH
         controller.target_tray_id = 100
@@ -383,10 +384,331 @@ class TestWarehouseControllerFundamentals:
     @patch("warehouse_controller.get_next_action_from_egglog")
     def test_tick_ignores_wait_action(self, mock_get_action, controller):
         """tick returns False without changing state on wait action."""
-        mock_get_action.return_value = {"type": "wait"}
+        mock_get_action.return_value = RobotAction("wait")
         controller.state = MissionState.FETCH
 
         result = controller.tick()
 
         assert result is False
         assert controller.state == MissionState.FETCH  # State unchanged
+
+
+class TestWarehouseControllerMissionPlans:
+    """Test plan-once replay against a real warehouse."""
+
+    @pytest.fixture
+    def warehouse(self):
+        from warehouse import Warehouse
+
+        return Warehouse()
+
+    def _run(self, controller):
+        ticks = 0
+        while controller.is_busy and ticks < 2000:
+            controller.tick()
+            ticks += 1
+        return ticks
+
+    def test_extract_plans_once_and_delivers(self, warehouse):
+        """A specific-tray extract is planned with a single call."""
+        import warehouse_controller
+
+        controller = WarehouseController(warehouse, plan_missions=True)
+        with patch(
+            "warehouse_controller.plan_mission",
+            wraps=warehouse_controller.plan_mission,
+        ) as planner:
+            assert controller.extract(2) is True
+            self._run(controller)
+
+        assert planner.call_count == 1
+        assert controller.state == MissionState.IDLE
+        assert warehouse.tray_in_bay == 2
+
+    def test_replans_when_source_changes(self, warehouse):
+        """Moving the target tray mid-mission forces a new plan."""
+        controller = WarehouseController(warehouse, plan_missions=True)
+        assert controller.extract(2) is True
+        controller.tick()
+        first_plan = controller.plan
+
+        tray = warehouse.get_slot_by_id("storage_L_5").remove_tray()
+        warehouse.get_slot_by_id("storage_L_6").add_tray(tray)
+        controller.tick()
+
+        assert controller.plan is not first_plan
+        self._run(controller)
+        assert warehouse.tray_in_bay == 2
+
+
+class TestWarehouseControllerPlannerBackends:
+    """Test the python planner backend and egglog shadow verification."""
+
+    @pytest.fixture
+    def warehouse(self):
+        from warehouse import Warehouse
+
+        return Warehouse()
+
+    def _run(self, controller):
+        ticks = 0
+        while controller.is_busy and ticks < 2000:
+            controller.tick()
+            ticks += 1
+        return ticks
+
+    def test_unknown_backend_rejected(self, warehouse):
+        with pytest.raises(ValueError):
+            WarehouseController(warehouse, planner_backend="prolog")
+
+    def test_python_backend_completes_without_egglog(self, warehouse):
+        """The python backend never calls into egglog."""
+        controller = WarehouseController(warehouse, planner_backend="python")
+        with patch("warehouse_controller.get_next_action_from_egglog") as egglog:
+            assert controller.extract(2) is True
+            self._run(controller)
+            assert controller.sendback() is True
+            self._run(controller)
+
+        egglog.assert_not_called()
+        assert controller.state == MissionState.IDLE
+        assert not warehouse.tray_in_bay
+        assert warehouse.has_tray(2)
+        assert controller._planner is None
+        assert controller.planner_calls > 0
+
+    def test_shadow_backend_agrees_with_egglog(self, warehouse):
+        controller = WarehouseController(
+            warehouse, planner_backend="shadow", shadow_rate=1.0
+        )
+        assert controller.extract(2) is True
+        ticks = self._run(controller)
+
+        assert warehouse.tray_in_bay == 2
+        assert controller.shadow_checks == ticks
+        assert controller.shadow_divergences == 0
+
+    def test_shadow_backend_logs_divergence(self, warehouse, caplog):
+        controller = WarehouseController(
+            warehouse, planner_backend="shadow", shadow_rate=1.0
+        )
+        controller.fast_planner.next_action = Mock(
+            return_value=RobotAction("update_y", val=123.0)
+        )
+        assert controller.extract(2) is True
+        controller.tick()
+
+        assert controller.shadow_divergences == 1
+        assert "Planner divergence" in caplog.text
+
+
+class TestWarehouseControllerEventDriven:
+    """Test advance(): one planner step per motion segment."""
+
+    @pytest.fixture
+    def warehouse(self):
+        from warehouse import Warehouse
+
+        return Warehouse()
+
+    def _run(self, controller, now=0.0):
+        events = 0
+        while controller.is_busy and events < 100:
+            arrival = controller.advance(now)
+            events += 1
+            if arrival is None:
+                break
+            now = arrival
+        return now, events
+
+    @pytest.mark.parametrize(
+        "options", [dict(planner_backend="python"), dict(plan_missions=True)]
+    )
+    def test_advance_completes_mission_in_few_events(self, warehouse, options):
+        controller = WarehouseController(warehouse, **options)
+        assert controller.extract(2) is True
+        now, events = self._run(controller)
+
+        assert controller.state == MissionState.IDLE
+        assert warehouse.tray_in_bay == 2
+        assert events <= 8
+        # Same travel as 402 ticks of 50 ms, without rounding up each segment
+        assert now == pytest.approx(402 * 0.05, abs=0.3)
+
+    def test_advance_waits_for_arrival(self, warehouse):
+        controller = WarehouseController(warehouse, planner_backend="python")
+        controller.extract(2)
+        arrival = controller.advance(0.0)
+        assert warehouse.platform.move is not None
+
+        assert controller.advance(arrival / 2) == arrival
+        assert warehouse.platform.curr_y == 0.0
+        assert controller.advance(arrival) != arrival
+        assert warehouse.platform.curr_y == warehouse.get_slot_by_tray(2).y
+
+
+class TestWarehouseControllerMissionQueue:
+    """Test submit/start_next and the look-ahead SendBack chaining."""
+
+    @pytest.fixture
+    def warehouse(self):
+        from warehouse import Warehouse
+
+        return Warehouse()
+
+    def _finish(self, controller):
+        now = 0.0
+        while controller.is_busy:
+            now = controller.advance(now) or now
+
+    def test_submit_rejects_unknown_mission(self, warehouse):
+        controller = WarehouseController(warehouse)
+        with pytest.raises(ValueError):
+            controller.submit("Teleport")
+
+    def test_start_next_runs_queue_in_order(self, warehouse):
+        controller = WarehouseController(warehouse, planner_backend="python")
+        controller.submit("SendBack", ref="a")
+        controller.submit("ExtractTray", 2, ref="b")
+
+        mission, started = controller.start_next()
+        assert (mission.ref, started) == ("a", False)
+        mission, started = controller.start_next()
+        assert (mission.ref, started) == ("b", True)
+        assert controller.start_next() is None  # busy
+
+        self._finish(controller)
+        assert controller.mission.ref == "b"
+        assert controller.start_next() is None  # empty queue
+
+    def test_background_missions_wait_for_normal_ones(self, warehouse):
+        controller = WarehouseController(warehouse, planner_backend="python")
+        controller.submit("Enqueue", 1, ref="a", now=0.0)
+        controller.submit("ExtractTray", 2, ref="b", now=1.0)
+        mission, started = controller.start_next(now=3.0)
+        assert (mission.ref, started) == ("b", True)
+        assert controller.queue.stats["max_wait"] == 2.0
+        # An explicit priority overrides the mission's default
+        controller.submit("Enqueue", 4, ref="c", priority=-1)
+        assert controller.queue.peek().ref == "c"
+
+    def test_submit_beyond_max_queue_raises(self, warehouse):
+        from mission_queue import QueueFull
+
+        controller = WarehouseController(warehouse, max_queue=1)
+        controller.submit("SendBack")
+        with pytest.raises(QueueFull):
+            controller.submit("SendBack")
+
+    def test_lookahead_chains_sendback_towards_next_pickup(self, warehouse):
+        controller = WarehouseController(
+            warehouse, planner_backend="python", queue_policy="lookahead"
+        )
+        controller.submit("ExtractTray", 5)
+        controller.submit("SendBack")
+        controller.submit("ExtractTray", 4)
+        controller.start_next()
+        self._finish(controller)
+
+        controller.start_next()
+        # Tray 4 sits in storage_L_10; storage_L_3 is on the bay row (X travel
+        # only) and on the way up to it
+        assert controller.dest_slot.slot_id == "storage_L_3"
+        self._finish(controller)
+        assert warehouse.get_slot_by_tray(5).slot_id == "storage_L_3"
+
+    def test_fifo_sendback_lets_planner_choose(self, warehouse):
+        controller = WarehouseController(warehouse, planner_backend="python")
+        controller.extract(5)
+        self._finish(controller)
+        controller.submit("SendBack")
+        controller.submit("ExtractTray", 4)
+        controller.start_next()
+        assert controller.dest_slot is None
+
+
+class TestWarehouseControllerSlotting:
+    """Test access tracking, idle relocations and their preemption."""
+
+    @pytest.fixture
+    def warehouse(self):
+        from warehouse import Warehouse
+
+        return Warehouse()
+
+    @pytest.fixture
+    def controller(self, warehouse):
+        from slotting import SlottingOptimizer
+
+        controller = WarehouseController(
+            warehouse, planner_backend="python", slotting=SlottingOptimizer()
+        )
+        controller.slotting.record(5)
+        controller.slotting.record(5)
+        return controller
+
+    def test_extracts_are_counted(self, controller):
+        controller.slotting.reset()
+        controller.extract(2)
+        controller.set_idle()
+        controller.extract(0)  # from the queue: tray 6
+        assert controller.slotting.accesses == {2: 1, 6: 1}
+
+    def test_relocation_waits_for_idle_time(self, controller):
+        assert controller.start_relocation(0.0) is False
+        assert controller.idle_since == 0.0
+        assert controller.start_relocation(5.0) is True
+        assert controller.relocating
+        assert controller.mission.tray == 5
+
+    def test_relocation_moves_hot_tray_near_bay(self, warehouse, controller):
+        controller.idle_since = 0.0
+        controller.start_relocation(10.0)
+        now = 10.0
+        while controller.is_busy:
+            now = controller.advance(now) or now
+        assert warehouse.get_slot_by_tray(5).slot_id == "storage_L_3"
+        assert controller.idle_since == now
+        # Nothing left to gain, and the cooldown has not passed anyway
+        assert controller.start_relocation(now + 5.0) is False
+
+    def test_next_relocation_check(self, warehouse, controller):
+        assert controller.start_relocation(0.0) is False
+        # Throttle closed: come back once min_idle has passed
+        assert controller.next_relocation_check(0.0) == 5.0
+        assert controller.start_relocation(5.0) is True
+        assert controller.next_relocation_check(5.0) is None  # busy
+        now = 5.0
+        while controller.is_busy:
+            now = controller.advance(now) or now
+        # Idle again since now, then nothing left to move
+        assert controller.next_relocation_check(now) == now + 5.0
+        assert controller.start_relocation(now + 5.0) is False
+        assert controller.next_relocation_check(now + 5.0) is None
+        assert WarehouseController(warehouse).next_relocation_check(0.0) is None
+
+    def test_no_relocation_with_queued_request(self, controller):
+        controller.idle_since = 0.0
+        controller.submit("ExtractTray", 2)
+        assert controller.start_relocation(10.0) is False
+
+    def test_request_preempts_relocation_before_pick(self, warehouse, controller):
+        controller.idle_since = 0.0
+        controller.start_relocation(10.0)
+        controller.advance(10.0)
+        controller.submit("ExtractTray", 2, ref="a")
+
+        mission, started = controller.start_next()
+        assert (mission.ref, started) == ("a", True)
+        assert controller.slotting.preempted == 1
+        assert warehouse.get_slot_by_tray(5).slot_id == "storage_R_15"
+
+    def test_relocation_holding_tray_finishes_first(self, controller):
+        controller.idle_since = 0.0
+        controller.start_relocation(10.0)
+        now = 10.0
+        while controller.state != MissionState.DELIVER:
+            now = controller.advance(now)
+        controller.submit("ExtractTray", 2)
+        assert controller.start_next() is None
+        assert controller.relocating